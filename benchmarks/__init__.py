@@ -0,0 +1 @@
+"""Este módulo reúne os benchmarks das rotinas de dados do portal."""
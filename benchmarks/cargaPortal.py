@@ -0,0 +1,289 @@
+"""Mede a latência, a vazão e a memória do portal com várias \
+    sessões simultâneas, sem navegador e sem rede.
+
+Cada sessão é um AppTest do Streamlit que abre a página e \
+    repete interações de um usuário: escolher uma escola, trocar \
+    a série, trocar o ano e inverter a ordem do ranking. Todas as \
+    sessões rodam em threads do mesmo processo, como em uma \
+    réplica, com o Google trocado por um cliente que serve uma \
+    planilha sintética e o Redis por um servidor em memória.
+
+O relatório traz os percentis p50, p95 e p99 do tempo de cada \
+    reexecução da página, a vazão total e o crescimento da \
+    memória residente do processo.
+
+O AppTest do Streamlit 1.37 não reexecuta apenas um fragmento, \
+    então cada interação é medida como uma reexecução da página \
+    inteira. Em produção a troca de escola ou da ordem do \
+    ranking reexecuta só a seção do fragmento, logo os tempos \
+    por ação são um limite superior do que o usuário espera.
+
+Execute a partir da raiz do projeto com:
+
+    PYTHONPATH=src python -m benchmarks.cargaPortal --sessoes 4 16
+"""
+
+import argparse
+import logging
+import os
+import random
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+from unittest import mock
+
+import fakeredis
+import gspread
+import numpy as np
+import redis
+import streamlit as st
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage import dummy_cache_storage
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.util import patch_config_options
+
+from benchmarks.sinteticos import GoogleSintetico, geraPlanilha
+
+CAMINHO_APP = Path(__file__).resolve().parents[1] / "src" / "app.py"
+
+# Interações sorteadas a cada reexecução de uma sessão
+ACOES = ("escola", "serie", "ano", "ordem")
+
+
+def rssAtual() -> int:
+    """Retorna a memória residente atual do processo.
+
+    Returns:
+        rss: Tamanho em bytes, ou o pico quando o sistema não \
+            informa o valor atual
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            paginas = int(statm.read().split()[1])
+        return paginas * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@contextmanager
+def ambienteCarga(planilha: Dict[str, List[Dict[str, Any]]]) -> Iterator[None]:
+    """Troca o Google e o Redis por substitutos locais para a página.
+
+    O AppTest cria e descarta um Runtime a cada execução, o que \
+        quebra execuções simultâneas. Como em um servidor real, \
+        todas as sessões passam a usar um único Runtime. Os \
+        recursos do st.cache_resource são descartados na entrada \
+        e na saída, para que cada carga comece com o cache frio.
+
+    Args:
+        planilha: Planilha sintética servida pelo Google falso
+    """
+    servidor = fakeredis.FakeServer()
+    variaveis = {
+        "TTL": "3600",
+        "ID_PLANILHA": "planilha-carga",
+        "PATH_GOOGLE_CREDENTIALS": "credenciais.json",
+        "REDIS_URL": "redis://carga",
+    }
+
+    runtime = mock.MagicMock(spec=Runtime)
+    armazenamentoMidia = MemoryMediaFileStorage("/mock/media")
+    runtime.media_file_mgr = MediaFileManager(armazenamentoMidia)
+    armazenamentoCache = dummy_cache_storage.MemoryCacheStorageManager()
+    runtime.cache_storage_manager = armazenamentoCache
+
+    # Sessões criadas fora do script avisam a falta de contexto
+    contexto = "streamlit.runtime.scriptrunner.script_run_context"
+    logging.getLogger(contexto).setLevel(logging.ERROR)
+
+    with mock.patch.dict(os.environ, variaveis), mock.patch.object(
+        gspread, "service_account", lambda **kwargs: GoogleSintetico(planilha)
+    ), mock.patch.object(
+        redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.FakeRedis(server=servidor),
+    ), mock.patch.object(
+        Runtime, "instance", return_value=runtime
+    ), mock.patch.object(
+        Runtime, "exists", return_value=True
+    ), patch_config_options(
+        {"global.appTest": True}
+    ):
+        for variavel in ("DIRETORIO_SNAPSHOT", "PLANILHAS"):
+            os.environ.pop(variavel, None)
+        st.cache_resource.clear()
+        try:
+            yield
+        finally:
+            st.cache_resource.clear()
+
+
+def _widget(widgets, rotulo: str):
+    """Retorna o widget da página com o rótulo informado."""
+    return next(widget for widget in widgets if widget.label == rotulo)
+
+
+def interage(sessao: AppTest, acao: str, sorteio: random.Random) -> None:
+    """Altera um widget da página como um usuário faria.
+
+    Args:
+        sessao: Sessão já aberta
+        acao: Uma das ACOES
+        sorteio: Gerador dos valores escolhidos
+    """
+    if acao == "ordem":
+        ordem = _widget(sessao.toggle, "Ordem Ascendente")
+        ordem.set_value(not ordem.value)
+        return
+
+    rotulo = {
+        "escola": "Selecione a escola",
+        "serie": "Selecione a Série para realizar sua análise:",
+        "ano": "Selecione o ano de análise:",
+    }[acao]
+    seletor = _widget(sessao.selectbox, rotulo)
+    seletor.select(sorteio.choice(seletor.options))
+
+
+def simulaSessao(
+    indice: int,
+    interacoes: int,
+    largada: threading.Barrier,
+    tempos: List[Tuple[str, float]],
+    erros: List[str],
+) -> None:
+    """Abre a página e executa interações sorteadas.
+
+    Args:
+        indice: Número da sessão, usado como semente do sorteio
+        interacoes: Quantidade de interações depois da abertura
+        largada: Barreira que faz as sessões começarem juntas
+        tempos: Lista que recebe a ação e a duração de cada execução
+        erros: Lista que recebe as exceções exibidas pela página
+    """
+    sorteio = random.Random(indice)
+    sessao = AppTest.from_file(str(CAMINHO_APP), default_timeout=120)
+    largada.wait()
+
+    for passo in range(interacoes + 1):
+        acao = "abertura"
+        if passo:
+            acao = sorteio.choice(ACOES)
+            interage(sessao, acao, sorteio)
+
+        inicio = time.perf_counter()
+        sessao.run()
+        tempos.append((acao, time.perf_counter() - inicio))
+        erros.extend(str(excecao.value) for excecao in sessao.exception)
+
+
+def executa(
+    quantidadeSessoes: int,
+    interacoes: int,
+    quantidadeEscolas: int,
+    quantidadeAnos: int,
+) -> Dict[str, Any]:
+    """Roda as sessões simultâneas e reúne as medições.
+
+    Args:
+        quantidadeSessoes: Número de sessões simultâneas
+        interacoes: Interações de cada sessão depois da abertura
+        quantidadeEscolas: Número de escolas da planilha sintética
+        quantidadeAnos: Número de edições do IDEB
+
+    Returns:
+        resultado: Tempos por ação, erros, duração total e a \
+            memória residente antes e depois
+    """
+    planilha = geraPlanilha(quantidadeEscolas, quantidadeAnos)
+    tempos: List[Tuple[str, float]] = []
+    erros: List[str] = []
+
+    with ambienteCarga(planilha):
+        largada = threading.Barrier(quantidadeSessoes + 1)
+        sessoes = [
+            threading.Thread(
+                target=simulaSessao,
+                args=(indice, interacoes, largada, tempos, erros),
+            )
+            for indice in range(quantidadeSessoes)
+        ]
+        for sessao in sessoes:
+            sessao.start()
+
+        largada.wait()
+        rssInicial = rssAtual()
+        inicio = time.perf_counter()
+        for sessao in sessoes:
+            sessao.join()
+        duracao = time.perf_counter() - inicio
+
+    return {
+        "sessoes": quantidadeSessoes,
+        "tempos": tempos,
+        "erros": erros,
+        "duracao": duracao,
+        "rssInicial": rssInicial,
+        "rssFinal": rssAtual(),
+    }
+
+
+def percentis(duracoes: List[float]) -> Tuple[float, float, float]:
+    """Retorna o p50, p95 e p99 das durações, em milissegundos."""
+    p50, p95, p99 = np.percentile(np.array(duracoes) * 1000, [50, 95, 99])
+    return p50, p95, p99
+
+
+def main() -> None:
+    """Executa a carga e imprime o relatório."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessoes", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--interacoes", type=int, default=20)
+    parser.add_argument("--escolas", type=int, default=200)
+    parser.add_argument("--anos", type=int, default=8)
+    argumentos = parser.parse_args()
+
+    colunas = ["sessões", "ação", "execuções", "p50 (ms)", "p95 (ms)"]
+    cabecalho = "{:>8} {:<10} {:>10} {:>10} {:>10} {:>10}"
+    print(
+        "Cada ação é medida como reexecução da página inteira: o AppTest "
+        "não reexecuta só o fragmento, como o portal faz em produção."
+    )
+    print(cabecalho.format(*colunas, "p99 (ms)"))
+    for quantidadeSessoes in argumentos.sessoes:
+        resultado = executa(
+            quantidadeSessoes,
+            argumentos.interacoes,
+            argumentos.escolas,
+            argumentos.anos,
+        )
+
+        grupos = {"todas": [duracao for _, duracao in resultado["tempos"]]}
+        for acao, duracao in resultado["tempos"]:
+            grupos.setdefault(acao, []).append(duracao)
+        for acao, duracoes in grupos.items():
+            print(
+                f"{quantidadeSessoes:>8} {acao:<10} {len(duracoes):>10} "
+                "{:>10.1f} {:>10.1f} {:>10.1f}".format(*percentis(duracoes))
+            )
+
+        vazao = len(resultado["tempos"]) / resultado["duracao"]
+        crescimento = resultado["rssFinal"] - resultado["rssInicial"]
+        print(
+            f"{'':>8} vazão {vazao:.1f} execuções/s em "
+            f"{resultado['duracao']:.1f}s, RSS "
+            f"{resultado['rssFinal'] / 2**20:.1f} MiB "
+            f"({crescimento / 2**20:+.1f} MiB), "
+            f"{len(resultado['erros'])} erros"
+        )
+        for erro in sorted(set(resultado["erros"]))[:5]:
+            print(f"{'':>8} erro: {erro}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Mede o tempo e o pico de memória das funções do ETL \
+    usadas pelo portal, com planilhas sintéticas e sem rede.
+
+O Google é trocado por um cliente que serve a planilha \
+    sintética e o Redis por um servidor em memória. Cada função \
+    é medida em três caminhos:
+
+- fria: processador novo e cache vazio, inclui a busca no Google;
+- quente: mesma chamada repetida, servida dos caches;
+- cálculo: apenas o processamento dos Dataframes já carregados.
+
+Execute a partir da raiz do projeto com:
+
+    PYTHONPATH=src python -m benchmarks.etlPortal --escolas 100 1000
+"""
+
+import argparse
+import os
+import timeit
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from unittest import mock
+
+import fakeredis
+import gspread
+import redis
+
+from backEnd.etl import DriveProcessor, nomesAbasIdeb
+from benchmarks.sinteticos import GoogleSintetico, geraPlanilha
+
+ID_PLANILHA = "planilha-sintetica"
+
+
+@contextmanager
+def ambienteSintetico(
+    planilha: Dict[str, List[Dict[str, Any]]]
+) -> Iterator[Callable[[], DriveProcessor]]:  # noqa E501
+    """Troca o Google e o Redis por substitutos locais.
+
+    Args:
+        planilha: Planilha sintética servida pelo Google falso
+
+    Returns:
+        novoProcessador: Função que cria um DriveProcessor com \
+            cache vazio, ligado aos substitutos
+    """
+    variaveis = {"TTL": "3600", "ID_PLANILHA": ID_PLANILHA}
+
+    def novoProcessador() -> DriveProcessor:
+        servidor = fakeredis.FakeServer()
+        with mock.patch.object(
+            redis,
+            "from_url",
+            lambda url, **kwargs: fakeredis.FakeRedis(server=servidor),
+        ):
+            return DriveProcessor("credenciais.json", "redis://sintetico")
+
+    with mock.patch.dict(os.environ, variaveis), mock.patch.object(
+        gspread, "service_account", lambda **kwargs: GoogleSintetico(planilha)
+    ):
+        yield novoProcessador
+
+
+def mede(
+    funcao: Callable[[Any], Any],
+    preparo: Callable[[], Any],
+    repeticoes: int,
+) -> Tuple[float, int]:
+    """Mede o menor tempo e o pico de memória de uma função.
+
+    O preparo roda antes de cada execução e fica fora da medição. \
+        O pico de memória é medido em uma execução à parte, já \
+        que o tracemalloc deixa o código mais lento.
+
+    Args:
+        funcao: Função medida, recebe o retorno do preparo
+        preparo: Função que prepara o estado de cada execução
+        repeticoes: Quantidade de execuções cronometradas
+
+    Returns:
+        medicao: Menor tempo em segundos e pico de memória em bytes
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        estado = preparo()
+        tempos.append(timeit.timeit(lambda: funcao(estado), number=1))
+
+    estado = preparo()
+    tracemalloc.start()
+    try:
+        funcao(estado)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return min(tempos), pico
+
+
+def casos(
+    nomeEscola: str,
+) -> Dict[str, Tuple[Callable[[DriveProcessor], Any], Callable]]:
+    """Retorna as funções medidas e o cálculo puro de cada uma.
+
+    Args:
+        nomeEscola: Escola consultada em dadosEscola
+
+    Returns:
+        casos: Dicionário do nome da função para a chamada \
+            pública e a chamada apenas do processamento, que \
+            recebe o processador e as abas já carregadas
+    """
+    notas5, metas5 = nomesAbasIdeb(5)
+    notas9, metas9 = nomesAbasIdeb(9)
+    return {
+        "dadosEscola": (
+            lambda processador: processador.dadosEscola(nomeEscola),
+            lambda processador, abas: processador._montaIndiceEscolas(
+                processador._constroiIndiceEscolas(
+                    abas["Dados das Escolas"],
+                    abas["Quantidade de Alunos por Escola"],
+                ),
+                "",
+            )[nomeEscola],
+        ),
+        "listaEscolas": (
+            lambda processador: processador.listaEscolas(),
+            lambda processador, abas: abas["Dados das Escolas"][
+                "ESCOLA"
+            ].tolist(),  # noqa E501
+        ),
+        "retornaPlanilhaIdebMacro(5)": (
+            lambda processador: processador.retornaPlanilhaIdebMacro(5),
+            lambda processador, abas: processador._calculaTabelasIdeb(
+                abas[notas5], abas[metas5]
+            )["MACRO"],
+        ),
+        "retornaPlanilhaIdebMicro(9)": (
+            lambda processador: processador.retornaPlanilhaIdebMicro(9),
+            lambda processador, abas: processador._calculaTabelasIdeb(
+                abas[notas9], abas[metas9]
+            )["MICRO"],
+        ),
+    }
+
+
+def executa(
+    quantidadeEscolas: int, quantidadeAnos: int, repeticoes: int
+) -> List[Dict[str, Any]]:  # noqa E501
+    """Mede todas as funções para um tamanho de planilha.
+
+    Args:
+        quantidadeEscolas: Número de escolas da planilha sintética
+        quantidadeAnos: Número de edições do IDEB
+        repeticoes: Quantidade de execuções de cada medição
+
+    Returns:
+        resultados: Uma linha por função e caminho medido
+    """
+    planilha = geraPlanilha(quantidadeEscolas, quantidadeAnos)
+    nomeEscola = planilha["Dados das Escolas"][0]["ESCOLA"]
+    resultados = []
+
+    with ambienteSintetico(planilha) as novoProcessador:
+        aquecido = novoProcessador()
+        abas = aquecido.importaAbasDataFrame(list(planilha))
+
+        for nome, (chamada, calculo) in casos(nomeEscola).items():
+            chamada(aquecido)
+            caminhos = {
+                "fria": (chamada, novoProcessador),
+                "quente": (chamada, lambda: aquecido),
+                "cálculo": (
+                    lambda processador: calculo(processador, abas),
+                    lambda: aquecido,
+                ),
+            }
+            for caminho, (funcao, preparo) in caminhos.items():
+                tempo, pico = mede(funcao, preparo, repeticoes)
+                resultados.append(
+                    {
+                        "escolas": quantidadeEscolas,
+                        "anos": quantidadeAnos,
+                        "funcao": nome,
+                        "caminho": caminho,
+                        "tempo": tempo,
+                        "pico": pico,
+                    }
+                )
+
+    return resultados
+
+
+def main() -> None:
+    """Executa o benchmark e imprime a tabela de resultados."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--escolas", type=int, nargs="+", default=[100, 1000, 5000]
+    )  # noqa E501
+    parser.add_argument("--anos", type=int, default=8)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    argumentos = parser.parse_args()
+
+    colunas = ["escolas", "função", "caminho", "tempo (ms)", "pico (KiB)"]
+    print("{:>8} {:<28} {:<8} {:>11} {:>11}".format(*colunas))
+    for quantidadeEscolas in argumentos.escolas:
+        for linha in executa(
+            quantidadeEscolas, argumentos.anos, argumentos.repeticoes
+        ):  # noqa E501
+            print(
+                f"{linha['escolas']:>8} {linha['funcao']:<28} "
+                f"{linha['caminho']:<8} {linha['tempo'] * 1000:>11.3f} "
+                f"{linha['pico'] / 1024:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
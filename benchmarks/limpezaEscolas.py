@@ -0,0 +1,87 @@
+"""Compara a limpeza vetorizada da aba "Dados das Escolas" \
+    com a implementação anterior, linha a linha.
+
+Execute a partir da raiz do projeto com:
+
+    PYTHONPATH=src python -m benchmarks.limpezaEscolas
+"""
+
+import timeit
+from typing import Union
+
+import pandas as pd
+
+from backEnd.etl import DriveProcessor
+from benchmarks.sinteticos import geraDadosEscolas
+
+
+def limpezaAnterior(dfEscolas: pd.DataFrame) -> pd.DataFrame:
+    """Tratamento feito antes da versão vetorizada, mantido como referência.
+
+    Args:
+        dfEscolas: Dataframe com os registros da aba
+
+    Returns:
+        dfEscolas: Dataframe tratado
+    """
+    dfEscolas = dfEscolas.copy()
+    dfEscolas["ENDEREÇO"] = dfEscolas["ENDEREÇO"].str.replace("\n", ", ")
+
+    dfEscolas.replace(" \n", " ", regex=True, inplace=True)
+    dfEscolas.replace("\n", "", regex=True, inplace=True)
+
+    def extrairObservacoes(linha: pd.Series) -> Union[str, None]:
+        observacoes = []
+        partes = linha["ATENDIMENTO"].split("*")
+        if len(partes) > 1:
+            observacoes = [obs.strip() for obs in partes[1:]]
+        return ", ".join(observacoes) if observacoes else None
+
+    dfEscolas["OBS. ATENDIMENTO"] = dfEscolas.apply(
+        extrairObservacoes, axis=1
+    )  # noqa E501
+    dfEscolas["ATENDIMENTO"] = (
+        dfEscolas["ATENDIMENTO"].str.split("*").str[0].str.strip()
+    )
+    return dfEscolas
+
+
+def main(quantidades=(500, 2000, 5000), repeticoes: int = 5) -> None:
+    """Mede as duas implementações e confere se o resultado é o mesmo.
+
+    Args:
+        quantidades: Números de escolas das planilhas sintéticas
+        repeticoes: Quantidade de execuções de cada medição
+    """
+    colunas = ["escolas", "anterior (ms)", "vetorizada (ms)", "ganho"]
+    print("{:>8} {:>14} {:>16} {:>6}".format(*colunas))
+    for quantidade in quantidades:
+        dfEscolas = pd.DataFrame(geraDadosEscolas(quantidade))
+
+        pd.testing.assert_frame_equal(
+            limpezaAnterior(dfEscolas),
+            DriveProcessor.limpaDadosEscolas(dfEscolas),
+        )
+
+        anterior = min(
+            timeit.repeat(
+                lambda: limpezaAnterior(dfEscolas),
+                number=1,
+                repeat=repeticoes,
+            )
+        )
+        vetorizada = min(
+            timeit.repeat(
+                lambda: DriveProcessor.limpaDadosEscolas(dfEscolas),
+                number=1,
+                repeat=repeticoes,
+            )
+        )
+        print(
+            f"{quantidade:>8} {anterior * 1000:>14.1f} "
+            f"{vetorizada * 1000:>16.1f} {anterior / vetorizada:>5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Compara a memória dos Dataframes do ETL com e sem os \
+    tipos compactos, com planilhas sintéticas e sem rede.
+
+Para cada Dataframe servido ao portal o relatório mostra o \
+    tamanho com os tipos atuais (categorias, float32, int16 e \
+    booleano) e com os tipos anteriores (textos, float64, int64 e \
+    "SIM"/"NÃO"), medidos com memory_usage(deep=True).
+
+Execute a partir da raiz do projeto com:
+
+    PYTHONPATH=src python -m benchmarks.memoriaDataFrames --escolas 100 1000
+"""
+
+import argparse
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.etlPortal import ambienteSintetico
+from benchmarks.sinteticos import geraPlanilha
+
+SERIES_IDEB = (5, 9)
+
+
+def tiposAnteriores(df: pd.DataFrame) -> pd.DataFrame:
+    """Reconstrói um Dataframe com os tipos usados antes da compactação.
+
+    Args:
+        df: Dataframe com os tipos compactos
+
+    Returns:
+        dfAnterior: Cópia com textos, float64, int64 e "SIM"/"NÃO"
+    """
+    dfAnterior = df.copy()
+    for coluna, tipo in df.dtypes.items():
+        if isinstance(tipo, pd.CategoricalDtype):
+            dfAnterior[coluna] = df[coluna].astype(object)
+        elif tipo == np.float32:
+            dfAnterior[coluna] = df[coluna].astype(np.float64)
+        elif tipo == np.int16:
+            dfAnterior[coluna] = df[coluna].astype(np.int64)
+        elif tipo == bool:
+            dfAnterior[coluna] = np.where(df[coluna], "SIM", "NÃO")
+    return dfAnterior
+
+
+def memoria(df: pd.DataFrame) -> int:
+    """Retorna a memória ocupada por um Dataframe, com os textos.
+
+    Args:
+        df: Dataframe medido
+
+    Returns:
+        tamanho: Tamanho em bytes
+    """
+    return int(df.memory_usage(deep=True).sum())
+
+
+def executa(
+    quantidadeEscolas: int, quantidadeAnos: int
+) -> List[Dict[str, Any]]:  # noqa E501
+    """Mede os Dataframes do portal para um tamanho de planilha.
+
+    Args:
+        quantidadeEscolas: Número de escolas da planilha sintética
+        quantidadeAnos: Número de edições do IDEB
+
+    Returns:
+        resultados: Uma linha por Dataframe medido
+    """
+    planilha = geraPlanilha(quantidadeEscolas, quantidadeAnos)
+
+    with ambienteSintetico(planilha) as novoProcessador:
+        processador = novoProcessador()
+        processador.importaAbasDataFrame(list(planilha))
+
+        dataFrames = {}
+        for serie in SERIES_IDEB:
+            tabelas = processador.tabelasIdeb(serie)
+            dataFrames[f"IDEB {serie} macro"] = tabelas["MACRO"]
+            dataFrames[f"IDEB {serie} micro"] = tabelas["MICRO"]
+
+        # Soma das tabelas de quantidade de todas as escolas do indice
+        quantidades = [
+            quantidadePorAno
+            for _, quantidadePorAno in processador.indiceEscolas().values()
+        ]
+
+    resultados = []
+    for nome, df in dataFrames.items():
+        resultados.append(
+            {
+                "escolas": quantidadeEscolas,
+                "dataframe": nome,
+                "linhas": len(df),
+                "anterior": memoria(tiposAnteriores(df)),
+                "compacto": memoria(df),
+            }
+        )
+    anterior = sum(memoria(tiposAnteriores(df)) for df in quantidades)
+    resultados.append(
+        {
+            "escolas": quantidadeEscolas,
+            "dataframe": "quantidade de alunos",
+            "linhas": sum(len(df) for df in quantidades),
+            "anterior": anterior,
+            "compacto": sum(memoria(df) for df in quantidades),
+        }
+    )
+    return resultados
+
+
+def main() -> None:
+    """Executa as medições e imprime o relatório de memória."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--escolas", type=int, nargs="+", default=[100, 1000, 5000]
+    )  # noqa E501
+    parser.add_argument("--anos", type=int, default=8)
+    argumentos = parser.parse_args()
+
+    colunas = ["escolas", "dataframe", "linhas", "antes (KiB)", "depois (KiB)"]
+    print("{:>8} {:<22} {:>8} {:>12} {:>12} {:>9}".format(*colunas, "redução"))
+    for quantidadeEscolas in argumentos.escolas:
+        for linha in executa(quantidadeEscolas, argumentos.anos):
+            reducao = 1 - linha["compacto"] / linha["anterior"]
+            print(
+                f"{linha['escolas']:>8} {linha['dataframe']:<22} "
+                f"{linha['linhas']:>8} {linha['anterior'] / 1024:>12.1f} "
+                f"{linha['compacto'] / 1024:>12.1f} {reducao:>9.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
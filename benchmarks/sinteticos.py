@@ -0,0 +1,189 @@
+"""Este módulo gera planilhas sintéticas no formato das abas reais."""
+
+import random
+from typing import Any, Dict, List
+
+ATENDIMENTOS = [
+    "EDUCAÇÃO INFANTIL",
+    "1° AO 5° ANO",
+    "1° AO 9° ANO * Integral",
+    "1° AO 9° ANO * Integral * EJA \nnoturno",
+    "6° AO 9° ANO ** Sala de recursos",
+]
+
+
+def _nomeEscola(indice: int) -> str:
+    """Retorna o nome da escola sintética de um índice."""
+    return f"EMEF ESCOLA {indice:05d}"
+
+
+def geraDadosEscolas(
+    quantidadeEscolas: int, semente: int = 42
+) -> List[Dict[str, Any]]:  # noqa E501
+    """Gera registros no formato da aba "Dados das Escolas".
+
+    Args:
+        quantidadeEscolas: Número de escolas geradas
+        semente: Semente do gerador aleatório
+
+    Returns:
+        registros: Lista de dicionários, um por escola
+    """
+    aleatorio = random.Random(semente)
+    return [
+        {
+            "ESCOLA": _nomeEscola(indice),
+            "DIRETOR": f"Diretor \n{indice}",
+            "ENDEREÇO": f"Rua {indice}, {aleatorio.randint(1, 999)}\nBairro",
+            "ATENDIMENTO": aleatorio.choice(ATENDIMENTOS),
+            "INEP": 42000000 + indice,
+            "TELEFONE": f"(48) 3431-{indice % 10000:04d}",
+        }
+        for indice in range(quantidadeEscolas)
+    ]
+
+
+def geraAlunosEscolas(
+    quantidadeEscolas: int, semente: int = 42
+) -> List[Dict[str, Any]]:  # noqa E501
+    """Gera registros no formato da aba "Quantidade de Alunos por Escola".
+
+    Séries que a escola não atende aparecem como "-".
+
+    Args:
+        quantidadeEscolas: Número de escolas geradas
+        semente: Semente do gerador aleatório
+
+    Returns:
+        registros: Lista de dicionários, um por escola
+    """
+    aleatorio = random.Random(semente)
+    registros = []
+    for indice in range(quantidadeEscolas):
+        registro: Dict[str, Any] = {"ESCOLA": _nomeEscola(indice)}
+        for serie in range(1, 10):
+            registro[f"{serie}° ANO"] = (
+                "-" if aleatorio.random() < 0.3 else aleatorio.randint(5, 60)
+            )
+        quantidades = [v for v in registro.values() if isinstance(v, int)]
+        registro["TOTAL DA ESCOLA"] = sum(quantidades)
+        registro["ESTUDANTES COM DEFICIÊNCIA"] = aleatorio.randint(0, 10)
+        registros.append(registro)
+    return registros
+
+
+def geraAbaIdeb(
+    quantidadeEscolas: int,
+    quantidadeAnos: int,
+    meta: bool = False,
+    semente: int = 42,
+) -> List[Dict[str, Any]]:
+    """Gera registros no formato das abas de notas e metas do IDEB.
+
+    As três primeiras linhas são Brasil, Santa Catarina e \
+        Criciúma, seguidas das escolas. As notas vêm como \
+        inteiros sem vírgula, com alguns decimais e com os \
+        marcadores "-", "*" e "**" da planilha real.
+
+    Args:
+        quantidadeEscolas: Número de escolas geradas
+        quantidadeAnos: Número de edições do IDEB, a cada dois anos
+        meta: Se verdadeiro, gera a aba de metas, que usa "" \
+            no lugar de "*" e "**"
+        semente: Semente do gerador aleatório
+
+    Returns:
+        registros: Lista de dicionários, um por linha da aba
+    """
+    aleatorio = random.Random(semente + int(meta))
+    anos = [str(2005 + 2 * indice) for indice in range(quantidadeAnos)]
+    linhas = ["BRASIL", "SANTA CATARINA", "CRICIÚMA"] + [
+        _nomeEscola(indice) for indice in range(quantidadeEscolas)
+    ]
+    marcadores = ["-", ""] if meta else ["-", "*", "**"]
+
+    def valor() -> Any:
+        sorteio = aleatorio.random()
+        if sorteio < 0.15:
+            return aleatorio.choice(marcadores)
+        if sorteio < 0.2:
+            return round(aleatorio.uniform(3, 8), 1)
+        return aleatorio.randint(30, 80)
+
+    return [
+        {"ESCOLA": linha, **{ano: valor() for ano in anos}}  # noqa E501
+        for linha in linhas
+    ]
+
+
+def geraPlanilha(
+    quantidadeEscolas: int, quantidadeAnos: int, semente: int = 42
+) -> Dict[str, List[Dict[str, Any]]]:  # noqa E501
+    """Gera todas as abas utilizadas pelo portal.
+
+    Args:
+        quantidadeEscolas: Número de escolas geradas
+        quantidadeAnos: Número de edições do IDEB
+        semente: Semente do gerador aleatório
+
+    Returns:
+        planilha: Dicionário do nome da aba para os seus registros
+    """
+    planilha = {
+        "Dados das Escolas": geraDadosEscolas(quantidadeEscolas, semente),
+        "Quantidade de Alunos por Escola": geraAlunosEscolas(
+            quantidadeEscolas, semente
+        ),
+    }
+    abasIdeb = [
+        ("IDEB 5° ANO", "META IDEB 5º ANO"),
+        ("IDEB 9° ANO", "META IDEB 9° ANO"),
+    ]
+    for serie, (abaNotas, abaMetas) in enumerate(abasIdeb):
+        planilha[abaNotas] = geraAbaIdeb(
+            quantidadeEscolas, quantidadeAnos, semente=semente + 10 * serie
+        )
+        planilha[abaMetas] = geraAbaIdeb(
+            quantidadeEscolas,
+            quantidadeAnos,
+            meta=True,
+            semente=semente + 10 * serie,
+        )
+    return planilha
+
+
+class GoogleSintetico:
+    """Imita o cliente do gspread servindo uma planilha sintética."""
+
+    def __init__(self, planilha: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Guarda a planilha servida pelo cliente.
+
+        Args:
+            planilha: Dicionário do nome da aba para os seus registros
+        """
+        self.planilha = planilha
+        self.chamadas = 0
+        self.modificadoEm = "2024-03-01T12:00:00.000Z"
+        self.http_client = self
+
+    def open_by_key(self, idPlanilha: str) -> "GoogleSintetico":
+        """Retorna a própria instância como planilha."""
+        return self
+
+    def get_file_drive_metadata(self, idPlanilha: str) -> Dict[str, str]:
+        """Retorna a data de modificação, como a API do Drive."""
+        return {"id": idPlanilha, "modifiedTime": self.modificadoEm}
+
+    def values_batch_get(self, ranges: List[str]) -> Dict[str, Any]:
+        """Retorna os valores formatados das abas, como a API do Sheets."""
+        self.chamadas += 1
+        intervalos = []
+        for intervalo in ranges:
+            nomeAba = intervalo.strip("'").replace("''", "'")
+            registros = self.planilha[nomeAba]
+            cabecalho = list(registros[0])
+            valores = [cabecalho]
+            for registro in registros:
+                valores.append([str(registro[chave]) for chave in cabecalho])
+            intervalos.append({"range": intervalo, "values": valores})
+        return {"valueRanges": intervalos}
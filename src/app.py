@@ -6,42 +6,114 @@ from pathlib import Path
 from typing import List
 
 import pandas as pd
-import plotly_express as px
+import streamlit as st
 from dotenv import load_dotenv
-from streamlit import columns, dataframe, divider, plotly_chart
+from streamlit import cache_resource, columns, dataframe, divider, plotly_chart
 
 from backEnd.etl import DriveProcessor
+from backEnd.metricas import METRICAS
+from backEnd.planilhas import ProcessadoresPlanilhas
+from frontEnd import graficos
 from frontEnd.ui import UiPortalescolas
 
 load_dotenv(".env")
 
 interface = UiPortalescolas()
-dados = DriveProcessor(
-    Path(os.getenv("PATH_GOOGLE_CREDENTIALS")), os.getenv("REDIS_URL")
-)
 
 
-def app():
-    """Inicia aplicação."""
-    interface.tituloPagina()
+@cache_resource
+def processadoresCompartilhados() -> ProcessadoresPlanilhas:
+    """Retorna o registro único dos processadores das planilhas.
 
-    interface.markdown("## Sobre o portal")
-    interface.textoComfonteVariavel(
-        """Este portal é uma criação independente
-                       baseada em dados oficiais obtidos pelo Gabinete do
-                       Vereador Nícola Martins com desenvolvimento do
-                       profissional Gabriel Ronchi Brigido. Os dados serão
-                       atualizados a medida em que novos forem obtidos
-                       pelo gabinete.""",
-        tamanho=25,
+    O Streamlit reexecuta este script a cada interação, então \
+        os processadores, com seus caches e conexões, são criados \
+        uma única vez e compartilhados entre todas as sessões.
+    """
+    return ProcessadoresPlanilhas(
+        Path(os.getenv("PATH_GOOGLE_CREDENTIALS", "")), os.getenv("REDIS_URL")
     )
 
-    divider()
-    interface.markdown("## Dados gerais das escolas")
+
+def processadorDaSessao() -> DriveProcessor:
+    """Retorna o processador da planilha escolhida pela sessão.
+
+    A planilha vem do parâmetro "planilha" da URL e, se ele \
+        não existir ou não estiver configurado, é usada a \
+        planilha padrão.
+    """
+    processadores = processadoresCompartilhados()
+    idPlanilha = st.query_params.get("planilha")
+    if idPlanilha not in processadores.idsPlanilhas:
+        idPlanilha = processadores.padrao
+    return processadores.processador(idPlanilha)
+
+
+@cache_resource
+def figurasCompartilhadas() -> graficos.CacheFiguras:
+    """Retorna o cache de figuras único do processo.
+
+    Sessões que exibem a mesma visão reaproveitam a figura já \
+        montada em vez de construí-la novamente.
+    """
+    return graficos.CacheFiguras()
+
+
+@cache_resource
+def servidorMetricas() -> None:
+    """Inicia, uma única vez, o servidor das métricas do Prometheus.
+
+    O servidor só é iniciado quando a variável PORTA_METRICAS existe.
+    """
+    if os.getenv("PORTA_METRICAS"):
+        METRICAS.iniciaServidor(int(os.getenv("PORTA_METRICAS")))
+
+
+servidorMetricas()
+dados = processadorDaSessao()
+figuras = figurasCompartilhadas()
+
+
+def filtraAnoDF(df: pd.DataFrame, ano: str) -> pd.DataFrame:
+    """Filtra o Dataframe para o Ano selecionado.
+
+    Args:
+        df: Dataframe para filtrar
+        ano: Ano desejado
+
+    Returns
+        dfFiltrado: O Dataframe filtrado pelo ano de input
+    """
+    return df[df["ANO"] == ano]
+
+
+def selecionaColunasDF(
+    df: pd.DataFrame, colunas: List[str]
+) -> pd.DataFrame:  # noqa E501
+    """Retorna o Dataframe com as colunas selecionadas.
+
+    Args:
+        df: Dataframe para filtrar
+        colunas: Lista de colunas desejadas
+
+    Returns
+        df: O Dataframe com as colunas de input
+    """
+    return df[df["ESCOLA"].isin(colunas)]
+
+
+@st.fragment
+@METRICAS.cronometra("secao", secao="secaoDadosEscola")
+def secaoDadosEscola():
+    """Exibe o cartão e a quantidade de alunos da escola selecionada.
+
+    Trocar a escola reexecuta apenas esta seção.
+    """
     escola = interface.seletor("Selecione a escola", dados.listaEscolas())
 
-    # Importa dados da escola selecionada
-    escolaSelecionada = dados.dadosEscola(escola)
+    # Dados e versao vem da mesma leitura do indice, para que a figura
+    # nunca seja guardada com a versao de uma atualizacao concorrente
+    indice = dados.indiceEscolas()
+    registro, quantidadePorAno = indice[escola]
 
     dadosExibicaoCartoes = [
         "ESCOLA",
@@ -52,7 +124,7 @@ def app():
         "INEP",
     ]
 
-    infoGerais, quantidadePorAno = escolaSelecionada
+    infoGerais = dict(registro)
 
     for i in dadosExibicaoCartoes:
         if infoGerais[i]:
@@ -67,74 +139,33 @@ def app():
     # exibicao DF
     dataframe(dfInfoComplementares, use_container_width=True, hide_index=True)
 
-    graficoEscolas = px.bar(
-        quantidadePorAno["QUANTIDADE POR ANO"],
-        x="QUANTIDADE ESTUDANTES",
-        y="ANO",
-        title="Quantidade de estudantes por série",
-        text="QUANTIDADE ESTUDANTES",
-        orientation="h",
-    ).update_layout(xaxis=dict(visible=False))
-
-    graficoEscolas.update_yaxes(title="SÉRIE", showticklabels=True)
-
-    graficoEscolas.update_traces(
-        textfont=dict(size=25), marker=dict(color="orange")
-    )  # noqa E501
-
-    plotly_chart(graficoEscolas, use_container_width=True)
-
-    divider()
-
-    interface.markdown("## Desempenho IDEB das escolas municipais de Crciúma")
-    serieIdeb = interface.seletor(
-        "Selecione a Série para realizar sua análise:", ["5° ano", "9° ano"]
+    graficoEscolas = figuras.figura(
+        "quantidadeAlunos",
+        (escola, indice.versao),
+        lambda: graficos.figuraQuantidadeAlunos(quantidadePorAno),
     )
-    serieIdebNumero = int(serieIdeb[0])
 
-    # Importa o Dataframe
-    dfMAcro = dados.retornaPlanilhaIdebMacro(serieIdebNumero)
-    opcoesSelecaoPolo = dfMAcro["ESCOLA"].unique()
-    opcoesSelecaoAno = dfMAcro["ANO"].unique()
-
-    cores = {"META": "#FF5733", "NOTA": "#ffa500"}
-
-    def filtraAnoDF(df: pd.DataFrame, ano: str) -> pd.DataFrame:
-        """Filtra o Dataframe para o Ano selecionado.
-
-        Args:
-            df: Dataframe para filtrar
-            ano: Ano desejado
-
-        Returns
-            dfFiltrado: O Dataframe filtrado pelo ano de input
-        """
-        return df[df["ANO"] == ano]
+    plotly_chart(graficoEscolas, use_container_width=True)
 
-    def selecionaColunasDF(
-        df: pd.DataFrame, colunas: List[str]
-    ) -> pd.DataFrame:  # noqa E501
-        """Retorna o Dataframe com as colunas selecionadas.
 
-        Args:
-            df: Dataframe para filtrar
-            colunas: Lista de colunas desejadas
+@st.fragment
+@METRICAS.cronometra("secao", secao="secaoIdebGeral")
+def secaoIdebGeral(serieIdeb: str, anoSelecionado: str):
+    """Exibe a comparação do IDEB geral entre os polos selecionados.
 
-        Returns
-            df: O Dataframe com as colunas de input
-        """
-        return df[df["ESCOLA"].isin(colunas)]
+    Args:
+        serieIdeb: Série selecionada, como "5° ano"
+        anoSelecionado: Ano de análise selecionado
+    """
+    tabelas = dados.tabelasIdeb(int(serieIdeb[0]))
+    dfMAcro = tabelas["MACRO"]
+    opcoesSelecaoPolo = dfMAcro["ESCOLA"].unique().tolist()
 
     col1, col2 = columns([2, 8])
 
     for i in range(2):
         col1.write("")
 
-    anoSelecionado = col1.selectbox(
-        label="Selecione o ano de análise:",
-        options=opcoesSelecaoAno,
-        index=len(opcoesSelecaoAno) - 1,
-    )
     nivelSelecionado = col1.multiselect(
         label="Selecione os polos para comparação:",
         options=opcoesSelecaoPolo,
@@ -146,107 +177,158 @@ def app():
     )
 
     if not dfGeralFiltrado.empty:
-        graficoGeralIdeb = px.bar(
-            dfGeralFiltrado,
-            x="ESCOLA",
-            y=["NOTA", "META"],
-            barmode="group",
-            title=f"Média geral IDEB do {serieIdeb} em {anoSelecionado}",
-            color_discrete_map=cores,
+        graficoGeralIdeb = figuras.figura(
+            "idebGeral",
+            (
+                serieIdeb,
+                anoSelecionado,
+                sorted(nivelSelecionado),
+                tabelas["VERSAO"],
+            ),
+            lambda: graficos.figuraIdebGeral(
+                dfGeralFiltrado, serieIdeb, anoSelecionado
+            ),
         )
 
-        graficoGeralIdeb.update_xaxes(title="", showticklabels=True)
-        graficoGeralIdeb.update_yaxes(title="", showticklabels=True)
-        graficoGeralIdeb.update_layout(legend_title_text="")
-
         col2.plotly_chart(graficoGeralIdeb, use_container_width=True)
 
     else:
         col2.error("Selecione ao menos 1 polo para exibir o gráfico!")
 
-    # Gráfico geral escolas por ano
-    dfMicro = dados.retornaPlanilhaIdebMicro(serieIdebNumero)
-    escolasMicro = dfMicro["ESCOLA"].unique()
-
-    dfIdebMicro = filtraAnoDF(dfMicro, anoSelecionado)  # noqa E501
 
-    escolasAcimaAtingimento = len(
-        dfIdebMicro[dfIdebMicro["ATINGIU META"] == "SIM"]
-    )  # noqa E501
-    escolasAbaixoAtingimento = len(
-        dfIdebMicro[dfIdebMicro["ATINGIU META"] != "SIM"]
-    )  # noqa E501
+@st.fragment
+@METRICAS.cronometra("secao", secao="secaoRankingIdeb")
+def secaoRankingIdeb(serieIdeb: str, anoSelecionado: str):
+    """Exibe o atingimento da meta do IDEB por escola no ano.
 
-    for i in range(11):
-        col1.write("")
+    Args:
+        serieIdeb: Série selecionada, como "5° ano"
+        anoSelecionado: Ano de análise selecionado
+    """
+    # Ranking do ano, calculado junto com as tabelas de IDEB
+    tabelas = dados.tabelasIdeb(int(serieIdeb[0]))
+    ranking = tabelas["RANKING"][anoSelecionado]
 
-    ordem = not col1.toggle("Ordem Ascendente")
-    dfOrdenado = dfIdebMicro.sort_values(by="ATINGIMENTO", ascending=ordem)
-
-    graficoMicroIdeb = px.bar(
-        dfOrdenado,
-        x="ATINGIMENTO",
-        y="ESCOLA",
-        title=f"Atingimento do IDEB do {serieIdeb} pelas escolas em {anoSelecionado}",  # noqa E501
-        orientation="h",
-    ).update_layout(height=600)
-
-    graficoMicroIdeb.update_yaxes(title="", showticklabels=True)
-    graficoMicroIdeb.update_traces(
-        marker_color=[
-            "red" if pontuacao < 1 else "green"
-            for pontuacao in dfOrdenado["ATINGIMENTO"]
-        ]
-    )
+    col1, col2 = columns([8, 2])
 
-    # Adicionar linha constante no eixo x
-    graficoMicroIdeb.add_shape(
-        type="line",
-        x0=1,
-        y0=-0.5,
-        x1=1,
-        y1=len(dfIdebMicro) - 0.5,
-        line=dict(color="#ffa500", width=2),
-    )
-    graficoMicroIdeb.add_annotation(
-        x=1,
-        y=len(dfIdebMicro) + 0.85,
-        text="OBJETIVO",
-        showarrow=False,
-        font=dict(size=12, color="orange"),
-        xshift=25,
+    ordem = not col2.toggle("Ordem Ascendente")
+    rankingOrdenado = ranking["ASCENDENTE" if ordem else "DESCENDENTE"]
+
+    graficoMicroIdeb = figuras.figura(
+        "rankingIdeb",
+        (
+            serieIdeb,
+            anoSelecionado,
+            ordem,
+            tabelas["VERSAO"],
+        ),
+        lambda: graficos.figuraRankingIdeb(
+            rankingOrdenado["DADOS"],
+            serieIdeb,
+            anoSelecionado,
+            rankingOrdenado["CORES"],
+        ),
     )
 
-    col1, col2 = columns([8, 2])
     col1.plotly_chart(graficoMicroIdeb, use_container_width=True)
 
-    for i in range(14):
+    for i in range(12):
         col2.write("")
 
-    col2.metric("ESCOLAS ACIMA DA META", escolasAcimaAtingimento)
-    col2.metric("ESCOLAS ABAIXO DA META", escolasAbaixoAtingimento)
+    col2.metric("ESCOLAS ACIMA DA META", ranking["ACIMA"])
+    col2.metric("ESCOLAS ABAIXO DA META", ranking["ABAIXO"])
+
+
+@st.fragment
+@METRICAS.cronometra("secao", secao="secaoEvolucaoIdeb")
+def secaoEvolucaoIdeb(serieIdeb: str):
+    """Exibe a evolução das notas e metas do IDEB de uma escola.
+
+    Args:
+        serieIdeb: Série selecionada, como "5° ano"
+    """
+    historico = dados.historicoIdeb(int(serieIdeb[0]))
+    escolasMicro = list(historico)
 
     interface.markdown("#### Evolução do IDEB Individual")
     escolaSelecionada = interface.seletor(
         "Selecione a escola para análise:", escolasMicro
     )
-    dfMicroFiltrado = dfMicro[dfMicro["ESCOLA"] == escolaSelecionada]
-
-    graficoEvolucaoIdeb = px.bar(
-        dfMicroFiltrado,
-        x="ANO",
-        y=["NOTA", "META"],
-        barmode="group",
-        title=f"Evolução nota IDEB do {serieIdeb} para {escolaSelecionada}",
-        color_discrete_map=cores,
+    graficoEvolucaoIdeb = figuras.figura(
+        "evolucaoIdeb",
+        (
+            serieIdeb,
+            escolaSelecionada,
+            historico.versao,
+        ),
+        lambda: graficos.figuraEvolucaoIdeb(
+            historico[escolaSelecionada],
+            serieIdeb,
+            escolaSelecionada,
+        ),
     )
 
-    graficoEvolucaoIdeb.update_xaxes(title="", showticklabels=True)
-    graficoEvolucaoIdeb.update_yaxes(title="NOTA", showticklabels=True)
-    graficoEvolucaoIdeb.update_layout(legend_title_text="")
-
     plotly_chart(graficoEvolucaoIdeb, use_container_width=True)
 
 
+def app():
+    """Inicia aplicação.
+
+    Cada seção é um fragmento, então uma interação reexecuta \
+        apenas a seção onde aconteceu. Série e ano afetam várias \
+        seções e por isso ficam fora delas.
+    """
+    interface.tituloPagina()
+
+    # Resolve de uma vez os dados de todas as seções da página. Trocar
+    # série ou ano reexecuta a página, mas o pool só é usado de novo
+    # quando os dados mudam
+    dados.preCarrega(
+        tarefas=[
+            dados.indiceEscolas,
+            lambda: dados.tabelasIdeb(5),
+            lambda: dados.tabelasIdeb(9),
+        ],
+        apenasNovaVersao=True,
+    )
+
+    interface.markdown("## Sobre o portal")
+    interface.textoComfonteVariavel(
+        """Este portal é uma criação independente
+                       baseada em dados oficiais obtidos pelo Gabinete do
+                       Vereador Nícola Martins com desenvolvimento do
+                       profissional Gabriel Ronchi Brigido. Os dados serão
+                       atualizados a medida em que novos forem obtidos
+                       pelo gabinete.""",
+        tamanho=25,
+    )
+
+    divider()
+    interface.markdown("## Dados gerais das escolas")
+    secaoDadosEscola()
+
+    divider()
+
+    interface.markdown("## Desempenho IDEB das escolas municipais de Crciúma")
+    col1, col2 = columns(2)
+    with col1:
+        serieIdeb = interface.seletor(
+            "Selecione a Série para realizar sua análise:",
+            ["5° ano", "9° ano"],
+        )
+
+    dfMAcro = dados.retornaPlanilhaIdebMacro(int(serieIdeb[0]))
+    opcoesSelecaoAno = dfMAcro["ANO"].unique().tolist()
+    anoSelecionado = col2.selectbox(
+        label="Selecione o ano de análise:",
+        options=opcoesSelecaoAno,
+        index=len(opcoesSelecaoAno) - 1,
+    )
+
+    secaoIdebGeral(serieIdeb, anoSelecionado)
+    secaoRankingIdeb(serieIdeb, anoSelecionado)
+    secaoEvolucaoIdeb(serieIdeb)
+
+
 if __name__ == "__main__":
     app()
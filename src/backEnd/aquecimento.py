@@ -0,0 +1,116 @@
+"""Este módulo aquece o cache do portal, buscando as abas \
+    e calculando os resultados derivados antes dos usuários.
+
+Execute a partir da raiz do projeto com:
+
+    PYTHONPATH=src python -m backEnd.aquecimento [--intervalo SEGUNDOS]
+
+Sem intervalo o aquecimento roda uma única vez, por exemplo na \
+    subida do container. Com intervalo ele se repete até ser \
+    interrompido, mantendo o cache sempre quente.
+"""
+
+import argparse
+import functools
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict
+
+from backEnd.etl import ABAS_PORTAL, DriveProcessor
+from backEnd.planilhas import ProcessadoresPlanilhas
+
+logger = logging.getLogger(__name__)
+
+# Séries do IDEB exibidas pelo portal
+SERIES_IDEB = (5, 9)
+
+
+def aquece(processador: DriveProcessor) -> Dict[str, float] | None:
+    """Atualiza as abas no cache e calcula os resultados do portal.
+
+    As abas são lidas do Google em uma única requisição, ou só \
+        têm o prazo renovado se a planilha não mudou. Quando \
+        várias réplicas aquecem juntas, apenas uma busca no \
+        Google e as demais leem o que ela gravou. Os resultados \
+        que a página lê, o índice das escolas e as tabelas de \
+        IDEB de cada série, são calculados em paralelo e gravados \
+        no Redis para as demais réplicas.
+
+    Args:
+        processador: Processador ligado ao Redis das réplicas
+
+    Returns:
+        resumo: Quantidade de abas e escolas e a duração em \
+            segundos, ou None se a planilha é servida por um \
+            snapshot e não há Redis para aquecer
+    """
+    if processador.snapshot is not None:
+        logger.warning(
+            "Planilha %s servida por snapshot, sem Redis para aquecer",
+            processador.idPlanilha,
+        )
+        return None
+
+    inicio = time.perf_counter()
+    processador.atualizaAbas(ABAS_PORTAL)
+
+    # Le de novo do Redis, renovando o prazo dos resultados ja gravados
+    processador.cacheDerivados.limpar()
+
+    tarefas = [processador.indiceEscolas]
+    for anoIdeb in SERIES_IDEB:
+        tarefas.append(functools.partial(processador.tabelasIdeb, anoIdeb))
+    processador.preCarrega(ABAS_PORTAL, tarefas)
+
+    return {
+        "abas": len(ABAS_PORTAL),
+        "escolas": len(processador.indiceEscolas()),
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+def main() -> None:
+    """Aquece o cache de todas as planilhas uma vez ou periodicamente."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--intervalo",
+        type=float,
+        default=None,
+        help="Segundos entre os aquecimentos. Sem ele roda uma vez",
+    )
+    argumentos = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    processadores = ProcessadoresPlanilhas(
+        Path(os.getenv("PATH_GOOGLE_CREDENTIALS", "")), os.getenv("REDIS_URL")
+    )
+
+    while True:
+        for idPlanilha in processadores.idsPlanilhas:
+            try:
+                resumo = aquece(processadores.processador(idPlanilha))
+                if resumo is None:
+                    continue
+                logger.info(
+                    "Planilha %s aquecida: %d abas, %d escolas em %.2fs",
+                    idPlanilha,
+                    resumo["abas"],
+                    resumo["escolas"],
+                    resumo["segundos"],
+                )
+            except Exception:
+                # Em uma única execução a falha deve aparecer no código
+                # de saída
+                if argumentos.intervalo is None:
+                    raise
+                logger.exception("Falha ao aquecer a planilha %s", idPlanilha)
+
+        if argumentos.intervalo is None:
+            return
+        time.sleep(argumentos.intervalo)
+
+
+if __name__ == "__main__":
+    main()
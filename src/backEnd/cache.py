@@ -0,0 +1,157 @@
+"""Este módulo contém o cache em memória do processo \
+    usado na frente do Redis."""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Mapping, Tuple
+
+import pandas as pd
+
+
+def tamanhoAproximado(valor: Any) -> int:
+    """Estima quantos bytes um valor ocupa em memória.
+
+    Args:
+        valor: Dataframe, coleção ou valor simples
+
+    Returns:
+        tamanho: Estimativa em bytes, somando o conteúdo das coleções
+    """
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, Mapping):
+        return sys.getsizeof(valor) + sum(
+            tamanhoAproximado(chave) + tamanhoAproximado(item)
+            for chave, item in valor.items()
+        )
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(map(tamanhoAproximado, valor))
+    return sys.getsizeof(valor)
+
+
+class CacheLocal:
+    """Cache LRU limitado por tamanho e com tempo de vida por item."""
+
+    def __init__(self, tamanhoMaximo: int, ttl: int) -> None:
+        """Instancia o cache vazio.
+
+        Args:
+            tamanhoMaximo: Soma máxima, em bytes, do tamanho \
+                dos itens mantidos em memória
+            ttl: Tempo de vida padrão dos itens em segundos
+        """
+        self.tamanhoMaximo = tamanhoMaximo
+        self.ttl = ttl
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+        self._tamanhoAtual = 0
+        self._itens: "OrderedDict[Hashable, Tuple[Any, int, float]]" = (
+            OrderedDict()
+        )  # noqa E501
+        self._trava = threading.Lock()
+
+    def obter(
+        self, chave: Hashable, aceitaExpirado: bool = False
+    ) -> Any | None:  # noqa E501
+        """Retorna um item do cache.
+
+        Itens expirados continuam guardados até serem removidos \
+            pelo LRU, servindo de último valor conhecido.
+
+        Args:
+            chave: Chave do item procurado
+            aceitaExpirado: Retorna o item mesmo que já tenha expirado
+
+        Returns:
+            valor: O valor armazenado ou None caso \
+                não exista ou tenha expirado
+        """
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is None:
+                self.falhas += 1
+                return None
+
+            valor, tamanho, expiraEm = item
+            if expiraEm <= time.monotonic() and not aceitaExpirado:
+                self.falhas += 1
+                return None
+
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def armazenar(
+        self,
+        chave: Hashable,
+        valor: Any,
+        tamanho: int,
+        ttl: int | None = None,
+    ) -> None:
+        """Armazena um item removendo os menos usados se necessário.
+
+        Um item maior que o cache inteiro não é guardado e \
+            remove o valor anterior da mesma chave, que deixou \
+            de ser atual.
+
+        Args:
+            chave: Chave do item a ser inserido
+            valor: Valor do item a ser inserido
+            tamanho: Tamanho aproximado do item em bytes
+            ttl: Tempo de vida do item, usa o padrão do cache se omitido
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self._trava:
+            if chave in self._itens:
+                self._remove(chave)
+
+            if tamanho > self.tamanhoMaximo:
+                return
+
+            self._itens[chave] = (valor, tamanho, time.monotonic() + ttl)
+            self._tamanhoAtual += tamanho
+
+            while self._tamanhoAtual > self.tamanhoMaximo:
+                chaveAntiga = next(iter(self._itens))
+                self._remove(chaveAntiga)
+                self.remocoes += 1
+
+    def invalidar(self, chave: Hashable) -> None:
+        """Remove um item do cache, se existir.
+
+        Args:
+            chave: Chave do item a ser removido
+        """
+        with self._trava:
+            if chave in self._itens:
+                self._remove(chave)
+
+    def limpar(self) -> None:
+        """Remove todos os itens do cache."""
+        with self._trava:
+            self._itens.clear()
+            self._tamanhoAtual = 0
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Retorna os contadores de uso do cache.
+
+        Returns:
+            estatisticas: Acertos, falhas, remoções, \
+                quantidade de itens e bytes ocupados
+        """
+        with self._trava:
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "remocoes": self.remocoes,
+                "itens": len(self._itens),
+                "bytes": self._tamanhoAtual,
+            }
+
+    def _remove(self, chave: Hashable) -> None:
+        """Remove um item sem adquirir a trava."""
+        _, tamanho, _ = self._itens.pop(chave)
+        self._tamanhoAtual -= tamanho
@@ -0,0 +1,171 @@
+"""Este módulo controla o ritmo das requisições ao Google \
+    Sheets, respeitando a cota compartilhada entre as réplicas."""
+
+import logging
+import random
+import time
+from typing import Any, Callable
+
+import redis
+from gspread.exceptions import APIError
+
+from backEnd.metricas import METRICAS
+
+logger = logging.getLogger(__name__)
+
+# Códigos HTTP de falhas passageiras, que valem uma nova tentativa
+CODIGOS_RETENTATIVA = {429, 500, 502, 503, 504}
+
+# Balde de fichas atômico no Redis. Devolve, como texto, quantos
+# segundos faltam para haver fichas suficientes, ou zero se o custo
+# já foi descontado
+_SCRIPT_BALDE = """
+local custo = tonumber(ARGV[3])
+local capacidade = math.max(tonumber(ARGV[1]), custo)
+local taxa = tonumber(ARGV[2])
+local relogio = redis.call('TIME')
+local agora = tonumber(relogio[1]) + tonumber(relogio[2]) / 1000000
+
+local estado = redis.call('HMGET', KEYS[1], 'fichas', 'instante')
+local fichas = tonumber(estado[1]) or capacidade
+local instante = tonumber(estado[2]) or agora
+fichas = math.min(capacidade, fichas + math.max(0, agora - instante) * taxa)
+
+local espera = 0
+if fichas >= custo then
+    fichas = fichas - custo
+else
+    espera = (custo - fichas) / taxa
+end
+
+redis.call('HSET', KEYS[1], 'fichas', fichas, 'instante', agora)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacidade / taxa) + 1)
+return tostring(espera)
+"""
+
+
+class CotaGoogle:
+    """Balde de fichas no Redis com novas tentativas nas falhas do Google."""
+
+    def __init__(
+        self,
+        clienteRedis: redis.Redis,
+        requisicoesPorMinuto: int = 60,
+        rajada: int | None = None,
+        tentativas: int = 5,
+        esperaBase: float = 1,
+        esperaMaxima: float = 32,
+        esperaCota: float = 30,
+        chave: str = "cota:google",
+    ) -> None:
+        """Instancia o controle da cota.
+
+        Args:
+            clienteRedis: Cliente do Redis onde fica o balde, \
+                compartilhado por todas as réplicas
+            requisicoesPorMinuto: Requisições liberadas por minuto, \
+                somando todas as réplicas
+            rajada: Requisições que podem sair de uma vez depois \
+                de um período parado, por padrão um décimo da cota \
+                por minuto
+            tentativas: Número máximo de tentativas de cada chamada
+            esperaBase: Espera, em segundos, antes da segunda \
+                tentativa. Dobra a cada nova falha
+            esperaMaxima: Limite, em segundos, da espera entre \
+                duas tentativas
+            esperaCota: Tempo máximo, em segundos, de espera por \
+                uma vaga na cota antes de desistir
+            chave: Chave do balde no Redis
+        """
+        self.capacidade = rajada or max(1, requisicoesPorMinuto // 10)
+        self.taxa = requisicoesPorMinuto / 60
+        self.tentativas = tentativas
+        self.esperaBase = esperaBase
+        self.esperaMaxima = esperaMaxima
+        self.esperaCota = esperaCota
+        self.chave = chave
+        self._script = clienteRedis.register_script(_SCRIPT_BALDE)
+
+    def reserva(self, custo: int = 1) -> float:
+        """Tenta descontar requisições do balde.
+
+        Args:
+            custo: Quantidade de requisições ao Google
+
+        Returns:
+            espera: Zero se as requisições foram liberadas ou os \
+                segundos até o balde ter fichas suficientes
+        """
+        return float(
+            self._script(
+                keys=[self.chave], args=[self.capacidade, self.taxa, custo]
+            )  # noqa E501
+        )
+
+    def aguardaVez(self, custo: int = 1) -> None:
+        """Espera até a cota liberar as requisições.
+
+        Args:
+            custo: Quantidade de requisições ao Google
+        """
+        limite = time.monotonic() + self.esperaCota
+        with METRICAS.etapa("google_cota"):
+            while True:
+                espera = self.reserva(custo)
+                if espera <= 0:
+                    return
+                if time.monotonic() + espera > limite:
+                    METRICAS.incrementa("google_cota_esgotada_total")
+                    raise TimeoutError("Cota do Google esgotada")
+                time.sleep(espera)
+
+    def _esperaRetentativa(self, tentativa: int, erro: APIError) -> float:
+        """Calcula a espera antes de uma nova tentativa.
+
+        A espera é sorteada entre zero e o dobro da anterior, \
+            para que as réplicas não voltem todas juntas, e \
+            respeita o Retry-After quando o Google o informa.
+
+        Args:
+            tentativa: Número de falhas anteriores, a partir de zero
+            erro: Erro devolvido pelo Google
+
+        Returns:
+            espera: Segundos até a próxima tentativa
+        """
+        teto = min(self.esperaMaxima, self.esperaBase * 2**tentativa)
+        espera = random.uniform(0, teto)
+
+        retryAfter = erro.response.headers.get("Retry-After", "")
+        if retryAfter.isdigit():
+            espera = max(espera, min(self.esperaMaxima, int(retryAfter)))
+        return espera
+
+    def executa(self, funcao: Callable[[], Any], custo: int = 1) -> Any:
+        """Chama o Google dentro da cota, tentando de novo nas falhas.
+
+        Args:
+            funcao: Função sem argumentos que faz as requisições
+            custo: Quantidade de requisições feitas pela função
+
+        Returns:
+            resultado: O retorno da função
+        """
+        for tentativa in range(self.tentativas):
+            self.aguardaVez(custo)
+            try:
+                return funcao()
+            except APIError as erro:
+                codigo = erro.response.status_code
+                ultima = tentativa == self.tentativas - 1
+                if codigo not in CODIGOS_RETENTATIVA or ultima:
+                    raise
+
+                espera = self._esperaRetentativa(tentativa, erro)
+                METRICAS.incrementa("google_retentativas_total", codigo=codigo)
+                logger.warning(
+                    "Google respondeu %s, nova tentativa em %.2fs",
+                    codigo,
+                    espera,
+                )
+                time.sleep(espera)
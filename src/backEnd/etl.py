@@ -1,26 +1,159 @@
 """Este módulo contém a classe de armazenamento \
     e tratamento de dados para o portal."""
 
+import hashlib
 import json
+import logging
 import os
+import threading
+from collections.abc import Hashable, Iterable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Sequence, Set, Tuple
 
 import gspread
+import numpy as np
 import pandas as pd
 import redis
 from dotenv import load_dotenv
-from numpy import nan
+from gspread.utils import numericise_all, to_records
+
+from backEnd import formato
+from backEnd.cache import CacheLocal, tamanhoAproximado
+from backEnd.cotaGoogle import CotaGoogle
+from backEnd.metricas import METRICAS
+from backEnd.snapshot import SnapshotLocal, exportaSnapshot
 
 # Importa as variáveis de ambiente
 load_dotenv(".env")
 
+logger = logging.getLogger(__name__)
+
+
+def _hashConteudo(conteudo: bytes) -> str:
+    """Retorna o hash usado como versão de um conteúdo em cache."""
+    return hashlib.blake2b(conteudo, digest_size=16).hexdigest()
+
+
+def _abaVazia(info: Tuple[pd.DataFrame, str] | None) -> bool:
+    """Indica se uma aba lida do cache está ausente ou vazia."""
+    return info is None or info[0].empty
+
+
+def _posicoesPorChave(
+    df: pd.DataFrame, coluna: str
+) -> Dict[Hashable, np.ndarray]:  # noqa E501
+    """Retorna as posições das linhas de cada valor de uma coluna.
+
+    Args:
+        df: Dataframe agrupado
+        coluna: Coluna com as chaves
+
+    Returns:
+        posicoes: Dicionário da chave, na ordem em que aparece \
+            no Dataframe, para as posições das suas linhas
+    """
+    grupos = df.groupby(coluna, observed=True, sort=False).indices
+    return {chave: grupos[chave] for chave in df[coluna].unique()}
+
+
+class _MapeamentoSobDemanda(Mapping):
+    """Mapeamento somente leitura com valores montados no primeiro acesso.
+
+    Indexar milhares de escolas não custa uma cópia antecipada \
+        por escola, só a de cada escola consultada.
+    """
+
+    def __init__(
+        self,
+        chaves: Iterable[Hashable],
+        monta: Callable[[Hashable], Any],
+        versao: str | None = None,
+    ) -> None:
+        """Instancia o mapeamento sem montar nenhum valor.
+
+        Args:
+            chaves: Chaves do mapeamento, na ordem de iteração
+            monta: Função que recebe uma chave e monta o seu valor
+            versao: Versão dos dados de origem dos valores
+        """
+        self.versao = versao
+        self._chaves = dict.fromkeys(chaves)
+        self._monta = monta
+        self._valores: Dict[Hashable, Any] = {}
+
+    def __getitem__(self, chave: Hashable) -> Any:
+        """Retorna o valor da chave, montando-o no primeiro acesso."""
+        if chave not in self._chaves:
+            raise KeyError(chave)
+        if chave not in self._valores:
+            self._valores.setdefault(chave, self._monta(chave))
+        return self._valores[chave]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """Percorre as chaves na ordem em que foram informadas."""
+        return iter(self._chaves)
+
+    def __len__(self) -> int:
+        """Retorna a quantidade de chaves."""
+        return len(self._chaves)
+
+
+def nomesAbasIdeb(anoIdeb: int) -> Tuple[str, str]:
+    """Retorna os nomes das abas de notas e metas do IDEB.
+
+    Args:
+        anoIdeb: Ano da classe que prestou a avaliação
+
+    Returns:
+        nomesAbas: Nome da aba de notas e nome da aba de metas
+    """
+    # Ajuste tecnico
+    if anoIdeb == 5:
+        return f"IDEB {anoIdeb}° ANO", f"META IDEB {anoIdeb}º ANO"
+
+    return f"IDEB {anoIdeb}° ANO", f"META IDEB {anoIdeb}° ANO"
+
+
+# Abas da planilha com os dados cadastrais das escolas
+ABAS_ESCOLAS = ["Dados das Escolas", "Quantidade de Alunos por Escola"]
+
+# Abas da planilha utilizadas pelo portal
+ABAS_PORTAL = (
+    *ABAS_ESCOLAS,
+    *nomesAbasIdeb(5),
+    *nomesAbasIdeb(9),
+)
+
+# Versao dos tipos das colunas dos resultados derivados. Faz parte da
+# chave para que resultados antigos no Redis nao sejam reaproveitados
+VERSAO_DERIVADOS = 2
+
 
 class DriveProcessor:
     """Essa classe contém métodos de extracao \
         e tratamento de dados do projeto."""
 
-    def __init__(self, caminhoCredenciais: Path, redisUrl: str) -> None:
+    def __init__(
+        self,
+        caminhoCredenciais: Path,
+        redisUrl: str,
+        tamanhoCacheLocal: int = 64 * 1024 * 1024,
+        maxConexoesRedis: int = 20,
+        importacaoEmLote: bool = True,
+        tempoTrava: int = 30,
+        esperaTrava: float = 5,
+        ttlMaximo: int | None = None,
+        tamanhoCacheDerivados: int = 32 * 1024 * 1024,
+        derivadosNoRedis: bool = True,
+        diretorioSnapshot: Path | None = None,
+        maxThreadsPreCarga: int = 4,
+        idPlanilha: str | None = None,
+        clienteRedis: redis.Redis | None = None,
+        executorPreCarga: ThreadPoolExecutor | None = None,
+        requisicoesGooglePorMinuto: int | None = None,
+    ) -> None:
         """Instancia o ponto de entrada do projeto.
 
         Args:
@@ -28,18 +161,143 @@ class DriveProcessor:
             json que possui suas credenciais de acesso \
             pela conta de serviço do Google
             redisUrl: URL do banco redis para cacheamento
+            tamanhoCacheLocal: Limite em bytes do cache em memória \
+            que fica na frente do Redis
+            maxConexoesRedis: Tamanho máximo do pool de conexões \
+            compartilhado com o Redis
+            importacaoEmLote: Se verdadeiro, uma falta de cache busca \
+            junto todas as abas do portal ausentes do cache
+            tempoTrava: Tempo máximo, em segundos, que a trava de \
+            importação no Redis fica com um único processo
+            esperaTrava: Tempo máximo, em segundos, que uma chamada \
+            espera outra terminar a mesma importação antes de servir \
+            o último valor conhecido. Sem valor anterior a espera \
+            vai até o tempoTrava
+            ttlMaximo: Tempo de vida máximo das abas no Redis. Quando \
+            maior que o TTL, abas vencidas continuam sendo servidas \
+            enquanto são atualizadas em segundo plano. Por padrão \
+            usa a variável TTL_MAXIMO ou, na falta dela, o TTL
+            tamanhoCacheDerivados: Limite em bytes do cache em memória \
+            dos resultados calculados a partir das abas
+            derivadosNoRedis: Se verdadeiro, os resultados calculados \
+            também são compartilhados entre processos pelo Redis
+            diretorioSnapshot: Diretório de um snapshot local. Quando \
+            informado, as abas são lidas apenas dele, sem Google e \
+            sem Redis. Por padrão usa a variável DIRETORIO_SNAPSHOT
+            maxThreadsPreCarga: Número máximo de threads usadas \
+            pelo preCarrega para resolver os dados em paralelo
+            idPlanilha: O id da planilha servida. As chaves no Redis \
+            levam esse id como prefixo. Por padrão usa a variável \
+            ID_PLANILHA
+            clienteRedis: Cliente Redis já conectado, para compartilhar \
+            o pool de conexões entre processadores de várias planilhas
+            executorPreCarga: Pool de threads do preCarrega, também \
+            compartilhável entre processadores
+            requisicoesGooglePorMinuto: Cota de requisições ao Google \
+            por minuto, somando todas as réplicas. Por padrão usa a \
+            variável COTA_GOOGLE ou, na falta dela, 60
 
         Returns:
             conexaoGoogleDrive: Uma instância de conexão \
             com o Google drive, podendo importar \
             conteúdos do mesmo
         """
+        if diretorioSnapshot is None and os.getenv("DIRETORIO_SNAPSHOT"):
+            diretorioSnapshot = Path(os.getenv("DIRETORIO_SNAPSHOT"))
+        self.snapshot = (
+            SnapshotLocal(diretorioSnapshot) if diretorioSnapshot else None
+        )  # noqa E501
+
+        self.idPlanilha = idPlanilha or os.getenv("ID_PLANILHA")
+        # Prefixo que separa as chaves de cada planilha no mesmo Redis
+        self._prefixo = f"planilha:{self.idPlanilha}:"
+
         self._redisUrl = redisUrl
+        # Cliente com pool de conexoes persistente, seguro entre threads
+        if clienteRedis is None and self.snapshot is None:
+            clienteRedis = redis.from_url(
+                redisUrl, max_connections=maxConexoesRedis
+            )  # noqa E501
+        self._redis = clienteRedis if self.snapshot is None else None
         self.ttl = int(os.getenv("TTL"))
-        self._instanciaGoogle = gspread.service_account(
-            filename=caminhoCredenciais
+        if ttlMaximo is None:
+            ttlMaximo = int(os.getenv("TTL_MAXIMO", self.ttl))
+        self.ttlMaximo = max(ttlMaximo, self.ttl)
+        self.importacaoEmLote = importacaoEmLote
+        self.tempoTrava = tempoTrava
+        self.esperaTrava = esperaTrava
+
+        # A autenticacao no Google so acontece na primeira busca real
+        self._caminhoCredenciais = caminhoCredenciais
+        self._clienteGoogle: gspread.Client | None = None
+        self._travaGoogle = threading.Lock()
+
+        # Cota do Google compartilhada pelas replicas atraves do Redis
+        if requisicoesGooglePorMinuto is None:
+            requisicoesGooglePorMinuto = int(os.getenv("COTA_GOOGLE", 60))
+        self.cotaGoogle = (
+            CotaGoogle(self._redis, requisicoesGooglePorMinuto)
+            if self._redis is not None
+            else None
+        )
+
+        # Cache em memoria das abas ja decodificadas
+        self.cacheLocal = CacheLocal(
+            tamanhoMaximo=tamanhoCacheLocal, ttl=self.ttl
         )  # noqa E501
 
+        # Trava local que garante uma unica importacao da planilha
+        self._travaImportacao = threading.Lock()
+        self._travaTravas = threading.Lock()
+        self._revalidando = False
+
+        # Versoes das abas da ultima pre-carga de cada conjunto de abas
+        self._versoesPreCarga: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+        # Versao (hash do conteudo) de cada aba lida, usada para saber
+        # quando os dados derivados precisam ser reconstruidos
+        self._versoesAbas: Dict[str, str] = {}
+
+        # Resultados calculados a partir das abas, chaveados pelo hash
+        # das abas de origem e por isso validos enquanto elas nao mudam
+        self.cacheDerivados = CacheLocal(
+            tamanhoMaximo=tamanhoCacheDerivados, ttl=self.ttlMaximo
+        )  # noqa E501
+        self.derivadosNoRedis = derivadosNoRedis and self.snapshot is None
+
+        # Pool limitado, compartilhado pelas pré-cargas de todas as sessões
+        self._executorPreCarga = executorPreCarga or ThreadPoolExecutor(
+            max_workers=maxThreadsPreCarga, thread_name_prefix="preCarga"
+        )  # noqa E501
+
+    def _chave(self, nome: str) -> str:
+        """Retorna a chave no Redis de um item da planilha do processador.
+
+        Args:
+            nome: Nome da aba ou do resultado derivado
+
+        Returns:
+            chave: Nome prefixado pelo id da planilha
+        """
+        return self._prefixo + nome
+
+    @property
+    def _instanciaGoogle(self) -> gspread.Client:
+        """Retorna o cliente do Google, autenticando no primeiro uso.
+
+        Returns:
+            conexaoGoogleDrive: Uma instância de conexão \
+            com o Google drive, podendo importar \
+            conteúdos do mesmo
+        """
+        if self._clienteGoogle is None:
+            with self._travaGoogle:
+                if self._clienteGoogle is None:
+                    self._clienteGoogle = gspread.service_account(
+                        filename=self._caminhoCredenciais
+                    )
+        return self._clienteGoogle
+
     def redisDump(self, key: str, data: List[Dict[str, Any]]) -> None:
         """Armazena um dado em Cache.
 
@@ -50,13 +308,107 @@ class DriveProcessor:
         Returns:
             None: Insere o dado em cache do Redis
         """
-        with redis.from_url(self._redisUrl) as client:
-            client.setex(name=key, value=json.dumps(data), time=self.ttl)
-            client.set
+        self._armazenaAbas({key: data})
+
+    def _armazenaAbas(
+        self, abas: Dict[str, List[Dict[str, Any]]]
+    ) -> Dict[str, Tuple[pd.DataFrame, str]]:  # noqa E501
+        """Armazena várias abas no Redis, em um único pipeline, \
+            e no cache local.
+
+        As abas são gravadas no formato binário colunar e o \
+            cache local recebe o Dataframe lido desses mesmos bytes. \
+            Abas com o mesmo conteúdo já presente no cache local \
+            não são regravadas, apenas têm o prazo renovado.
+
+        Args:
+            abas: Dicionário da chave para os registros da aba
+
+        Returns:
+            versao: Hash do conteúdo armazenado
+        """
+        with METRICAS.etapa("serializa"):
+            brutos = {
+                key: formato.serializaAba(dados) for key, dados in abas.items()
+            }  # noqa E501
+
+        inalteradas = {}
+        for key, bruto in brutos.items():
+            anterior = self.cacheLocal.obter(key, aceitaExpirado=True)
+            if anterior is not None and anterior[1] == _hashConteudo(bruto):
+                inalteradas[key] = anterior
+
+        with METRICAS.etapa("redis_set"):
+            pipeline = self._redis.pipeline(transaction=False)
+            for key in inalteradas:
+                pipeline.expire(self._chave(key), self.ttlMaximo)
+            renovadas = pipeline.execute()
+
+            # A renovacao falha quando a chave ja saiu do Redis
+            for key, renovada in zip(list(inalteradas), renovadas):
+                if not renovada:
+                    del inalteradas[key]
+
+            for key, bruto in brutos.items():
+                if key not in inalteradas:
+                    METRICAS.tamanho("redis_escrita", len(bruto))
+                    pipeline.setex(
+                        name=self._chave(key), value=bruto, time=self.ttlMaximo
+                    )  # noqa E501
+            pipeline.execute()
+
+        regravadas = len(brutos) - len(inalteradas)
+        METRICAS.cache("conteudo", len(inalteradas), regravadas)
+        armazenadas = {}
+        for key, bruto in brutos.items():
+            if key in inalteradas:
+                armazenadas[key] = self._renovaLocal(key, inalteradas[key])
+            else:
+                armazenadas[key] = self._guardaLocal(key, bruto, self.ttl)
+        return armazenadas
+
+    def _renovaLocal(
+        self, key: str, info: Tuple[pd.DataFrame, str]
+    ) -> Tuple[pd.DataFrame, str]:  # noqa E501
+        """Devolve ao cache local, com prazo novo, uma aba já decodificada.
+
+        Args:
+            key: Chave da aba
+            info: Tupla com o Dataframe e o hash do conteúdo
+
+        Returns:
+            aba: A mesma tupla recebida
+        """
+        self.cacheLocal.armazenar(
+            key,
+            info,
+            tamanho=int(info[0].memory_usage(deep=True).sum()),
+            ttl=self.ttl,
+        )
+        return info
+
+    def _guardaLocal(
+        self, key: str, bruto: bytes, ttl: float
+    ) -> Tuple[pd.DataFrame, str]:  # noqa E501
+        """Decodifica uma aba e a coloca no cache local.
+
+        Args:
+            key: Chave da aba
+            bruto: Bytes da aba como armazenados no Redis
+            ttl: Tempo de vida do item no cache local
 
-        pass
+        Returns:
+            aba: Tupla com o Dataframe e o hash do conteúdo
+        """
+        with METRICAS.etapa("desserializa"):
+            df = formato.desserializaAba(bruto)
+            info = (df, _hashConteudo(bruto))
+        self.cacheLocal.armazenar(
+            key, info, tamanho=int(df.memory_usage(deep=True).sum()), ttl=ttl
+        )
+        return info
 
-    def redisRetrieve(self, key: str) -> Dict | None:
+    def redisRetrieve(self, key: str) -> List[Dict[str, Any]] | None:
         """Retorna um valor armazenado no Redis.
 
         Args:
@@ -65,336 +417,1245 @@ class DriveProcessor:
         Returns:
             valor: O valor da chave correspondente
         """
-        with redis.from_url(self._redisUrl) as client:
-            info = client.get(name=key)
+        info = self._recuperaAba(key)
 
         if info is None:
             return None
 
-        return json.loads(info)
+        return info[0].to_dict(orient="records")
+
+    def redisRetrieveVarios(self, keys: List[str]) -> Dict[str, Any]:
+        """Retorna vários valores do Redis em uma única ida ao servidor.
+
+        Args:
+            keys: Chaves dos valores procurados
+
+        Returns:
+            valores: Dicionário da chave para o valor \
+                correspondente ou None caso não exista
+        """
+        return {
+            key: None if info is None else info[0].to_dict(orient="records")
+            for key, info in self._recuperaAbas(keys).items()
+        }
+
+    def _recuperaAbas(
+        self, keys: List[str], vencidas: Set[str] | None = None
+    ) -> Dict[str, Tuple[pd.DataFrame, str] | None]:  # noqa E501
+        """Retorna abas do cache local ou, na falta, do Redis.
+
+        As chaves ausentes do cache local são buscadas juntas \
+            em um único pipeline. O valor decodificado é \
+            compartilhado entre as chamadas e não deve ser alterado.
+
+        Args:
+            keys: Chaves dos valores procurados
+            vencidas: Conjunto que recebe as chaves servidas \
+                do Redis que já passaram do TTL
+
+        Returns:
+            abas: Dicionário da chave para uma tupla com o \
+                Dataframe e o hash do conteúdo ou None \
+                caso a chave não exista
+        """
+        abas = {key: self.cacheLocal.obter(key) for key in keys}
+        faltantes = [key for key, info in abas.items() if info is None]
+        METRICAS.cache("local", len(keys) - len(faltantes), len(faltantes))
+        if not faltantes:
+            return abas
+
+        with METRICAS.etapa("redis_get"):
+            pipeline = self._redis.pipeline(transaction=False)
+            for key in faltantes:
+                pipeline.get(self._chave(key)).ttl(self._chave(key))
+            respostas = pipeline.execute()
+
+        encontrados = [bruto for bruto in respostas[::2] if bruto is not None]
+        METRICAS.cache(
+            "redis", len(encontrados), len(faltantes) - len(encontrados)
+        )  # noqa E501
+        for bruto in encontrados:
+            METRICAS.tamanho("redis_leitura", len(bruto))
+
+        for key, bruto, ttlRestante in zip(
+            faltantes, respostas[::2], respostas[1::2]
+        ):  # noqa E501
+            if bruto is None:
+                continue
+
+            # O item local nao deve sobreviver ao vencimento no Redis
+            ttlLocal = self.ttl
+            if ttlRestante > 0:
+                ttlLocal = ttlRestante - (self.ttlMaximo - self.ttl)
+
+            # Item vencido fica pouco tempo local ate ser revalidado
+            if ttlLocal <= 0:
+                if vencidas is not None:
+                    vencidas.add(key)
+                ttlLocal = self.esperaTrava
+            abas[key] = self._guardaLocal(key, bruto, ttlLocal)
+
+        return abas
+
+    def _recuperaAba(self, key: str) -> Tuple[pd.DataFrame, str] | None:
+        """Retorna uma aba do cache local ou, na falta, do Redis.
 
+        Args:
+            key: Chave do valor procurado
+
+        Returns:
+            aba: Tupla com o Dataframe e o hash do \
+                conteúdo ou None caso a chave não exista
+        """
+        return self._recuperaAbas([key])[key]
+
+    @METRICAS.cronometra("importaPlanilhaPorAba")
     def importaPlanilhaPorAba(
-        self, idPLanilha: str, nomeAbaPlanilha: str
+        self, idPlanilha: str, nomeAbaPlanilha: str | None = None
     ) -> List[Dict[str, Any]]:  # noqa E501
         """Retorna um Objeto com o conteúdo de uma \
             planilha Google sheets compartilhada \
             no Google drive.
 
+        O id é opcional e, quando informado, precisa ser o \
+            do próprio processador, já que as chaves do Redis \
+            são separadas por planilha.
+
         Args:
-            idPLanilha: O id da planilha que você deseja importar
+            idPlanilha: O id da planilha, ou o nome da aba quando \
+                chamado com um único argumento
             nomeAbaPlanilha: Nome da aba desejada da planilha
 
         Returns:
             dadosPLanilha: dados da planilha importada
+
+        Raises:
+            ValueError: Se o id for diferente do id do processador
         """
-        dados = self.redisRetrieve(nomeAbaPlanilha)
-        if not dados:
-            planilha = self._instanciaGoogle.open_by_key(idPLanilha)
-            aba = planilha.worksheet(nomeAbaPlanilha)
-
-            dados = aba.get_all_records()
-            colunasCorrigidas = [
-                {
-                    chave.replace("\n", " "): valor
-                    for chave, valor in linha.items()  # noqa E501
-                }  # noqa E501
-                for linha in dados
-            ]
+        if nomeAbaPlanilha is None:
+            nomeAbaPlanilha = idPlanilha
+        elif idPlanilha != self.idPlanilha:
+            raise ValueError(
+                f"O processador é da planilha {self.idPlanilha}, "
+                f"não de {idPlanilha}"
+            )
+        return self.importaPlanilhaPorAbas([nomeAbaPlanilha])[nomeAbaPlanilha]
+
+    def importaPlanilhaPorAbas(
+        self, nomesAbas: List[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:  # noqa E501
+        """Retorna o conteúdo de várias abas de uma planilha.
 
-            self.redisDump(key=nomeAbaPlanilha, data=colunasCorrigidas)
-            return colunasCorrigidas
+        Args:
+            nomesAbas: Nomes das abas desejadas da planilha
 
-        return dados
+        Returns:
+            dadosPlanilha: Dicionário do nome da aba para os seus dados
+        """
+        return {
+            nome: df.to_dict(orient="records")
+            for nome, df in self.importaAbasDataFrame(nomesAbas).items()
+        }
 
-    def dadosEscola(self, nomeEscola: str) -> List[Dict[Any, Any]]:
-        """Retorna uma lista de dicionários \
-            com as infromações da escola filtrada.
+    def importaAbasDataFrame(
+        self, nomesAbas: List[str]
+    ) -> Dict[str, pd.DataFrame]:  # noqa E501
+        """Retorna o conteúdo de várias abas de uma planilha em Dataframes.
+
+        As abas em cache são lidas em uma única ida ao Redis e \
+            as ausentes são buscadas juntas em uma única \
+            requisição ao Google. Os Dataframes são compartilhados \
+            entre as chamadas e não devem ser alterados.
 
         Args:
-            nomeEscola: Nome da escola que se deseja puxar as informações
+            nomesAbas: Nomes das abas desejadas da planilha
 
         Returns:
-            dadosEscola: Retorna uma lista com 2 \
-            objetos contendo os dados da escola e quantidade de alunos
+            dadosPlanilha: Dicionário do nome da aba para o seu Dataframe
         """
-        dadosEscolas = self.importaPlanilhaPorAba(
-            os.getenv("ID_PLANILHA"), "Dados das Escolas"
-        )
+        abas = self._importaAbasComVersao(nomesAbas)
+        return {nome: df for nome, (df, _) in abas.items()}
 
-        dfEscolas = pd.DataFrame(dadosEscolas)
+    def _importaAbasComVersao(
+        self, nomesAbas: List[str]
+    ) -> Dict[str, Tuple[pd.DataFrame, str]]:  # noqa E501
+        """Retorna várias abas de uma planilha junto com suas versões.
 
-        # tratamento basico da planilha
-        # Ajuste Endereço
-        dfEscolas["ENDEREÇO"] = dfEscolas["ENDEREÇO"].str.replace(  # noqa E501
-            "\n", ", "
-        )  # noqa E502
-
-        # remocao de quebra de linha no DF Inteiro
-        dfEscolas.replace(" \n", " ", regex=True, inplace=True)
-        dfEscolas.replace("\n", "", regex=True, inplace=True)
-
-        # Criando coluna de obervacoes do atendimento e atualizando df
-        def extrairObservacoes(linha: pd.Series) -> Union[str, None]:
-            observacoes = []
-            if "*" in linha["ATENDIMENTO"]:
-                observacoes = [
-                    obs.strip() for obs in linha["ATENDIMENTO"].split("*")[1:]
+        Args:
+            nomesAbas: Nomes das abas desejadas da planilha
+
+        Returns:
+            abas: Dicionário do nome da aba para uma tupla com \
+                o Dataframe e o hash do conteúdo
+        """
+        if self.snapshot is not None:
+            with METRICAS.etapa("snapshot"):
+                abas = {nome: self.snapshot.leAba(nome) for nome in nomesAbas}
+            for nomeAbaPlanilha, (_, versao) in abas.items():
+                self._versoesAbas[nomeAbaPlanilha] = versao
+            return abas
+
+        vencidas: Set[str] = set()
+        abas = self._recuperaAbas(nomesAbas, vencidas)
+        faltantes = [
+            nome for nome, info in abas.items() if _abaVazia(info)
+        ]  # noqa E501
+
+        if vencidas:
+            self._revalidaEmSegundoPlano(sorted(vencidas))
+
+        if faltantes:
+            # Aproveita a mesma requisicao para as demais abas do portal
+            if self.importacaoEmLote:
+                extras = [nome for nome in ABAS_PORTAL if nome not in abas]
+                faltantes += [
+                    nome
+                    for nome, info in self._recuperaAbas(extras).items()
+                    if _abaVazia(info)
                 ]
-            return ", ".join(observacoes) if observacoes else None
 
-        # Adicionando coluna com a observacao do atendimento
-        dfEscolas["OBS. ATENDIMENTO"] = dfEscolas.apply(
-            extrairObservacoes, axis=1
-        )  # noqa E501
+            abas.update(self._importaExclusivo(faltantes))
 
-        # Ajustando coluna de atendimento
-        dfEscolas["ATENDIMENTO"] = (
-            dfEscolas["ATENDIMENTO"].str.split("*").str[0].str.strip()  # noqa E501
-        )
+        for nomeAbaPlanilha in nomesAbas:
+            self._versoesAbas[nomeAbaPlanilha] = abas[nomeAbaPlanilha][1]
+
+        return {nome: abas[nome] for nome in nomesAbas}
+
+    @METRICAS.cronometra("preCarrega")
+    def preCarrega(
+        self,
+        nomesAbas: Sequence[str] = ABAS_PORTAL,
+        tarefas: Sequence[Callable[[], Any]] = (),
+        apenasNovaVersao: bool = False,
+    ) -> Dict[str, pd.DataFrame]:
+        """Resolve de uma vez os dados que uma página vai usar.
+
+        Todas as abas são lidas em uma única ida ao Redis e as \
+            ausentes em uma única requisição ao Google. Depois, \
+            as tarefas, normalmente os cálculos derivados da \
+            página, rodam em paralelo no pool de threads. Assim \
+            as chamadas feitas em seguida pela página já \
+            encontram tudo em cache.
+
+        Args:
+            nomesAbas: Abas necessárias, por padrão todas \
+                as abas utilizadas pelo portal
+            tarefas: Funções sem argumentos executadas em \
+                paralelo depois de carregar as abas
+            apenasNovaVersao: Se verdadeiro, as tarefas só rodam \
+                quando as abas mudaram desde a última pré-carga \
+                delas. Evita ocupar o pool a cada reexecução de \
+                uma página com os resultados já em cache
+
+        Returns:
+            dadosPlanilha: Dicionário do nome da aba para o seu Dataframe
+        """
+        abas = self._importaAbasComVersao(list(nomesAbas))
+
+        chave = tuple(nomesAbas)
+        versoes = tuple(versao for _, versao in abas.values())
+        if apenasNovaVersao:
+            with self._travaTravas:
+                if self._versoesPreCarga.get(chave) == versoes:
+                    tarefas = ()
+                else:
+                    self._versoesPreCarga[chave] = versoes
+
+        futuros = [self._executorPreCarga.submit(tarefa) for tarefa in tarefas]
+        try:
+            for futuro in futuros:
+                futuro.result()
+        except Exception:
+            # Uma pre-carga que falhou deve ser repetida na proxima vez
+            with self._travaTravas:
+                if self._versoesPreCarga.get(chave) == versoes:
+                    del self._versoesPreCarga[chave]
+            raise
+
+        return {nome: df for nome, (df, _) in abas.items()}
+
+    def _revalidaEmSegundoPlano(self, nomesAbas: List[str]) -> None:
+        """Atualiza abas vencidas em uma thread sem bloquear a chamada.
+
+        Apenas uma atualização roda por vez no processo e, \
+            entre réplicas, só quem obtiver a trava no Redis \
+            busca no Google.
+
+        Args:
+            nomesAbas: Nomes das abas vencidas
+        """
+        with self._travaTravas:
+            if self._revalidando:
+                return
+            self._revalidando = True
+
+        def revalida() -> None:
+            try:
+                travaRedis = self._redis.lock(
+                    f"trava:{self.idPlanilha}", timeout=self.tempoTrava
+                )  # noqa E501
+                if not travaRedis.acquire(blocking=False):
+                    return
+
+                try:
+                    self.importaPlanilhaCompleta(nomesAbas)
+                finally:
+                    try:
+                        travaRedis.release()
+                    except redis.exceptions.LockError:
+                        pass
+            except Exception:
+                logger.exception("Falha ao revalidar as abas %s", nomesAbas)
+            finally:
+                with self._travaTravas:
+                    self._revalidando = False
+
+        threading.Thread(target=revalida, daemon=True).start()
+
+    def atualizaAbas(
+        self, nomesAbas: Sequence[str] = ABAS_PORTAL
+    ) -> Dict[str, Tuple[pd.DataFrame, str]]:  # noqa E501
+        """Atualiza as abas no cache mesmo que ainda estejam válidas.
+
+        Só a réplica que obtém a trava do Redis de imediato busca \
+            no Google. As demais esperam a atualização terminar e \
+            leem as abas do cache.
+
+        Args:
+            nomesAbas: Nomes das abas desejadas, por padrão \
+                todas as abas utilizadas pelo portal
+
+        Returns:
+            abas: Dicionário do nome da aba para uma tupla com \
+                o Dataframe e o hash do conteúdo
+        """
+        return self._importaExclusivo(list(nomesAbas), forcar=True)
+
+    def _importaExclusivo(
+        self, nomesAbas: List[str], forcar: bool = False
+    ) -> Dict[str, Tuple[pd.DataFrame, str]]:  # noqa E501
+        """Importa abas garantindo que apenas uma chamada busque no Google.
+
+        Dentro do processo as chamadas concorrentes esperam em \
+            uma trava local e, entre réplicas, em uma trava no \
+            Redis. Quem espera relê o cache ao receber a vez e, \
+            se a espera esgotar, usa o último valor conhecido ou, \
+            sem ele, continua esperando a trava do Redis.
+
+        Args:
+            nomesAbas: Nomes das abas ausentes do cache
+            forcar: Se verdadeiro, quem obtém a trava do Redis de \
+                imediato busca todas as abas, mesmo as que estão \
+                em cache
+
+        Returns:
+            abas: Dicionário do nome da aba para uma tupla com \
+                o Dataframe e o hash do conteúdo
+        """
+
+        def releCache() -> Tuple[Dict[str, Any], List[str]]:
+            abas = self._recuperaAbas(nomesAbas)
+            faltantes = [
+                nome for nome, info in abas.items() if _abaVazia(info)
+            ]  # noqa E501
+            return abas, faltantes
+
+        if not self._travaImportacao.acquire(timeout=self.esperaTrava):
+            return self._importaSemTrava(*releCache())
+
+        try:
+            abas, faltantes = releCache()
+            if not faltantes and not forcar:
+                return abas
+
+            travaRedis = self._redis.lock(
+                f"trava:{self.idPlanilha}",
+                timeout=self.tempoTrava,
+                blocking_timeout=self.esperaTrava,
+            )
+            # Quem espera outra atualizacao so rele o que ela gravou
+            atualiza = forcar and travaRedis.acquire(blocking=False)
+            if not atualiza and not travaRedis.acquire():
+                return self._importaSemTrava(*releCache())
+
+            try:
+                abas, faltantes = releCache()
+                if atualiza:
+                    faltantes = list(nomesAbas)
+                if faltantes:
+                    abas.update(
+                        self._importaOuUltimoValor(faltantes, atualiza)
+                    )  # noqa E501
+                return abas
+            finally:
+                try:
+                    travaRedis.release()
+                except redis.exceptions.LockError:
+                    # A trava expirou durante a importacao
+                    pass
+        finally:
+            self._travaImportacao.release()
+
+    def _importaOuUltimoValor(
+        self, nomesAbas: List[str], registraRevisao: bool = False
+    ) -> Dict[str, Tuple[pd.DataFrame, str]]:  # noqa E501
+        """Busca abas no Google e, se a busca falhar, usa o último valor.
+
+        Quando a cota esgota ou o Google segue falhando depois \
+            das novas tentativas, as abas que ainda têm um valor \
+            vencido no cache local continuam sendo servidas.
+
+        Args:
+            nomesAbas: Nomes das abas ausentes do cache
+            registraRevisao: Repassado a importaPlanilhaCompleta
 
-        dadosEscolaFiltrada = dfEscolas[
-            dfEscolas["ESCOLA"] == nomeEscola
-        ].copy()  # noqa E501
+        Returns:
+            abas: Dicionário do nome da aba para uma tupla com \
+                o Dataframe e o hash do conteúdo
+        """
+        try:
+            return self.importaPlanilhaCompleta(nomesAbas, registraRevisao)
+        except Exception:
+            anteriores = {
+                nome: self.cacheLocal.obter(nome, aceitaExpirado=True)
+                for nome in nomesAbas
+            }
+            if any(_abaVazia(info) for info in anteriores.values()):
+                raise
+
+            METRICAS.incrementa("google_ultimo_valor_total")
+            logger.warning(
+                "Falha ao buscar as abas %s, servindo o último valor",
+                nomesAbas,
+                exc_info=True,
+            )
+            return anteriores
+
+    def _importaSemTrava(
+        self,
+        abas: Dict[str, Any],
+        faltantes: List[str],
+    ) -> Dict[str, Tuple[pd.DataFrame, str]]:  # noqa E501
+        """Completa as abas faltantes quando a espera pela trava esgota.
+
+        As abas com valor anterior são servidas na hora. Para as \
+            demais a chamada espera a trava do Redis até o \
+            tempoTrava, quando ela expira mesmo que quem a segura \
+            ainda esteja esperando a cota do Google, e só busca o \
+            que continuar ausente do cache.
 
-        # Estabelecendo dados padrões da escola
-        dictDadosEscolaFiltrada = dadosEscolaFiltrada.iloc[0].to_dict()
+        Args:
+            abas: Abas já lidas do cache
+            faltantes: Nomes das abas ainda ausentes do cache
 
-        # Importar dados de quantidade de alunos
-        alunosEscolas = self.importaPlanilhaPorAba(
-            os.getenv("ID_PLANILHA"), "Quantidade de Alunos por Escola"
+        Returns:
+            abas: Dicionário do nome da aba para uma tupla com \
+                o Dataframe e o hash do conteúdo
+        """
+        semValor = []
+        for nome in faltantes:
+            anterior = self.cacheLocal.obter(nome, aceitaExpirado=True)
+            if not _abaVazia(anterior):
+                abas[nome] = anterior
+            else:
+                semValor.append(nome)
+
+        if not semValor:
+            return abas
+
+        travaRedis = self._redis.lock(
+            f"trava:{self.idPlanilha}",
+            timeout=self.tempoTrava,
+            blocking_timeout=self.tempoTrava,
         )
+        obtida = travaRedis.acquire()
+        try:
+            recuperadas = self._recuperaAbas(semValor)
+            ausentes = [
+                nome for nome, info in recuperadas.items() if _abaVazia(info)
+            ]  # noqa E501
+            abas.update(recuperadas)
+
+            # Sem valor anterior, melhor buscar do que falhar
+            if ausentes:
+                abas.update(self.importaPlanilhaCompleta(ausentes))
+            return abas
+        finally:
+            if obtida:
+                try:
+                    travaRedis.release()
+                except redis.exceptions.LockError:
+                    # A trava expirou durante a importacao
+                    pass
+
+    def importaPlanilhaCompleta(
+        self,
+        nomesAbas: Sequence[str] = ABAS_PORTAL,
+        registraRevisao: bool = False,
+    ) -> Dict[str, Tuple[pd.DataFrame, str]]:  # noqa E501
+        """Busca várias abas no Google e atualiza o cache de todas.
+
+        A planilha é aberta uma única vez e todas as abas são \
+            lidas em uma única requisição de valores em lote. A \
+            revisão da planilha no Drive só é consultada quando as \
+            abas ainda estão no Redis e podem ter o prazo renovado.
 
-        dfAlunosEscolas = pd.DataFrame(alunosEscolas)
+        Args:
+            nomesAbas: Nomes das abas desejadas, por padrão \
+                todas as abas utilizadas pelo portal
+            registraRevisao: Se verdadeiro, consulta a revisão \
+                mesmo com as abas expiradas, para que a próxima \
+                atualização possa só renovar o prazo. Usado pelo \
+                aquecimento
 
-        alunosEscolasFiltrado = dfAlunosEscolas[
-            dfAlunosEscolas["ESCOLA"] == nomeEscola
-        ].copy()
+        Returns:
+            abas: Dicionário do nome da aba para uma tupla com \
+                o Dataframe e o hash do conteúdo
+        """
+        # Sem alteracao na planilha basta renovar o prazo do cache. Numa
+        # falta fria nao ha o que renovar e a consulta ao Drive seria
+        # uma requisicao a mais
+        revisao = None
+        if registraRevisao or self._abasNoRedis(nomesAbas):
+            revisao = self._revisaoPlanilha()
+            if revisao is not None:
+                inalteradas = self._renovaSeInalterada(nomesAbas, revisao)
+                if inalteradas is not None:
+                    return inalteradas
+
+        intervalos = [
+            "'{}'".format(nome.replace("'", "''")) for nome in nomesAbas
+        ]  # noqa E501
+
+        def buscaValores() -> Dict[str, Any]:
+            planilha = self._instanciaGoogle.open_by_key(self.idPlanilha)
+            return planilha.values_batch_get(ranges=intervalos)
+
+        with METRICAS.etapa("google"):
+            # Abrir a planilha e ler os valores sao duas requisicoes
+            resposta = (
+                buscaValores()
+                if self.cotaGoogle is None
+                else self.cotaGoogle.executa(buscaValores, custo=2)
+            )
+
+        abas: Dict[str, List[Dict[str, Any]]] = {}
+        with METRICAS.etapa("registros"):
+            for nomeAbaPlanilha, intervalo in zip(
+                nomesAbas, resposta.get("valueRanges", [])
+            ):  # noqa E501
+                valores = intervalo.get("values", [])
+                if not valores:
+                    abas[nomeAbaPlanilha] = []
+                    continue
+
+                # Mesmo tratamento do get_all_records do gspread
+                cabecalho = [
+                    chave.replace("\n", " ") for chave in valores[0]
+                ]  # noqa E501
+                linhas = [
+                    numericise_all(
+                        (linha + [""] * len(cabecalho))[: len(cabecalho)]
+                    )  # noqa E501
+                    for linha in valores[1:]
+                ]
+                abas[nomeAbaPlanilha] = to_records(cabecalho, linhas)
 
-        # Removendo coluna de total
-        alunosEscolasCalculo = alunosEscolasFiltrado.drop(
-            ["TOTAL DA ESCOLA", "ESTUDANTES COM DEFICIÊNCIA"], axis=1
+        armazenadas = self._armazenaAbas(abas)
+
+        if revisao is not None:
+            chaveRevisoes = f"revisoes:{self.idPlanilha}"
+            pipeline = self._redis.pipeline(transaction=False)
+            pipeline.hset(chaveRevisoes, mapping=dict.fromkeys(abas, revisao))
+            pipeline.expire(chaveRevisoes, self.ttlMaximo)
+            pipeline.execute()
+
+        return armazenadas
+
+    def _abasNoRedis(self, nomesAbas: Sequence[str]) -> bool:
+        """Verifica se todas as abas ainda estão no Redis.
+
+        Só nesse caso vale consultar a revisão no Drive, como na \
+            revalidação em segundo plano ou no aquecimento. Abas \
+            já expiradas precisam ser buscadas de qualquer forma.
+
+        Args:
+            nomesAbas: Nomes das abas que seriam buscadas
+
+        Returns:
+            abasNoRedis: Verdadeiro se nenhuma aba expirou
+        """
+        chaves = [self._chave(nome) for nome in nomesAbas]
+        if self._redis.exists(*chaves) == len(chaves):
+            return True
+
+        METRICAS.incrementa("revisao_total", resultado="ausente")
+        return False
+
+    def _revisaoPlanilha(self) -> str | None:
+        """Retorna a data da última alteração da planilha no Drive.
+
+        A consulta aos metadados é bem mais barata que a leitura \
+            dos valores e serve para saber se algo mudou. Ela \
+            também desconta da cota do Google.
+
+        Returns:
+            revisao: Data de modificação informada pelo Drive ou \
+                None caso a consulta não seja possível
+        """
+
+        def consultaMetadados() -> Dict[str, Any]:
+            clienteHttp = self._instanciaGoogle.http_client
+            return clienteHttp.get_file_drive_metadata(self.idPlanilha)
+
+        try:
+            with METRICAS.etapa("google_revisao"):
+                metadados = (
+                    consultaMetadados()
+                    if self.cotaGoogle is None
+                    else self.cotaGoogle.executa(consultaMetadados)
+                )
+            return metadados.get("modifiedTime")
+        except Exception:
+            logger.warning(
+                "Não foi possível consultar a revisão da planilha %s",
+                self.idPlanilha,
+                exc_info=True,
+            )
+            return None
+
+    def _renovaSeInalterada(
+        self, nomesAbas: Sequence[str], revisao: str
+    ) -> Dict[str, Tuple[pd.DataFrame, str]] | None:  # noqa E501
+        """Renova o prazo das abas se a planilha não mudou desde a leitura.
+
+        Args:
+            nomesAbas: Nomes das abas que seriam buscadas
+            revisao: Revisão atual da planilha no Drive
+
+        Returns:
+            abas: Dicionário do nome da aba para uma tupla com \
+                o Dataframe e o hash do conteúdo ou None caso \
+                alguma aba precise ser buscada de novo
+        """
+        chaveRevisoes = f"revisoes:{self.idPlanilha}"
+        revisoes = self._redis.hmget(chaveRevisoes, list(nomesAbas))
+        if any(anterior != revisao.encode() for anterior in revisoes):
+            METRICAS.incrementa("revisao_total", resultado="alterada")
+            return None
+
+        pipeline = self._redis.pipeline(transaction=False)
+        for nome in nomesAbas:
+            pipeline.expire(self._chave(nome), self.ttlMaximo)
+        if not all(pipeline.execute()):
+            METRICAS.incrementa("revisao_total", resultado="ausente")
+            return None
+        self._redis.expire(chaveRevisoes, self.ttlMaximo)
+
+        abas = {}
+        for nome in nomesAbas:
+            anterior = self.cacheLocal.obter(nome, aceitaExpirado=True)
+            if anterior is not None:
+                abas[nome] = self._renovaLocal(nome, anterior)
+
+        faltantes = [nome for nome in nomesAbas if nome not in abas]
+        if faltantes:
+            chaves = [self._chave(nome) for nome in faltantes]
+            for nome, bruto in zip(faltantes, self._redis.mget(chaves)):
+                if bruto is None:
+                    return None
+                abas[nome] = self._guardaLocal(nome, bruto, self.ttl)
+
+        METRICAS.incrementa("revisao_total", resultado="inalterada")
+        return abas
+
+    def exportaSnapshot(
+        self, diretorio: Path, nomesAbas: Sequence[str] = ABAS_PORTAL
+    ) -> Dict[str, Any]:  # noqa E501
+        """Grava as abas da planilha em um diretório de snapshot.
+
+        Args:
+            diretorio: Diretório do snapshot, criado se não existir
+            nomesAbas: Nomes das abas, por padrão todas as \
+                abas utilizadas pelo portal
+
+        Returns:
+            manifesto: Conteúdo do manifesto gravado
+        """
+        return exportaSnapshot(
+            self.importaPlanilhaPorAbas(list(nomesAbas)),
+            diretorio,
+            self.idPlanilha,
         )
 
-        # Unpivotando Colunas
-        alunosUnpivot = alunosEscolasCalculo.melt(
+    def versaoAba(self, nomeAbaPlanilha: str) -> str | None:
+        """Retorna a versão da última leitura de uma aba.
+
+        Args:
+            nomeAbaPlanilha: Nome da aba da planilha
+
+        Returns:
+            versao: Hash do conteúdo lido ou None caso a aba \
+                ainda não tenha sido importada
+        """
+        return self._versoesAbas.get(nomeAbaPlanilha)
+
+    def _resultadoDerivado(
+        self,
+        nomeFuncao: str,
+        argumentos: Tuple,
+        nomesAbas: List[str],
+        calcula: Callable[[Dict[str, pd.DataFrame]], Any],
+        monta: Callable[[Any, str], Any] | None = None,
+    ) -> Any:
+        """Retorna um resultado calculado a partir de abas da planilha.
+
+        O resultado é guardado pela função, pelos argumentos e \
+            pelo hash das abas de origem. Enquanto as abas não \
+            mudam ele é servido da memória ou do Redis e, quando \
+            mudam, a chave muda junto e o cálculo é refeito. O \
+            valor é compartilhado e não deve ser alterado.
+
+        Args:
+            nomeFuncao: Nome que identifica o cálculo
+            argumentos: Argumentos do cálculo, serializáveis em JSON
+            nomesAbas: Abas das quais o resultado depende
+            calcula: Função que recebe as abas e calcula o resultado
+            monta: Função que recebe o valor calculado, ou lido do \
+                Redis, e a versão do resultado e monta o resultado \
+                servido. Permite guardar no Redis uma forma compacta \
+                e montar no processo as visões por chave
+
+        Returns:
+            resultado: O valor calculado ou guardado em cache
+        """
+        abas = self._importaAbasComVersao(nomesAbas)
+        identificacao = json.dumps(
+            [
+                VERSAO_DERIVADOS,
+                nomeFuncao,
+                argumentos,
+                [abas[nome][1] for nome in nomesAbas],
+            ]
+        ).encode()
+        versao = _hashConteudo(identificacao)
+        chave = self._chave("derivado:" + versao)
+
+        resultado = self.cacheDerivados.obter(chave)
+        encontrados = int(resultado is not None)
+        METRICAS.cache("derivado", encontrados, 1 - encontrados)
+        if resultado is not None:
+            return resultado
+
+        bruto = None
+        if self.derivadosNoRedis:
+            # A chave muda com o conteudo, entao o prazo pode ser renovado
+            # a cada leitura sem risco de servir um resultado antigo
+            bruto = self._redis.getex(chave, ex=self.ttlMaximo)
+            encontrados = int(bruto is not None)
+            METRICAS.cache("derivado_redis", encontrados, 1 - encontrados)
+
+        if bruto is not None:
+            METRICAS.tamanho("derivado_leitura", len(bruto))
+            with METRICAS.etapa("desserializa_resultado", funcao=nomeFuncao):
+                resultado = formato.desserializaResultado(bruto)
+        else:
+            with METRICAS.etapa("calculo", funcao=nomeFuncao):
+                resultado = calcula(
+                    {nome: df for nome, (df, _) in abas.items()}
+                )  # noqa E501
+            if self.derivadosNoRedis:
+                bruto = formato.serializaResultado(resultado)
+                METRICAS.tamanho("derivado_escrita", len(bruto))
+                self._redis.setex(
+                    name=chave, value=bruto, time=self.ttlMaximo
+                )  # noqa E501
+
+        # As visoes montadas sob demanda nao entram no tamanho
+        tamanho = tamanhoAproximado(resultado)
+        if monta is not None:
+            with METRICAS.etapa("monta", funcao=nomeFuncao):
+                resultado = monta(resultado, versao)
+
+        self.cacheDerivados.armazenar(chave, resultado, tamanho=tamanho)
+        return resultado
+
+    @staticmethod
+    def limpaDadosEscolas(dfEscolas: pd.DataFrame) -> pd.DataFrame:
+        """Faz o tratamento básico da aba "Dados das Escolas".
+
+        Ajusta as quebras de linha, separa as observações do \
+            atendimento e limpa o endereço em uma única etapa \
+            de operações vetorizadas de texto.
+
+        Args:
+            dfEscolas: Dataframe com os registros da aba
+
+        Returns:
+            dfEscolas: Novo Dataframe com as colunas ATENDIMENTO, \
+                OBS. ATENDIMENTO e ENDEREÇO tratadas
+        """
+        dfEscolas = dfEscolas.copy()
+
+        # Ajuste Endereço
+        dfEscolas["ENDEREÇO"] = dfEscolas["ENDEREÇO"].str.replace(
+            "\n", ", ", regex=False
+        )  # noqa E501
+
+        # remocao de quebra de linha nas colunas de texto, trocar
+        # " \n" por " " e depois "\n" por "" equivale a remover "\n"
+        for coluna in dfEscolas.select_dtypes(include="object"):
+            # Colunas de objetos podem misturar numeros sem nenhum texto,
+            # entao a troca vale apenas para as celulas de texto
+            valores = dfEscolas[coluna]
+            tipo = pd.api.types.infer_dtype(valores, skipna=True)
+            if tipo == "string":
+                textos = valores.str.replace("\n", "", regex=False)
+                # Nulos continuam como estao
+                dfEscolas[coluna] = textos.where(textos.notna(), valores)
+            elif tipo in ("mixed", "mixed-integer"):
+                ehTexto = valores.map(type) == str
+                dfEscolas.loc[ehTexto, coluna] = valores[ehTexto].str.replace(
+                    "\n", "", regex=False
+                )
+
+        # Separa o atendimento das observacoes marcadas com "*"
+        atendimento = dfEscolas["ATENDIMENTO"].str.split(
+            "*", n=1, expand=True
+        )  # noqa E501
+        dfEscolas["ATENDIMENTO"] = atendimento[0].str.strip()
+
+        observacoes = None
+        if atendimento.shape[1] > 1:
+            separador = r"\s*\*\s*"
+            observacoes = atendimento[1].str.strip()
+            observacoes = observacoes.str.replace(separador, ", ", regex=True)
+            observacoes = observacoes.where(observacoes.notna(), None)
+        dfEscolas["OBS. ATENDIMENTO"] = observacoes
+
+        return dfEscolas
+
+    def _constroiIndiceEscolas(
+        self,
+        dadosEscolas: pd.DataFrame,
+        alunosEscolas: pd.DataFrame,
+    ) -> Dict[str, Any]:
+        """Processa as abas de escolas uma única vez.
+
+        Args:
+            dadosEscolas: Dataframe da aba "Dados das Escolas"
+            alunosEscolas: Dataframe da aba "Quantidade de Alunos por Escola"
+
+        Returns:
+            escolas: Dicionário com os dados de cada escola, pelo \
+                nome, em "ESCOLAS" e a quantidade de alunos por ano \
+                de todas elas em "ALUNOS", a forma guardada no Redis
+        """
+        dfEscolas = self.limpaDadosEscolas(dadosEscolas)
+
+        # Mantem apenas a primeira ocorrencia de cada escola
+        dfEscolas.drop_duplicates(subset="ESCOLA", inplace=True)
+
+        dfAlunosEscolas = alunosEscolas.drop_duplicates(subset="ESCOLA")
+
+        # Unpivotando Colunas de todas as escolas de uma vez
+        alunosUnpivot = dfAlunosEscolas.drop(
+            ["TOTAL DA ESCOLA", "ESTUDANTES COM DEFICIÊNCIA"], axis=1
+        ).melt(
             id_vars=["ESCOLA"],
             var_name="ANO",
             value_name="QUANTIDADE ESTUDANTES",  # noqa E501
         )
 
         # Transformando coluna QUANTIDADE DE ESTUDANTES em Inteiro
-        alunosUnpivotFiltrado = alunosUnpivot[
+        alunosUnpivot = alunosUnpivot[
             alunosUnpivot["QUANTIDADE ESTUDANTES"] != "-"
         ].copy()
-        alunosUnpivotFiltrado["QUANTIDADE ESTUDANTES"] = alunosUnpivotFiltrado[
+        alunosUnpivot["QUANTIDADE ESTUDANTES"] = alunosUnpivot[
             "QUANTIDADE ESTUDANTES"
-        ].astype(int)
+        ].astype(np.int16)
+
+        totalPorEscola = alunosUnpivot.groupby("ESCOLA", sort=False)[
+            "QUANTIDADE ESTUDANTES"
+        ].sum()
+        deficientesPorEscola = dict(
+            zip(
+                dfAlunosEscolas["ESCOLA"],
+                dfAlunosEscolas["ESTUDANTES COM DEFICIÊNCIA"],
+            )
+        )
+
+        escolas = {}
+        for registro in dfEscolas.to_dict(orient="records"):
+            nomeEscola = registro["ESCOLA"]
+            if nomeEscola not in deficientesPorEscola:
+                continue
+
+            # Acrescentando Quantidade de alunos com deficiência e total
+            registro["TOTAL DE ESTUDANTES DA ESCOLA"] = int(
+                totalPorEscola.get(nomeEscola, 0)
+            )
+            registro["ESTUDANTES COM DEFICIÊNCIA"] = int(
+                deficientesPorEscola[nomeEscola]
+            )
+
+            escolas[nomeEscola] = registro
+
+        return {"ESCOLAS": escolas, "ALUNOS": alunosUnpivot}
+
+    @staticmethod
+    def _montaIndiceEscolas(escolas: Dict[str, Any], versao: str) -> Mapping:
+        """Indexa por nome as escolas processadas.
 
-        # Acrescentando Quantidade de alunos com deficiência e total de alunos
-        dictDadosEscolaFiltrada[
-            "TOTAL DE ESTUDANTES DA ESCOLA"
-        ] = alunosUnpivotFiltrado["QUANTIDADE ESTUDANTES"].sum()
+        Args:
+            escolas: Retorno de _constroiIndiceEscolas
+            versao: Versão do resultado, guardada no índice
+
+        Returns:
+            indice: Mapeamento somente leitura do nome da escola \
+                para os seus dados e a quantidade de alunos por ano
+        """
+        registros = escolas["ESCOLAS"]
+        alunos = escolas["ALUNOS"]
+        posicoes = _posicoesPorChave(alunos, "ESCOLA")
+
+        def monta(nomeEscola: str) -> Tuple[Mapping, pd.DataFrame]:
+            linhas = posicoes.get(nomeEscola, np.array([], dtype=np.intp))
+            return (
+                MappingProxyType(registros[nomeEscola]),
+                alunos.take(linhas).reset_index(drop=True),
+            )
+
+        return _MapeamentoSobDemanda(registros, monta, versao)
 
-        dictDadosEscolaFiltrada["ESTUDANTES COM DEFICIÊNCIA"] = int(
-            alunosEscolasFiltrado.iloc[0]["ESTUDANTES COM DEFICIÊNCIA"]
+    def indiceEscolas(self) -> Mapping:
+        """Retorna o índice processado das escolas.
+
+        O processamento roda uma única vez por versão das abas \
+            de origem e é compartilhado pelo Redis, então as \
+            demais réplicas só montam o índice.
+
+        Returns:
+            indice: Mapeamento somente leitura do nome da escola \
+                para os seus dados e a quantidade de alunos por ano. \
+                O atributo versao identifica os dados de origem
+        """
+        return self._resultadoDerivado(
+            "indiceEscolas",
+            (),
+            ABAS_ESCOLAS,
+            lambda abas: self._constroiIndiceEscolas(*abas.values()),
+            monta=self._montaIndiceEscolas,
         )
 
-        # Captura Dataframe de alunos por turma e coloca em um dicionário
+    @METRICAS.cronometra("dadosEscola")
+    def dadosEscola(self, nomeEscola: str) -> List[Dict[Any, Any]]:
+        """Retorna uma lista de dicionários \
+            com as infromações da escola filtrada.
+
+        Args:
+            nomeEscola: Nome da escola que se deseja puxar as informações
+
+        Returns:
+            dadosEscola: Retorna uma lista com 2 \
+            objetos contendo os dados da escola e quantidade de alunos
+        """
+        indice = self.indiceEscolas()
+        dadosEscolaFiltrada, quantidadePorAno = indice[nomeEscola]
+
+        # Copias para que o chamador possa alterar sem afetar o indice
+        dictDadosEscolaFiltrada = dict(dadosEscolaFiltrada)
         dictQuantidadeAlunosPorTurma = {
-            "QUANTIDADE POR ANO": alunosUnpivotFiltrado
+            "QUANTIDADE POR ANO": quantidadePorAno.copy()
         }  # noqa E501
 
         return [dictDadosEscolaFiltrada, dictQuantidadeAlunosPorTurma]
 
+    @METRICAS.cronometra("listaEscolas")
     def listaEscolas(self) -> List:
         """Retorna uma lista de opções de escolas."""
-        dadosEscolas = self.importaPlanilhaPorAba(
-            os.getenv("ID_PLANILHA"), "Dados das Escolas"
-        )
-        return [chave["ESCOLA"] for chave in dadosEscolas]
+        dadosEscolas = self.importaAbasDataFrame(["Dados das Escolas"])[
+            "Dados das Escolas"
+        ]
+        return dadosEscolas["ESCOLA"].tolist()
 
-    def retornaPlanilhaIdebMacro(self, anoIdeb: int) -> pd.DataFrame:
-        """Retorna as metas e valores \
-            do IDEB Geral (Brasil, Santa Catarina, Criciuma).
+    @staticmethod
+    def _idebLargo(
+        dfIdeb: pd.DataFrame,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:  # noqa E501
+        """Converte uma aba de IDEB em matriz numérica.
+
+        Inteiros da planilha são notas sem vírgula e são \
+            divididos por 10. Textos como "-", "*" e "**" \
+            viram nulos.
 
         Args:
-            anoIdeb: Ano da classe que prestou a avaliação
+            dfIdeb: Dataframe da aba de notas ou de metas
 
         Returns:
-            dadosIdeb: Um Dataframe que \
-                contém as notas realizadas e as metas previstas
+            matriz: Nomes das escolas, anos e uma matriz \
+                escola x ano com os valores
         """
-        # Ajuste tecnico
-        if anoIdeb == 5:
-            nomePlanilhaNotas = f"IDEB {anoIdeb}° ANO"
-            nomePlanilhaMetas = f"META IDEB {anoIdeb}º ANO"
-        else:
-            nomePlanilhaNotas = f"IDEB {anoIdeb}° ANO"
-            nomePlanilhaMetas = f"META IDEB {anoIdeb}° ANO"
+        df = dfIdeb.drop(columns="ESCOLA")
+        escolas = dfIdeb["ESCOLA"].to_numpy()
+        valores = df.to_numpy(dtype=object)
 
-        idPlanilha = os.getenv("ID_PLANILHA")
+        tipos = np.frompyfunc(type, 1, 1)(valores)
+        inteiros = tipos == int
+        numeros = inteiros | (tipos == float)
 
-        # Importacao
-        planilhaNotasGeral = self.importaPlanilhaPorAba(
-            idPlanilha, nomePlanilhaNotas
-        )[  # noqa E501
-            :3
-        ]
-        planilhaNotasMetas = self.importaPlanilhaPorAba(
-            idPlanilha, nomePlanilhaMetas
-        )[  # noqa E501
-            :3
-        ]
-        dadosCorrigidosNotas = pd.DataFrame(
-            [
-                {
-                    chave: (valor / 10) if isinstance(valor, int) else valor
-                    for chave, valor in escola.items()
-                }
-                for escola in planilhaNotasGeral
-            ]
+        matriz = np.where(numeros, valores, np.nan).astype(float)
+        matriz[inteiros] /= 10
+
+        return escolas, df.columns.to_numpy(), matriz
+
+    @staticmethod
+    def _idebLongo(
+        escolas: np.ndarray,
+        anos: np.ndarray,
+        notas: np.ndarray,
+        metas: np.ndarray,
+        removeVazios: bool,
+    ) -> pd.DataFrame:
+        """Monta a tabela longa de notas, metas e atingimento.
+
+        Args:
+            escolas: Nomes das escolas das linhas das matrizes
+            anos: Anos das colunas das matrizes
+            notas: Matriz escola x ano das notas
+            metas: Matriz escola x ano das metas
+            removeVazios: Remove as linhas sem nota e sem meta
+
+        Returns:
+            df: Dataframe com uma linha por escola e ano
+        """
+        # Mesma ordem do melt, ano a ano. Escola e ano se repetem em
+        # todas as linhas e por isso viram categorias
+        df = pd.DataFrame(
+            {
+                "ESCOLA": pd.Categorical(
+                    np.tile(escolas, len(anos)), categories=pd.unique(escolas)
+                ),
+                "ANO": pd.Categorical(
+                    np.repeat(anos, len(escolas)),
+                    categories=pd.unique(anos),
+                    ordered=True,
+                ),
+                "NOTA": notas.ravel(order="F"),
+                "META": metas.ravel(order="F"),
+            }
+        )
+
+        # Filtro de dados Nulos
+        if removeVazios:
+            df = df[df["NOTA"].notna() | df["META"].notna()]
+            df["ESCOLA"] = df["ESCOLA"].cat.remove_unused_categories()
+
+        # Substituir Valores Nulos restantes
+        df = df.fillna({"NOTA": 0, "META": 0}).reset_index(drop=True)
+
+        nota = df["NOTA"].to_numpy()
+        meta = df["META"].to_numpy()
+        df["ATINGIMENTO"] = np.divide(
+            nota, meta, out=np.zeros_like(nota), where=meta != 0
         )  # noqa E501
-        dadosCorrigidosMetas = pd.DataFrame(
-            [
-                {
-                    chave: (valor / 10) if isinstance(valor, int) else valor
-                    for chave, valor in escola.items()
-                }
-                for escola in planilhaNotasMetas
-            ]
+
+        # Notas do IDEB tem uma casa decimal, float32 basta
+        return df.astype(
+            {"NOTA": np.float32, "META": np.float32, "ATINGIMENTO": np.float32}
         )  # noqa E501
 
-        # Unpivot
-        unpivotNotasGeral = pd.melt(
-            dadosCorrigidosNotas,
-            id_vars=["ESCOLA"],
-            var_name="ANO",
-            value_name="NOTA",
-        )
-        unpivotNotasMetas = pd.melt(
-            dadosCorrigidosMetas,
-            id_vars=["ESCOLA"],
-            var_name="ANO",
-            value_name="META",
-        )
+    @METRICAS.cronometra("tabelasIdeb")
+    def tabelasIdeb(self, anoIdeb: int) -> Dict[str, pd.DataFrame]:
+        """Retorna as tabelas de IDEB geral e das escolas.
+
+        As duas abas de IDEB da série são processadas uma \
+            única vez por versão dos dados e as tabelas são \
+            compartilhadas pelo Redis. O ranking e o histórico \
+            são montados no processo a partir delas.
+
+        Args:
+            anoIdeb: Ano da classe que prestou a avaliação
 
-        # Merge Tabelas
-        df = pd.merge(
-            unpivotNotasGeral,
-            unpivotNotasMetas,
-            on=["ESCOLA", "ANO"],
-            how="left",  # noqa E501
+        Returns:
+            tabelas: Dicionário com o Dataframe "MACRO", \
+                das três primeiras linhas (Brasil, Santa Catarina, \
+                Criciúma), o "MICRO", das escolas, o "RANKING", \
+                com o ranking das escolas de cada ano, o \
+                "HISTORICO", com as notas e metas de cada escola, e \
+                a "VERSAO" dos dados de origem
+        """
+        nomePlanilhaNotas, nomePlanilhaMetas = nomesAbasIdeb(anoIdeb)
+
+        return self._resultadoDerivado(
+            "tabelasIdeb",
+            (anoIdeb,),
+            [nomePlanilhaNotas, nomePlanilhaMetas],
+            lambda abas: self._calculaTabelasIdeb(*abas.values()),
+            monta=self._montaTabelasIdeb,
         )
 
-        # Substituir Valores Nulos restantes
-        df.fillna(0, inplace=True)
+    def _calculaTabelasIdeb(
+        self, dfNotas: pd.DataFrame, dfMetas: pd.DataFrame
+    ) -> Dict[str, pd.DataFrame]:  # noqa E501
+        """Calcula as tabelas de IDEB geral e das escolas.
+
+        Args:
+            dfNotas: Dataframe da aba de notas do IDEB da série
+            dfMetas: Dataframe da aba de metas do IDEB da série
 
-        df["ATINGIMENTO"] = df.apply(
-            lambda linha: (linha["NOTA"] / linha["META"])
-            if linha["META"] != 0
-            else 0,  # noqa E501
-            axis=1,
+        Returns:
+            tabelas: Dicionário com os Dataframes "MACRO" e "MICRO", \
+                a forma guardada no Redis
+        """
+        escolas, anos, notas = self._idebLargo(dfNotas)
+        escolasMetas, anosMetas, metas = self._idebLargo(dfMetas)
+
+        # Alinha as metas as escolas e anos das notas
+        metas = (
+            pd.DataFrame(metas, index=escolasMetas, columns=anosMetas)
+            .reindex(index=escolas, columns=anos)
+            .to_numpy()
         )
 
-        return df
+        dfMicro = self._idebLongo(
+            escolas[3:], anos, notas[3:], metas[3:], removeVazios=True
+        )
+        dfMicro["ATINGIU META"] = dfMicro["ATINGIMENTO"] >= 1
 
-    def retornaPlanilhaIdebMicro(self, anoIdeb: int) -> pd.DataFrame:
-        """Retorna as metas e valores \
-            do IDEB das escolas de Criciúma.
+        return {
+            "MACRO": self._idebLongo(
+                escolas[:3], anos, notas[:3], metas[:3], removeVazios=False
+            ),
+            "MICRO": dfMicro,
+        }
+
+    @classmethod
+    def _montaTabelasIdeb(
+        cls, tabelas: Dict[str, pd.DataFrame], versao: str
+    ) -> Dict[str, Any]:  # noqa E501
+        """Acrescenta o ranking e o histórico às tabelas de IDEB.
 
         Args:
-            anoIdeb: Ano da classe que prestou a avaliação
+            tabelas: Retorno de _calculaTabelasIdeb
+            versao: Versão do resultado, guardada nas tabelas
 
         Returns:
-            dadosIdeb: Um Dataframe que \
-                contém as notas realizadas e as metas previstas
+            tabelas: Dicionário com os Dataframes "MACRO" e "MICRO", \
+                o "RANKING" de cada ano, o "HISTORICO" de cada \
+                escola e a "VERSAO"
         """
-        # Ajuste tecnico
-        if anoIdeb == 5:
-            nomePlanilhaNotas = f"IDEB {anoIdeb}° ANO"
-            nomePlanilhaMetas = f"META IDEB {anoIdeb}º ANO"
-        else:
-            nomePlanilhaNotas = f"IDEB {anoIdeb}° ANO"
-            nomePlanilhaMetas = f"META IDEB {anoIdeb}° ANO"
+        dfMicro = tabelas["MICRO"]
+        posicoes = _posicoesPorChave(dfMicro, "ESCOLA")
 
-        idPlanilha = os.getenv("ID_PLANILHA")
+        def historico(escola: str) -> pd.DataFrame:
+            return dfMicro.take(posicoes[escola]).reset_index(drop=True)
 
-        # Importacao
-        planilhaNotasGeral = self.importaPlanilhaPorAba(
-            idPlanilha, nomePlanilhaNotas
-        )[  # noqa E501
-            3:
-        ]
-        planilhaNotasMetas = self.importaPlanilhaPorAba(
-            idPlanilha, nomePlanilhaMetas
-        )[  # noqa E501
-            3:
-        ]
+        return {
+            **tabelas,
+            "RANKING": cls._calculaRankings(dfMicro),
+            "HISTORICO": _MapeamentoSobDemanda(posicoes, historico, versao),
+            "VERSAO": versao,
+        }
 
-        dadosCorrigidosNotas = pd.DataFrame(
-            [
-                {
-                    chave: (valor / 10) if isinstance(valor, int) else valor
-                    for chave, valor in escola.items()
-                }
-                for escola in planilhaNotasGeral
-            ]
-        )  # noqa E501
-        dadosCorrigidosMetas = pd.DataFrame(
-            [
-                {
-                    chave: (valor / 10) if isinstance(valor, int) else valor
-                    for chave, valor in escola.items()
+    @staticmethod
+    def _calculaRankings(dfMicro: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        """Calcula o ranking de atingimento da meta de cada ano.
+
+        Args:
+            dfMicro: Dataframe do IDEB das escolas
+
+        Returns:
+            rankings: Dicionário do ano para o seu ranking, com \
+                as escolas acima e abaixo da meta e, para cada \
+                ordem, o Dataframe ordenado e as cores das barras
+        """
+        grupos = dict(tuple(dfMicro.groupby("ANO", observed=True)))
+
+        rankings = {}
+        for ano in dfMicro["ANO"].cat.categories:
+            dfAno = grupos.get(ano, dfMicro.iloc[0:0])
+            acima = int(dfAno["ATINGIU META"].sum())
+
+            ranking = {"ACIMA": acima, "ABAIXO": len(dfAno) - acima}
+            for ordem, ascendente in (
+                ("ASCENDENTE", True),
+                ("DESCENDENTE", False),
+            ):  # noqa E501
+                dfOrdenado = dfAno.sort_values(
+                    by="ATINGIMENTO", ascending=ascendente, kind="stable"
+                ).reset_index(drop=True)
+                ranking[ordem] = {
+                    "DADOS": dfOrdenado,
+                    "CORES": np.where(
+                        dfOrdenado["ATINGIU META"], "green", "red"
+                    ).tolist(),
                 }
-                for escola in planilhaNotasMetas
-            ]
-        )  # noqa E501
+            rankings[ano] = ranking
 
-        # Unpivot
-        unpivotNotasGeral = pd.melt(
-            dadosCorrigidosNotas,
-            id_vars=["ESCOLA"],
-            var_name="ANO",
-            value_name="NOTA",
-        )
-        unpivotNotasMetas = pd.melt(
-            dadosCorrigidosMetas,
-            id_vars=["ESCOLA"],
-            var_name="ANO",
-            value_name="META",
-        )
+        return rankings
 
-        # Merge Tabelas
-        df = pd.merge(
-            unpivotNotasGeral,
-            unpivotNotasMetas,
-            on=["ESCOLA", "ANO"],
-            how="left",  # noqa E501
-        )
+    def rankingIdeb(self, anoIdeb: int, anoAvaliacao: str) -> Dict[str, Any]:
+        """Retorna o ranking das escolas no IDEB de um ano.
 
-        # Ajustes colunas
-        df["NOTA"] = df["NOTA"].replace(["-", "*", "**"], nan)
-        df["META"] = df["META"].replace(["-", ""], nan)
+        O ranking é calculado junto com as tabelas de IDEB, \
+            então a consulta não refaz filtros nem ordenações. \
+            Os valores são compartilhados e não devem ser alterados.
 
-        # Filtro de dados Nulos
-        df.dropna(subset=["NOTA", "META"], inplace=True, how="all")
+        Args:
+            anoIdeb: Ano da classe que prestou a avaliação
+            anoAvaliacao: Ano da edição do IDEB, como "2021"
 
-        # Substituir Valores Nulos restantes
-        df.fillna(0, inplace=True)
+        Returns:
+            ranking: Dicionário com as quantidades de escolas \
+                "ACIMA" e "ABAIXO" da meta e, em "ASCENDENTE" e \
+                "DESCENDENTE", o Dataframe ordenado pelo \
+                atingimento e as cores das barras
+        """
+        return self.tabelasIdeb(anoIdeb)["RANKING"][anoAvaliacao]
 
-        # Ajuste de indice
-        df.reset_index(inplace=True, drop=True)
+    def historicoIdeb(self, anoIdeb: int) -> Mapping:
+        """Retorna as notas e metas do IDEB de cada escola ao longo dos anos.
 
-        df["ATINGIMENTO"] = df.apply(
-            lambda linha: (linha["NOTA"] / linha["META"])
-            if linha["META"] != 0
-            else 0,  # noqa E501
-            axis=1,
-        )
+        O histórico é indexado uma única vez junto com as tabelas \
+            de IDEB e o Dataframe de cada escola é montado na \
+            primeira consulta, então trocar de escola é só uma \
+            consulta ao índice. Os Dataframes são compartilhados e \
+            não devem ser alterados.
 
-        df["ATINGIU META"] = [
-            "NÃO" if atingimento < 1 else "SIM"
-            for atingimento in df["ATINGIMENTO"]  # noqa E501
-        ]
+        Args:
+            anoIdeb: Ano da classe que prestou a avaliação
 
-        return df
+        Returns:
+            historico: Mapeamento somente leitura do nome da escola, \
+                na ordem da planilha, para o seu Dataframe por ano
+        """
+        return self.tabelasIdeb(anoIdeb)["HISTORICO"]
+
+    @METRICAS.cronometra("retornaPlanilhaIdebMacro")
+    def retornaPlanilhaIdebMacro(self, anoIdeb: int) -> pd.DataFrame:
+        """Retorna as metas e valores \
+            do IDEB Geral (Brasil, Santa Catarina, Criciuma).
+
+        Args:
+            anoIdeb: Ano da classe que prestou a avaliação
+
+        Returns:
+            dadosIdeb: Um Dataframe que \
+                contém as notas realizadas e as metas previstas
+        """
+        return self.tabelasIdeb(anoIdeb)["MACRO"].copy()
+
+    @METRICAS.cronometra("retornaPlanilhaIdebMicro")
+    def retornaPlanilhaIdebMicro(self, anoIdeb: int) -> pd.DataFrame:
+        """Retorna as metas e valores \
+            do IDEB das escolas de Criciúma.
+
+        Args:
+            anoIdeb: Ano da classe que prestou a avaliação
+
+        Returns:
+            dadosIdeb: Um Dataframe que \
+                contém as notas realizadas e as metas previstas
+        """
+        return self.tabelasIdeb(anoIdeb)["MICRO"].copy()
@@ -0,0 +1,329 @@
+"""Este módulo contém o formato binário colunar \
+    das abas armazenadas em cache."""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Mapping
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Prefixo que identifica o formato Arrow, seguido de um byte de versao
+CABECALHO = b"PTEA"
+VERSAO_FORMATO = 1
+
+# Prefixo dos resultados derivados das abas
+CABECALHO_RESULTADO = b"PTER"
+
+# Codigos dos tipos das celulas em colunas com tipos misturados
+_CODIGOS_TIPOS = {str: 0, int: 1, float: 2, type(None): 3}
+_TIPO_MISTO = pa.struct(
+    [
+        ("tipo", pa.int8()),
+        ("inteiro", pa.int64()),
+        ("real", pa.float64()),
+        ("texto", pa.string()),
+    ]
+)
+
+
+def _colunaArrow(valores: List[Any]) -> pa.Array:
+    """Monta o array Arrow de uma coluna da planilha.
+
+    Colunas de um único tipo viram arrays nativos. Colunas \
+        com tipos misturados, como notas com "-", guardam o \
+        tipo de cada célula para que inteiros continuem inteiros.
+
+    Args:
+        valores: Valores da coluna, linha a linha
+
+    Returns:
+        coluna: Array Arrow com os valores
+    """
+    tipos = {type(valor) for valor in valores}
+    if tipos == {int}:
+        return pa.array(valores, pa.int64())
+    if tipos == {float}:
+        return pa.array(valores, pa.float64())
+    if tipos == {str}:
+        return pa.array(valores, pa.string())
+
+    if not tipos <= _CODIGOS_TIPOS.keys():
+        raise TypeError(f"Tipos de célula não suportados: {tipos}")
+
+    return pa.StructArray.from_arrays(
+        [
+            pa.array([_CODIGOS_TIPOS[type(v)] for v in valores], pa.int8()),
+            pa.array(
+                [v if type(v) is int else None for v in valores], pa.int64()
+            ),  # noqa E501
+            pa.array(
+                [v if type(v) is float else None for v in valores],
+                pa.float64(),
+            ),
+            pa.array(
+                [v if type(v) is str else None for v in valores], pa.string()
+            ),  # noqa E501
+        ],
+        fields=list(_TIPO_MISTO),
+    )
+
+
+def _tabelaArrow(registros: List[Dict[str, Any]]) -> pa.Table:
+    """Monta a tabela Arrow com os registros de uma aba.
+
+    Args:
+        registros: Lista de dicionários, um por linha da aba
+
+    Returns:
+        tabela: Tabela Arrow com uma coluna por cabeçalho
+    """
+    colunas = list(
+        dict.fromkeys(chave for linha in registros for chave in linha)
+    )  # noqa E501
+    return pa.table(
+        {
+            coluna: _colunaArrow([linha.get(coluna) for linha in registros])
+            for coluna in colunas
+        }
+    )
+
+
+def _colunaMista(coluna: pa.ChunkedArray) -> np.ndarray:
+    """Reconstrói uma coluna de tipos misturados.
+
+    Args:
+        coluna: Coluna Arrow no formato de tipos misturados
+
+    Returns:
+        valores: Array de objetos Python, um por linha
+    """
+    coluna = coluna.combine_chunks()
+    tipos = coluna.field("tipo").to_numpy()
+    valores = np.full(len(coluna), None, dtype=object)
+
+    for campo, codigo in (("texto", 0), ("inteiro", 1), ("real", 2)):
+        mascara = tipos == codigo
+        if mascara.any():
+            # Filtra antes de converter para nao transformar nulos em NaN
+            campoValores = coluna.field(campo).filter(pa.array(mascara))
+            valores[mascara] = np.array(
+                campoValores.to_numpy(zero_copy_only=False).tolist(),
+                dtype=object,
+            )
+
+    return valores
+
+
+def _colunaNumpy(coluna: pa.ChunkedArray, semCopia: bool) -> np.ndarray:
+    """Monta o array NumPy de uma coluna Arrow de um único tipo.
+
+    Args:
+        coluna: Coluna Arrow que não é de tipos misturados
+        semCopia: Se verdadeiro, colunas numéricas sem nulos \
+            apontam para a memória da tabela, sem cópia
+
+    Returns:
+        valores: Array com os valores da coluna
+    """
+    tipo = coluna.type
+    numerica = pa.types.is_integer(tipo) or pa.types.is_floating(tipo)
+    continua = coluna.num_chunks == 1 and not coluna.null_count
+    if semCopia and numerica and continua:
+        return coluna.chunk(0).to_numpy(zero_copy_only=True)
+    return coluna.to_numpy()
+
+
+def _dataFrame(tabela: pa.Table, semCopia: bool = False) -> pd.DataFrame:
+    """Monta o Dataframe de uma aba a partir da tabela Arrow.
+
+    Args:
+        tabela: Tabela Arrow gerada por _tabelaArrow
+        semCopia: Se verdadeiro, as colunas numéricas compartilham \
+            a memória da tabela e ficam somente leitura
+
+    Returns:
+        df: Dataframe com os mesmos valores dos registros originais
+    """
+    return pd.DataFrame(
+        {
+            nome: _colunaMista(coluna)
+            if coluna.type == _TIPO_MISTO
+            else _colunaNumpy(coluna, semCopia)
+            for nome, coluna in zip(tabela.column_names, tabela.columns)
+        },
+        index=pd.RangeIndex(tabela.num_rows),
+        copy=not semCopia,
+    )
+
+
+def _tabelaParaBytes(
+    tabela: pa.Table, compressao: str | None = "zstd"
+) -> bytes:  # noqa E501
+    """Escreve uma tabela Arrow como stream IPC."""
+    saida = pa.BufferOutputStream()
+    opcoes = pa.ipc.IpcWriteOptions(compression=compressao)
+    with pa.ipc.new_stream(saida, tabela.schema, options=opcoes) as escritor:
+        escritor.write_table(tabela)
+    return saida.getvalue().to_pybytes()
+
+
+def serializaAba(
+    registros: List[Dict[str, Any]], compressao: str | None = "zstd"
+) -> bytes:  # noqa E501
+    """Serializa os registros de uma aba no formato binário do cache.
+
+    Args:
+        registros: Lista de dicionários, um por linha da aba
+        compressao: Codec de compressão do Arrow ("zstd", "lz4") \
+            ou None para não comprimir
+
+    Returns:
+        bruto: Cabeçalho com a versão seguido do stream Arrow IPC
+    """
+    corpo = _tabelaParaBytes(_tabelaArrow(registros), compressao)
+    return CABECALHO + bytes([VERSAO_FORMATO]) + corpo
+
+
+def desserializaAba(bruto: bytes) -> pd.DataFrame:
+    """Lê uma aba armazenada em cache direto para Dataframe.
+
+    Entradas antigas em JSON continuam sendo lidas.
+
+    Args:
+        bruto: Bytes armazenados no cache
+
+    Returns:
+        df: Dataframe com os registros da aba
+    """
+    if not bruto.startswith(CABECALHO):
+        return _dataFrame(_tabelaArrow(json.loads(bruto)))
+
+    versao = bruto[len(CABECALHO)]
+    if versao != VERSAO_FORMATO:
+        raise ValueError(f"Versão de formato desconhecida: {versao}")
+
+    buffer = pa.py_buffer(bruto)[len(CABECALHO) + 1 :]  # noqa E203
+    with pa.ipc.open_stream(buffer) as leitor:
+        return _dataFrame(leitor.read_all())
+
+
+def escreveArquivoAba(
+    registros: List[Dict[str, Any]], caminho: Path
+) -> None:  # noqa E501
+    """Grava os registros de uma aba em um arquivo Arrow IPC.
+
+    O arquivo não é comprimido para que possa ser lido \
+        mapeado em memória, sem cópia dos dados numéricos.
+
+    Args:
+        registros: Lista de dicionários, um por linha da aba
+        caminho: Caminho do arquivo a ser criado
+    """
+    tabela = _tabelaArrow(registros).replace_schema_metadata(
+        {"formato": CABECALHO, "versao": str(VERSAO_FORMATO)}
+    )
+    with pa.OSFile(str(caminho), "wb") as saida:
+        with pa.ipc.new_file(saida, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+
+
+def leArquivoAba(caminho: Path) -> pd.DataFrame:
+    """Lê, mapeado em memória, um arquivo gravado por escreveArquivoAba.
+
+    As colunas numéricas sem nulos apontam direto para o \
+        arquivo mapeado, então processos que leem o mesmo \
+        arquivo compartilham essas páginas. Elas são somente \
+        leitura.
+
+    Args:
+        caminho: Caminho do arquivo da aba
+
+    Returns:
+        df: Dataframe com os registros da aba
+    """
+    with pa.memory_map(str(caminho), "r") as arquivo:
+        tabela = pa.ipc.open_file(arquivo).read_all()
+
+    metadados = tabela.schema.metadata or {}
+    versao = metadados.get(b"versao", b"").decode()
+    if metadados.get(b"formato") != CABECALHO:
+        raise ValueError(f"O arquivo {caminho} não é uma aba do portal")
+    if versao != str(VERSAO_FORMATO):
+        raise ValueError(f"Versão de formato desconhecida: {versao}")
+
+    return _dataFrame(tabela, semCopia=True)
+
+
+def serializaResultado(valor: Any) -> bytes:
+    """Serializa o resultado de uma função do ETL.
+
+    Aceita Dataframes, dicionários, listas e valores simples, \
+        combinados livremente. A estrutura vai em JSON e cada \
+        Dataframe em um bloco Arrow IPC próprio.
+
+    Args:
+        valor: Resultado a ser serializado
+
+    Returns:
+        bruto: Cabeçalho com a versão seguido dos blocos \
+            prefixados pelo seu tamanho
+    """
+    dataFrames: List[pd.DataFrame] = []
+
+    def converte(item: Any) -> Any:
+        if isinstance(item, pd.DataFrame):
+            dataFrames.append(item)
+            return {"__dataframe__": len(dataFrames) - 1}
+        if isinstance(item, Mapping):
+            return {chave: converte(valor) for chave, valor in item.items()}
+        if isinstance(item, (list, tuple)):
+            return [converte(valor) for valor in item]
+        if isinstance(item, np.generic):
+            return item.item()
+        return item
+
+    blocos = [json.dumps(converte(valor)).encode()] + [
+        _tabelaParaBytes(pa.Table.from_pandas(df)) for df in dataFrames
+    ]
+    corpo = b"".join(len(bloco).to_bytes(8, "big") + bloco for bloco in blocos)
+
+    return CABECALHO_RESULTADO + bytes([VERSAO_FORMATO]) + corpo
+
+
+def desserializaResultado(bruto: bytes) -> Any:
+    """Lê um resultado gravado por serializaResultado.
+
+    Args:
+        bruto: Bytes armazenados no cache
+
+    Returns:
+        valor: O resultado com os Dataframes reconstruídos
+    """
+    if not bruto.startswith(CABECALHO_RESULTADO):
+        raise ValueError("Os bytes não são de um resultado derivado")
+
+    versao = bruto[len(CABECALHO_RESULTADO)]
+    if versao != VERSAO_FORMATO:
+        raise ValueError(f"Versão de formato desconhecida: {versao}")
+
+    blocos = []
+    posicao = len(CABECALHO_RESULTADO) + 1
+    while posicao < len(bruto):
+        tamanho = int.from_bytes(bruto[posicao : posicao + 8], "big")  # noqa E203
+        posicao += 8
+        blocos.append(bruto[posicao : posicao + tamanho])  # noqa E203
+        posicao += tamanho
+
+    dataFrames = []
+    for bloco in blocos[1:]:
+        with pa.ipc.open_stream(pa.py_buffer(bloco)) as leitor:
+            dataFrames.append(leitor.read_all().to_pandas())
+
+    def restaura(item: Dict[str, Any]) -> Any:
+        if item.keys() == {"__dataframe__"}:
+            return dataFrames[item["__dataframe__"]]
+        return item
+
+    return json.loads(blocos[0], object_hook=restaura)
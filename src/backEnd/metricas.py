@@ -0,0 +1,295 @@
+"""Este módulo contém as métricas de tempo por etapa, \
+    os contadores de cache e a exportação no formato do Prometheus."""
+
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Limites dos histogramas, no padrão cumulativo do Prometheus
+LIMITES_SEGUNDOS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+LIMITES_BYTES = tuple(1024 * 4**expoente for expoente in range(10))
+
+_Rotulos = Tuple[Tuple[str, str], ...]
+
+
+class _Histograma:
+    """Contagens cumulativas por limite, soma e total de observações."""
+
+    def __init__(self, limites: Tuple[float, ...]) -> None:
+        self.limites = limites
+        self.contagens = [0] * len(limites)
+        self.soma = 0.0
+        self.total = 0
+
+    def observa(self, valor: float) -> None:
+        for posicao, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.contagens[posicao] += 1
+        self.soma += valor
+        self.total += 1
+
+
+class Metricas:
+    """Registro das métricas do processo, seguro entre threads."""
+
+    def __init__(self, prefixo: str = "portal") -> None:
+        """Instancia o registro vazio.
+
+        Args:
+            prefixo: Prefixo dos nomes das métricas exportadas
+        """
+        self.prefixo = prefixo
+        self._contadores: Dict[Tuple[str, _Rotulos], float] = {}
+        self._histogramas: Dict[Tuple[str, _Rotulos], _Histograma] = {}
+        self._trava = threading.Lock()
+
+    @staticmethod
+    def _rotulos(rotulos: Dict[str, object]) -> _Rotulos:
+        pares = ((chave, str(valor)) for chave, valor in rotulos.items())
+        return tuple(sorted(pares))
+
+    def incrementa(self, nome: str, valor: float = 1, **rotulos) -> None:
+        """Soma um valor a um contador.
+
+        Args:
+            nome: Nome do contador, sem o prefixo
+            valor: Quantidade somada
+            rotulos: Rótulos que separam as séries do contador
+        """
+        chave = (nome, self._rotulos(rotulos))
+        with self._trava:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    def observa(
+        self,
+        nome: str,
+        valor: float,
+        limites: Tuple[float, ...] = LIMITES_SEGUNDOS,
+        **rotulos,
+    ) -> None:
+        """Registra uma observação em um histograma.
+
+        Args:
+            nome: Nome do histograma, sem o prefixo
+            valor: Valor observado
+            limites: Limites das faixas do histograma
+            rotulos: Rótulos que separam as séries do histograma
+        """
+        chave = (nome, self._rotulos(rotulos))
+        with self._trava:
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                histograma = self._histogramas[chave] = _Histograma(limites)
+            histograma.observa(valor)
+
+    def tamanho(self, origem: str, tamanhoBytes: int) -> None:
+        """Registra o tamanho de uma carga lida ou gravada.
+
+        Args:
+            origem: De onde a carga veio ou para onde foi
+            tamanhoBytes: Tamanho da carga em bytes
+        """
+        self.observa("carga_bytes", tamanhoBytes, LIMITES_BYTES, origem=origem)
+
+    def cache(self, camada: str, acertos: int, falhas: int) -> None:
+        """Soma os acertos e as falhas de uma camada de cache.
+
+        Args:
+            camada: Nome da camada, como "local" ou "redis"
+            acertos: Itens encontrados na camada
+            falhas: Itens ausentes da camada
+        """
+        for resultado, quantidade in (("acerto", acertos), ("falha", falhas)):
+            if quantidade:
+                rotulos = {"camada": camada, "resultado": resultado}
+                self.incrementa("cache_total", quantidade, **rotulos)
+
+    @contextmanager
+    def etapa(self, nomeEtapa: str, **rotulos) -> Iterator[None]:
+        """Mede o tempo de um trecho de código.
+
+        A duração vai para o histograma "etapa_segundos" e, com \
+            o log em nível DEBUG, também para uma linha em JSON.
+
+        Args:
+            nomeEtapa: Nome da etapa medida
+            rotulos: Rótulos adicionais da etapa
+        """
+        inicio = time.perf_counter()
+        erro = False
+        try:
+            yield
+        except BaseException:
+            erro = True
+            raise
+        finally:
+            duracao = time.perf_counter() - inicio
+            rotulos = {"etapa": nomeEtapa, **rotulos}
+            self.observa("etapa_segundos", duracao, **rotulos)
+            if erro:
+                self.incrementa("etapa_erros_total", **rotulos)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    json.dumps(
+                        {
+                            **rotulos,
+                            "segundos": round(duracao, 6),
+                            "erro": erro,
+                        },
+                        ensure_ascii=False,
+                    )
+                )
+
+    def cronometra(self, nomeEtapa: str, **rotulos) -> Callable:
+        """Decorador que mede cada chamada de uma função como uma etapa.
+
+        Args:
+            nomeEtapa: Nome da etapa medida
+            rotulos: Rótulos adicionais da etapa
+
+        Returns:
+            decorador: Função que envolve a função medida
+        """
+
+        def decorador(funcao: Callable) -> Callable:
+            @functools.wraps(funcao)
+            def medida(*args, **kwargs):
+                with self.etapa(nomeEtapa, **rotulos):
+                    return funcao(*args, **kwargs)
+
+            return medida
+
+        return decorador
+
+    def contador(self, nome: str, **rotulos) -> float:
+        """Retorna o valor atual de um contador.
+
+        Args:
+            nome: Nome do contador, sem o prefixo
+            rotulos: Rótulos da série desejada
+
+        Returns:
+            valor: Valor do contador ou zero se ainda não existir
+        """
+        with self._trava:
+            return self._contadores.get((nome, self._rotulos(rotulos)), 0)
+
+    def observacoes(self, nome: str, **rotulos) -> int:
+        """Retorna quantas observações um histograma recebeu.
+
+        Args:
+            nome: Nome do histograma, sem o prefixo
+            rotulos: Rótulos da série desejada
+
+        Returns:
+            total: Número de observações ou zero se não existir
+        """
+        with self._trava:
+            histograma = self._histogramas.get((nome, self._rotulos(rotulos)))
+            return 0 if histograma is None else histograma.total
+
+    def exportaPrometheus(self) -> str:
+        """Exporta as métricas no formato de texto do Prometheus.
+
+        Returns:
+            texto: Métricas no formato de exposição 0.0.4
+        """
+
+        def formata(rotulos: _Rotulos) -> str:
+            if not rotulos:
+                return ""
+            pares = []
+            for chave, valor in rotulos:
+                valor = valor.replace("\\", "\\\\").replace('"', '\\"')
+                pares.append(f'{chave}="{valor}"')
+            return "{" + ",".join(pares) + "}"
+
+        linhas: List[str] = []
+        with self._trava:
+            contadores = sorted(self._contadores.items())
+            histogramas = sorted(
+                self._histogramas.items(), key=lambda item: item[0]
+            )  # noqa E501
+            tipos = dict.fromkeys(nome for (nome, _), _ in contadores)
+            tipos.update(dict.fromkeys(nome for (nome, _), _ in histogramas))
+
+            for nome in tipos:
+                metrica = f"{self.prefixo}_{nome}"
+                tipo = "counter" if nome.endswith("total") else "histogram"
+                linhas.append(f"# TYPE {metrica} {tipo}")
+
+                for (nomeSerie, rotulos), valor in contadores:
+                    if nomeSerie == nome:
+                        linhas.append(f"{metrica}{formata(rotulos)} {valor!r}")
+
+                for (nomeSerie, rotulos), histograma in histogramas:
+                    if nomeSerie != nome:
+                        continue
+                    faixas = [str(limite) for limite in histograma.limites]
+                    for faixa, contagem in zip(
+                        faixas + ["+Inf"],
+                        histograma.contagens + [histograma.total],
+                    ):
+                        faixa = formata(rotulos + (("le", faixa),))
+                        linhas.append(f"{metrica}_bucket{faixa} {contagem}")
+                    serie = formata(rotulos)
+                    linhas.append(f"{metrica}_sum{serie} {histograma.soma!r}")
+                    linhas.append(f"{metrica}_count{serie} {histograma.total}")
+
+        return "\n".join(linhas) + "\n"
+
+    def iniciaServidor(
+        self, porta: int, endereco: str = ""
+    ) -> ThreadingHTTPServer:  # noqa E501
+        """Serve as métricas em HTTP para a coleta do Prometheus.
+
+        Args:
+            porta: Porta do servidor
+            endereco: Endereço de escuta, por padrão todas as interfaces
+
+        Returns:
+            servidor: Servidor rodando em uma thread em segundo plano
+        """
+        metricas = self
+
+        class Exportador(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                corpo = metricas.exportaPrometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        servidor = ThreadingHTTPServer((endereco, porta), Exportador)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        return servidor
+
+
+# Registro único do processo, compartilhado pelo ETL e pela página
+METRICAS = Metricas()
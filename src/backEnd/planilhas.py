@@ -0,0 +1,166 @@
+"""Este módulo contém o registro dos processadores de \
+    várias planilhas servidas pelo mesmo processo."""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Mapping, Sequence
+
+import redis
+
+from backEnd.etl import DriveProcessor
+
+
+def planilhasConfiguradas() -> List[str]:
+    """Retorna os ids das planilhas configuradas no ambiente.
+
+    Returns:
+        idsPlanilhas: Ids da variável PLANILHAS, separados por \
+            vírgula, ou apenas o ID_PLANILHA na falta dela
+    """
+    ids = os.getenv("PLANILHAS") or os.getenv("ID_PLANILHA") or ""
+    ids = [idPlanilha.strip() for idPlanilha in ids.split(",")]
+    return [idPlanilha for idPlanilha in ids if idPlanilha]
+
+
+class ProcessadoresPlanilhas:
+    """Processadores de várias planilhas com conexões compartilhadas.
+
+    Cada planilha tem o seu DriveProcessor, com as chaves no \
+        Redis prefixadas pelo id e caches em memória limitados \
+        ao orçamento da planilha. O cliente Redis, com o seu \
+        pool de conexões, e o pool de threads da pré-carga são \
+        únicos para todas.
+    """
+
+    def __init__(
+        self,
+        caminhoCredenciais: Path,
+        redisUrl: str,
+        idsPlanilhas: Sequence[str] | None = None,
+        orcamentoMemoria: int = 96 * 1024 * 1024,
+        orcamentos: Mapping[str, int] | None = None,
+        maxConexoesRedis: int = 20,
+        maxThreadsPreCarga: int = 4,
+        diretorioSnapshot: Path | None = None,
+        **opcoes,
+    ) -> None:
+        """Instancia o registro, sem criar os processadores.
+
+        Args:
+            caminhoCredenciais: O caminho para o arquivo json \
+                com as credenciais da conta de serviço do Google
+            redisUrl: URL do banco redis para cacheamento
+            idsPlanilhas: Ids das planilhas que podem ser servidas. \
+                Por padrão usa planilhasConfiguradas
+            orcamentoMemoria: Limite em bytes dos caches em \
+                memória de cada planilha, dois terços para as \
+                abas e um terço para os resultados derivados
+            orcamentos: Orçamentos próprios de algumas planilhas, \
+                pelo id, no lugar do orcamentoMemoria
+            maxConexoesRedis: Tamanho máximo do pool de conexões \
+                compartilhado com o Redis
+            maxThreadsPreCarga: Número máximo de threads da \
+                pré-carga, somando todas as planilhas
+            diretorioSnapshot: Diretório de snapshot. Com mais de \
+                uma planilha, cada uma lê o subdiretório com o seu \
+                id. Por padrão usa a variável DIRETORIO_SNAPSHOT
+            opcoes: Demais argumentos repassados a cada DriveProcessor
+        """
+        self.idsPlanilhas = list(idsPlanilhas or planilhasConfiguradas())
+        if not self.idsPlanilhas:
+            raise ValueError("Nenhuma planilha configurada")
+
+        self.orcamentoMemoria = orcamentoMemoria
+        self.orcamentos = dict(orcamentos or {})
+
+        if diretorioSnapshot is None and os.getenv("DIRETORIO_SNAPSHOT"):
+            diretorioSnapshot = Path(os.getenv("DIRETORIO_SNAPSHOT"))
+        self.diretorioSnapshot = diretorioSnapshot
+
+        self._caminhoCredenciais = caminhoCredenciais
+        self._redisUrl = redisUrl
+        self._opcoes = opcoes
+        self._redis = (
+            redis.from_url(redisUrl, max_connections=maxConexoesRedis)
+            if diretorioSnapshot is None
+            else None
+        )
+        self._executorPreCarga = ThreadPoolExecutor(
+            max_workers=maxThreadsPreCarga, thread_name_prefix="preCarga"
+        )  # noqa E501
+
+        self._processadores: Dict[str, DriveProcessor] = {}
+        self._trava = threading.Lock()
+
+    @property
+    def padrao(self) -> str:
+        """Retorna o id da planilha servida quando nenhuma é escolhida."""
+        return self.idsPlanilhas[0]
+
+    def processador(self, idPlanilha: str | None = None) -> DriveProcessor:
+        """Retorna o processador de uma planilha, criando-o no primeiro uso.
+
+        Args:
+            idPlanilha: O id da planilha, por padrão a primeira \
+                planilha configurada
+
+        Returns:
+            processador: O DriveProcessor da planilha
+        """
+        idPlanilha = idPlanilha or self.padrao
+        if idPlanilha not in self.idsPlanilhas:
+            raise KeyError(f"A planilha {idPlanilha} não está configurada")
+
+        with self._trava:
+            processador = self._processadores.get(idPlanilha)
+            if processador is None:
+                processador = self._criaProcessador(idPlanilha)
+                self._processadores[idPlanilha] = processador
+            return processador
+
+    def _criaProcessador(self, idPlanilha: str) -> DriveProcessor:
+        """Cria o processador de uma planilha com o seu orçamento.
+
+        Args:
+            idPlanilha: O id da planilha
+
+        Returns:
+            processador: Novo DriveProcessor ligado aos recursos \
+                compartilhados
+        """
+        orcamento = self.orcamentos.get(idPlanilha, self.orcamentoMemoria)
+
+        diretorioSnapshot = self.diretorioSnapshot
+        if diretorioSnapshot is not None and len(self.idsPlanilhas) > 1:
+            diretorioSnapshot = Path(diretorioSnapshot) / idPlanilha
+
+        return DriveProcessor(
+            self._caminhoCredenciais,
+            self._redisUrl,
+            tamanhoCacheLocal=orcamento * 2 // 3,
+            tamanhoCacheDerivados=orcamento // 3,
+            diretorioSnapshot=diretorioSnapshot,
+            idPlanilha=idPlanilha,
+            clienteRedis=self._redis,
+            executorPreCarga=self._executorPreCarga,
+            **self._opcoes,
+        )
+
+    def estatisticas(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Retorna os contadores dos caches em memória de cada planilha.
+
+        Returns:
+            estatisticas: Dicionário do id da planilha para as \
+                estatísticas do cache de abas e de derivados
+        """
+        with self._trava:
+            processadores = dict(self._processadores)
+        return {
+            idPlanilha: {
+                "abas": processador.cacheLocal.estatisticas(),
+                "derivados": processador.cacheDerivados.estatisticas(),
+            }
+            for idPlanilha, processador in processadores.items()
+        }
@@ -0,0 +1,182 @@
+"""Este módulo contém o snapshot local das abas da planilha, \
+    usado para servir o portal sem Google e sem Redis."""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+from backEnd import formato
+
+# Arquivo que lista as abas do snapshot, gravado por último
+MANIFESTO = "manifesto.json"
+
+
+def exportaSnapshot(
+    abas: Dict[str, List[Dict[str, Any]]],
+    diretorio: Path,
+    idPlanilha: str | None = None,
+) -> Dict[str, Any]:
+    """Grava as abas em um diretório de snapshot.
+
+    Cada aba vira um arquivo Arrow nomeado pelo hash do seu \
+        conteúdo e o manifesto é trocado de forma atômica no \
+        final, então quem lê o diretório nunca vê um snapshot \
+        pela metade. Os arquivos do snapshot anterior são \
+        mantidos para quem ainda lê o manifesto antigo e só os \
+        das gerações mais velhas são apagados.
+
+    Args:
+        abas: Dicionário do nome da aba para os seus registros
+        diretorio: Diretório do snapshot, criado se não existir
+        idPlanilha: O id da planilha de origem, guardado no manifesto
+
+    Returns:
+        manifesto: Conteúdo do manifesto gravado
+    """
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+
+    arquivosAbas = {}
+    for nome, registros in abas.items():
+        temporario = diretorio / f".{os.getpid()}.arrow.tmp"
+        formato.escreveArquivoAba(registros, temporario)
+        versao = hashlib.blake2b(
+            temporario.read_bytes(), digest_size=16
+        ).hexdigest()  # noqa E501
+        arquivo = f"{versao}.arrow"
+        os.replace(temporario, diretorio / arquivo)
+        arquivosAbas[nome] = {
+            "arquivo": arquivo,
+            "versao": versao,
+            "linhas": len(registros),
+        }
+
+    manifesto = {
+        "versaoFormato": formato.VERSAO_FORMATO,
+        "idPlanilha": idPlanilha,
+        "criadoEm": datetime.now(timezone.utc).isoformat(),
+        "abas": arquivosAbas,
+    }
+    # Arquivos da geracao anterior, ainda referenciados por leitores
+    emUso = {info["arquivo"] for info in arquivosAbas.values()}
+    caminhoManifesto = diretorio / MANIFESTO
+    if caminhoManifesto.exists():
+        anterior = json.loads(caminhoManifesto.read_text())
+        emUso |= {info["arquivo"] for info in anterior["abas"].values()}
+
+    temporario = diretorio / f".{os.getpid()}.{MANIFESTO}.tmp"
+    temporario.write_text(json.dumps(manifesto, ensure_ascii=False, indent=2))
+    os.replace(temporario, caminhoManifesto)
+
+    for antigo in diretorio.glob("*.arrow"):
+        if antigo.name not in emUso:
+            antigo.unlink(missing_ok=True)
+
+    return manifesto
+
+
+class SnapshotLocal:
+    """Lê as abas de um diretório de snapshot."""
+
+    def __init__(self, diretorio: Path) -> None:
+        """Instancia o leitor do snapshot.
+
+        Args:
+            diretorio: Diretório gravado por exportaSnapshot
+        """
+        self.diretorio = Path(diretorio)
+        self._manifesto: Dict[str, Any] = {}
+        self._modificadoEm: int | None = None
+        self._abas: Dict[str, Tuple[pd.DataFrame, str]] = {}
+        self._trava = threading.Lock()
+
+    def manifesto(self) -> Dict[str, Any]:
+        """Retorna o manifesto atual, relendo-o se o arquivo mudou.
+
+        Returns:
+            manifesto: Conteúdo do manifesto do snapshot
+        """
+        caminho = self.diretorio / MANIFESTO
+        if not caminho.exists():
+            raise FileNotFoundError(f"Snapshot não encontrado em {caminho}")
+
+        modificadoEm = caminho.stat().st_mtime_ns
+        with self._trava:
+            if modificadoEm != self._modificadoEm:
+                self._manifesto = json.loads(caminho.read_text())
+                self._modificadoEm = modificadoEm
+            return self._manifesto
+
+    def nomesAbas(self) -> List[str]:
+        """Retorna os nomes das abas presentes no snapshot.
+
+        Returns:
+            nomesAbas: Nomes das abas na ordem em que foram gravadas
+        """
+        return list(self.manifesto()["abas"])
+
+    def leAba(self, nomeAbaPlanilha: str) -> Tuple[pd.DataFrame, str]:
+        """Retorna uma aba do snapshot.
+
+        O arquivo é lido mapeado em memória apenas na primeira \
+            vez ou quando o snapshot é regravado. O Dataframe é \
+            compartilhado entre as chamadas e não deve ser alterado.
+
+        Args:
+            nomeAbaPlanilha: Nome da aba da planilha
+
+        Returns:
+            aba: Tupla com o Dataframe e o hash do conteúdo
+        """
+        info = self.manifesto()["abas"].get(nomeAbaPlanilha)
+        if info is None:
+            raise KeyError(f"A aba {nomeAbaPlanilha} não está no snapshot")
+
+        with self._trava:
+            aba = self._abas.get(nomeAbaPlanilha)
+        if aba is not None and aba[1] == info["versao"]:
+            return aba
+
+        df = formato.leArquivoAba(self.diretorio / info["arquivo"])
+        aba = (df, info["versao"])
+        with self._trava:
+            self._abas[nomeAbaPlanilha] = aba
+        return aba
+
+
+def main() -> None:
+    """Exporta as abas do portal para um diretório de snapshot."""
+    from backEnd.etl import ABAS_PORTAL, DriveProcessor
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("diretorio", type=Path)
+    parser.add_argument("--abas", nargs="+", default=list(ABAS_PORTAL))
+    parser.add_argument(
+        "--planilha", default=None, help="Por padrão usa o ID_PLANILHA"
+    )  # noqa E501
+    argumentos = parser.parse_args()
+
+    # O export le sempre do Google e do Redis, nunca do snapshot que
+    # ele mesmo vai substituir
+    os.environ.pop("DIRETORIO_SNAPSHOT", None)
+    processador = DriveProcessor(
+        Path(os.getenv("PATH_GOOGLE_CREDENTIALS", "")),
+        os.getenv("REDIS_URL"),
+        idPlanilha=argumentos.planilha,
+    )
+    manifesto = processador.exportaSnapshot(
+        argumentos.diretorio, argumentos.abas
+    )  # noqa E501
+    for nome, info in manifesto["abas"].items():
+        print(f"{nome}: {info['linhas']} linhas ({info['arquivo']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Este módulo contém os gráficos do portal e o cache \
+    das figuras já montadas."""
+
+import json
+from typing import Callable, Dict, Hashable, List, Tuple
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly_express as px
+
+from backEnd.cache import CacheLocal
+from backEnd.metricas import METRICAS
+
+cores = {"META": "#FF5733", "NOTA": "#ffa500"}
+
+
+class CacheFiguras:
+    """Cache limitado das figuras já montadas."""
+
+    def __init__(
+        self, tamanhoMaximo: int = 16 * 1024 * 1024, ttl: int = 3600
+    ) -> None:  # noqa E501
+        """Instancia o cache vazio.
+
+        Args:
+            tamanhoMaximo: Soma máxima, em bytes, do JSON das figuras
+            ttl: Tempo de vida das figuras em segundos
+        """
+        self._cache = CacheLocal(tamanhoMaximo, ttl)
+
+    def figura(
+        self,
+        visao: str,
+        parametros: Tuple[Hashable, ...],
+        constroi: Callable[[], go.Figure],
+    ) -> go.Figure:
+        """Retorna a figura de uma visão, montando-a só na primeira vez.
+
+        A chave deve conter tudo o que muda o gráfico, inclusive \
+            a versão dos dados, já que a figura guardada não é \
+            invalidada quando a planilha muda.
+
+        Args:
+            visao: Nome que identifica o gráfico
+            parametros: Seleções da tela e versão dos dados
+            constroi: Função que monta a figura quando ela não está \
+                em cache
+
+        Returns:
+            figura: A figura guardada, compartilhada entre as sessões \
+                e que não deve ser alterada
+        """
+        chave = json.dumps([visao, parametros], default=str)
+        figura = self._cache.obter(chave)
+        encontradas = int(figura is not None)
+        METRICAS.cache("figuras", encontradas, 1 - encontradas)
+        if figura is None:
+            with METRICAS.etapa("figura", visao=visao):
+                figura = constroi()
+
+            # O tamanho do JSON serve de estimativa da memória ocupada
+            tamanho = len(figura.to_json())
+            METRICAS.tamanho("figura", tamanho)
+            self._cache.armazenar(chave, figura, tamanho=tamanho)
+
+        return figura
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Retorna os contadores do cache de figuras.
+
+        Returns:
+            estatisticas: Acertos, falhas, remoções, itens e bytes
+        """
+        return self._cache.estatisticas()
+
+
+def figuraQuantidadeAlunos(dfQuantidade: pd.DataFrame) -> go.Figure:
+    """Monta o gráfico de quantidade de estudantes por série.
+
+    Args:
+        dfQuantidade: Dataframe com as colunas ANO e \
+            QUANTIDADE ESTUDANTES
+
+    Returns
+        figura: O gráfico de barras horizontais
+    """
+    graficoEscolas = px.bar(
+        dfQuantidade,
+        x="QUANTIDADE ESTUDANTES",
+        y="ANO",
+        title="Quantidade de estudantes por série",
+        text="QUANTIDADE ESTUDANTES",
+        orientation="h",
+    ).update_layout(xaxis=dict(visible=False))
+
+    graficoEscolas.update_yaxes(title="SÉRIE", showticklabels=True)
+
+    graficoEscolas.update_traces(
+        textfont=dict(size=25), marker=dict(color="orange")
+    )  # noqa E501
+    return graficoEscolas
+
+
+def figuraIdebGeral(
+    dfGeral: pd.DataFrame, serieIdeb: str, anoSelecionado: str
+) -> go.Figure:
+    """Monta o gráfico de nota e meta do IDEB geral por polo.
+
+    Args:
+        dfGeral: Dataframe macro já filtrado por ano e polos
+        serieIdeb: Série selecionada, como "5° ano"
+        anoSelecionado: Ano de análise selecionado
+
+    Returns
+        figura: O gráfico de barras agrupadas
+    """
+    graficoGeralIdeb = px.bar(
+        dfGeral,
+        x="ESCOLA",
+        y=["NOTA", "META"],
+        barmode="group",
+        title=f"Média geral IDEB do {serieIdeb} em {anoSelecionado}",
+        color_discrete_map=cores,
+    )
+
+    graficoGeralIdeb.update_xaxes(title="", showticklabels=True)
+    graficoGeralIdeb.update_yaxes(title="", showticklabels=True)
+    graficoGeralIdeb.update_layout(legend_title_text="")
+    return graficoGeralIdeb
+
+
+def figuraRankingIdeb(
+    dfOrdenado: pd.DataFrame,
+    serieIdeb: str,
+    anoSelecionado: str,
+    coresBarras: List[str] | None = None,
+) -> go.Figure:
+    """Monta o gráfico de atingimento da meta do IDEB por escola.
+
+    Args:
+        dfOrdenado: Dataframe micro do ano, já na ordem de exibição
+        serieIdeb: Série selecionada, como "5° ano"
+        anoSelecionado: Ano de análise selecionado
+        coresBarras: Cor de cada barra, já calculada pelo ranking. \
+            Se omitida é calculada pelo atingimento
+
+    Returns
+        figura: O gráfico de barras horizontais com a linha da meta
+    """
+    graficoMicroIdeb = px.bar(
+        dfOrdenado,
+        x="ATINGIMENTO",
+        y="ESCOLA",
+        title=f"Atingimento do IDEB do {serieIdeb} pelas escolas em {anoSelecionado}",  # noqa E501
+        orientation="h",
+    ).update_layout(height=600)
+
+    graficoMicroIdeb.update_yaxes(title="", showticklabels=True)
+    if coresBarras is None:
+        coresBarras = [
+            "red" if pontuacao < 1 else "green"
+            for pontuacao in dfOrdenado["ATINGIMENTO"]
+        ]
+    graficoMicroIdeb.update_traces(marker_color=coresBarras)
+
+    # Adicionar linha constante no eixo x
+    graficoMicroIdeb.add_shape(
+        type="line",
+        x0=1,
+        y0=-0.5,
+        x1=1,
+        y1=len(dfOrdenado) - 0.5,
+        line=dict(color="#ffa500", width=2),
+    )
+    graficoMicroIdeb.add_annotation(
+        x=1,
+        y=len(dfOrdenado) + 0.85,
+        text="OBJETIVO",
+        showarrow=False,
+        font=dict(size=12, color="orange"),
+        xshift=25,
+    )
+    return graficoMicroIdeb
+
+
+def figuraEvolucaoIdeb(
+    dfEscola: pd.DataFrame, serieIdeb: str, escolaSelecionada: str
+) -> go.Figure:
+    """Monta o gráfico de evolução da nota e meta de uma escola.
+
+    Args:
+        dfEscola: Dataframe micro filtrado para a escola
+        serieIdeb: Série selecionada, como "5° ano"
+        escolaSelecionada: Nome da escola
+
+    Returns
+        figura: O gráfico de barras agrupadas por ano
+    """
+    graficoEvolucaoIdeb = px.bar(
+        dfEscola,
+        x="ANO",
+        y=["NOTA", "META"],
+        barmode="group",
+        title=f"Evolução nota IDEB do {serieIdeb} para {escolaSelecionada}",
+        color_discrete_map=cores,
+    )
+
+    graficoEvolucaoIdeb.update_xaxes(title="", showticklabels=True)
+    graficoEvolucaoIdeb.update_yaxes(title="NOTA", showticklabels=True)
+    graficoEvolucaoIdeb.update_layout(legend_title_text="")
+    return graficoEvolucaoIdeb
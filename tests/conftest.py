@@ -0,0 +1,199 @@
+"""Fixtures compartilhadas pelos testes do projeto."""
+
+import copy
+import json
+from pathlib import Path
+
+import fakeredis
+import gspread
+import pytest
+import redis
+import requests
+import streamlit as st
+from gspread.exceptions import APIError
+from streamlit.testing.v1 import AppTest
+
+from backEnd.etl import DriveProcessor
+from backEnd.planilhas import ProcessadoresPlanilhas
+
+PLANILHA_TESTE = {
+    "Dados das Escolas": [
+        {
+            "ESCOLA": "EMEF ABC",
+            "DIRETOR": "Maria",
+            "ENDEREÇO": "Rua A, 10\nCentro",
+            "ATENDIMENTO": "1° AO 5° ANO * Integral * EJA",
+            "INEP": 42000001,
+            "AREA": 5.5,
+        },
+        {
+            "ESCOLA": "EMEF XYZ",
+            "DIRETOR": "João",
+            "ENDEREÇO": "Rua B, 20",
+            "ATENDIMENTO": "1° AO 9° ANO",
+            "INEP": 42000002,
+            "AREA": 6,
+        },
+    ],
+    "Quantidade de Alunos por Escola": [
+        {
+            "ESCOLA": "EMEF ABC",
+            "1° ANO": 20,
+            "2° ANO": "-",
+            "TOTAL DA ESCOLA": 20,
+            "ESTUDANTES COM DEFICIÊNCIA": 2,
+        },
+        {
+            "ESCOLA": "EMEF XYZ",
+            "1° ANO": 15,
+            "2° ANO": 17,
+            "TOTAL DA ESCOLA": 32,
+            "ESTUDANTES COM DEFICIÊNCIA": 0,
+        },
+    ],
+}
+
+
+def _tabelaIdeb(valores):
+    """Monta uma aba de IDEB com as colunas de 2019 e 2021."""
+    escolas = ["BRASIL", "SANTA CATARINA", "CRICIÚMA", "EMEF ABC", "EMEF XYZ"]
+    return [
+        {"ESCOLA": escola, "2019": nota2019, "2021": nota2021}
+        for escola, (nota2019, nota2021) in zip(escolas, valores)
+    ]
+
+
+for _serie, _abaMetas in [(5, "META IDEB 5º ANO"), (9, "META IDEB 9° ANO")]:
+    PLANILHA_TESTE[f"IDEB {_serie}° ANO"] = _tabelaIdeb(
+        [(57, 55), (60, 58), (62, 60), (58, "-"), ("*", "**")]
+    )
+    PLANILHA_TESTE[_abaMetas] = _tabelaIdeb(
+        [(55, 57), (58, 60), (60, 62), (60, 62), ("-", "")]
+    )
+
+
+def erroGoogle(codigo, retryAfter=None):
+    """Monta o erro do gspread para uma resposta HTTP do Google."""
+    resposta = requests.Response()
+    resposta.status_code = codigo
+    if retryAfter is not None:
+        resposta.headers["Retry-After"] = str(retryAfter)
+    resposta._content = json.dumps(
+        {"error": {"code": codigo, "message": "Falha simulada", "status": ""}}
+    ).encode()
+    return APIError(resposta)
+
+
+class GoogleFalso:
+    """Imita o cliente autenticado do gspread contando as chamadas."""
+
+    def __init__(self, planilha, outrasPlanilhas=None):
+        """Guarda a planilha servida pelo cliente e as demais, pelo id."""
+        self.planilha = planilha
+        self.outrasPlanilhas = outrasPlanilhas or {}
+        self.falhas = []
+        self.falhasRevisao = []
+        self.chamadas = 0
+        self.consultasRevisao = 0
+        self.modificadoEm = "2024-03-01T12:00:00.000Z"
+        self.http_client = self
+
+    def open_by_key(self, idPlanilha):
+        """Retorna a própria instância ou a de outra planilha."""
+        if idPlanilha in self.outrasPlanilhas:
+            return GoogleFalso(self.outrasPlanilhas[idPlanilha])
+        return self
+
+    def get_file_drive_metadata(self, idPlanilha):
+        """Retorna a data de modificação ou a próxima falha programada."""
+        self.consultasRevisao += 1
+        if self.falhasRevisao:
+            raise erroGoogle(self.falhasRevisao.pop(0))
+        return {"id": idPlanilha, "modifiedTime": self.modificadoEm}
+
+    def values_batch_get(self, ranges):
+        """Retorna os valores formatados ou a próxima falha programada."""
+        self.chamadas += 1
+        if self.falhas:
+            raise erroGoogle(self.falhas.pop(0))
+        intervalos = []
+        for intervalo in ranges:
+            registros = self.planilha[intervalo.strip("'")]
+            cabecalho = list(registros[0])
+            valores = [cabecalho] + [
+                [str(registro[chave]) for chave in cabecalho] for registro in registros
+            ]
+            intervalos.append({"range": intervalo, "values": valores})
+        return {"valueRanges": intervalos}
+
+
+@pytest.fixture
+def google():
+    """Cliente Google falso com uma cópia da planilha de teste."""
+    return GoogleFalso(copy.deepcopy(PLANILHA_TESTE))
+
+
+@pytest.fixture
+def processador(monkeypatch, google):
+    """Processador ligado a um Redis em memória e ao Google falso."""
+    servidor = fakeredis.FakeServer()
+    monkeypatch.setenv("TTL", "60")
+    monkeypatch.setenv("ID_PLANILHA", "planilha-teste")
+    # Cota folgada para que os testes não esperem pelo balde
+    monkeypatch.setenv("COTA_GOOGLE", "600")
+    monkeypatch.setattr(gspread, "service_account", lambda filename: google)
+    monkeypatch.setattr(
+        redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.FakeRedis(server=servidor),
+    )
+    return DriveProcessor("credenciais.json", "redis://teste")
+
+
+@pytest.fixture
+def processadores(monkeypatch):
+    """Registro de duas planilhas com escolas diferentes no mesmo Redis."""
+    outra = copy.deepcopy(PLANILHA_TESTE)
+    for registro in outra["Dados das Escolas"]:
+        registro["ESCOLA"] = registro["ESCOLA"].replace("EMEF", "EMEI")
+    google = GoogleFalso(copy.deepcopy(PLANILHA_TESTE), {"planilha-outra": outra})
+
+    servidor = fakeredis.FakeServer()
+    monkeypatch.setenv("TTL", "60")
+    monkeypatch.setattr(gspread, "service_account", lambda filename: google)
+    monkeypatch.setattr(
+        redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.FakeRedis(server=servidor),
+    )
+    return ProcessadoresPlanilhas(
+        "credenciais.json",
+        "redis://teste",
+        ["planilha-teste", "planilha-outra"],
+        orcamentos={"planilha-outra": 3 * 1024},
+    )
+
+
+@pytest.fixture
+def pagina(monkeypatch, google):
+    """Página do portal em um AppTest, ligada ao Google falso."""
+    servidor = fakeredis.FakeServer()
+    monkeypatch.setenv("TTL", "60")
+    monkeypatch.setenv("ID_PLANILHA", "planilha-teste")
+    monkeypatch.setenv("PATH_GOOGLE_CREDENTIALS", "credenciais.json")
+    monkeypatch.setenv("REDIS_URL", "redis://teste")
+    monkeypatch.setenv("COTA_GOOGLE", "600")
+    for variavel in ("DIRETORIO_SNAPSHOT", "PLANILHAS"):
+        monkeypatch.delenv(variavel, raising=False)
+    monkeypatch.setattr(gspread, "service_account", lambda filename: google)
+    monkeypatch.setattr(
+        redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.FakeRedis(server=servidor),
+    )
+
+    # Os processadores da página ficam no st.cache_resource do processo
+    st.cache_resource.clear()
+    caminhoApp = Path(__file__).resolve().parents[1] / "src" / "app.py"
+    yield AppTest.from_file(str(caminhoApp), default_timeout=30)
+    st.cache_resource.clear()
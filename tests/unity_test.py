@@ -1,10 +1,844 @@
 """Utilize esse arquivo para colocar os testes unitários do projeto."""
 
-# Descomente a importação do pytest caso você utilize as fixtures da lib
-# import pytest
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import gspread
+import numpy as np
+import pandas as pd
+import pytest
+import redis
+from gspread.exceptions import APIError
+
+from backEnd import snapshot
+from backEnd.aquecimento import aquece
+from backEnd.cache import CacheLocal
+from backEnd.cotaGoogle import CotaGoogle
+from backEnd.etl import ABAS_PORTAL, DriveProcessor
+from backEnd.formato import CABECALHO, desserializaAba, serializaAba
+from backEnd.metricas import METRICAS, Metricas
+from backEnd.snapshot import SnapshotLocal
+from benchmarks import cargaPortal, etlPortal
+from frontEnd.graficos import CacheFiguras, figuraEvolucaoIdeb
 
 
 def test_placeHolder():
     """Teste criado apenas como placeholder."""
     teste = 1
     assert teste == 1
+
+
+def test_dadosEscola(processador):
+    """Os dados da escola vêm tratados e com os totais de alunos."""
+    infoGerais, quantidadePorAno = processador.dadosEscola("EMEF ABC")
+
+    assert infoGerais["ENDEREÇO"] == "Rua A, 10, Centro"
+    assert infoGerais["ATENDIMENTO"] == "1° AO 5° ANO"
+    assert infoGerais["OBS. ATENDIMENTO"] == "Integral, EJA"
+    assert infoGerais["TOTAL DE ESTUDANTES DA ESCOLA"] == 20
+    assert infoGerais["ESTUDANTES COM DEFICIÊNCIA"] == 2
+    assert quantidadePorAno["QUANTIDADE POR ANO"]["ANO"].tolist() == ["1° ANO"]
+
+
+def test_indiceEscolasReaproveitado(processador):
+    """O índice só é reconstruído quando a versão das abas muda."""
+    indice = processador.indiceEscolas()
+    assert processador.indiceEscolas() is indice
+
+    # Alterar o retorno do chamador não altera o índice
+    processador.dadosEscola("EMEF XYZ")[0].pop("ESCOLA")
+    assert processador.dadosEscola("EMEF XYZ")[0]["ESCOLA"] == "EMEF XYZ"
+
+
+def test_cacheLocalRemoveMenosUsado():
+    """O cache remove o item menos usado quando passa do tamanho."""
+    cache = CacheLocal(tamanhoMaximo=10, ttl=60)
+    cache.armazenar("a", 1, tamanho=4)
+    cache.armazenar("b", 2, tamanho=4)
+    assert cache.obter("a") == 1
+    cache.armazenar("c", 3, tamanho=4)
+
+    assert cache.obter("b") is None
+    assert cache.obter("a") == 1
+    assert cache.obter("c") == 3
+    assert cache.estatisticas()["remocoes"] == 1
+
+
+def test_cacheLocalDescartaValorAnteriorGrandeDemais():
+    """Um valor maior que o cache não deixa o anterior sendo servido."""
+    cache = CacheLocal(tamanhoMaximo=10, ttl=60)
+    cache.armazenar("a", 1, tamanho=4)
+    cache.armazenar("a", 2, tamanho=11)
+
+    assert cache.obter("a") is None
+    assert cache.estatisticas()["bytes"] == 0
+
+
+def test_cacheLocalExpira():
+    """Itens com tempo de vida esgotado são tratados como falha."""
+    cache = CacheLocal(tamanhoMaximo=10, ttl=60)
+    cache.armazenar("a", 1, tamanho=1, ttl=0)
+
+    assert cache.obter("a") is None
+    assert cache.estatisticas()["falhas"] == 1
+
+
+def test_redisRetrieveUsaCacheLocal(processador, monkeypatch):
+    """Depois da primeira leitura a aba não é buscada no Redis."""
+    processador.listaEscolas()
+    monkeypatch.setattr(processador, "_redis", None)
+
+    assert processador.listaEscolas() == ["EMEF ABC", "EMEF XYZ"]
+    assert processador.cacheLocal.estatisticas()["acertos"] >= 1
+
+
+def test_redisRetrieveVarios(processador, google):
+    """Várias abas são lidas juntas e só as ausentes vão ao Google."""
+    processador.redisDump("Dados das Escolas", [{"ESCOLA": "EMEF ABC"}])
+
+    valores = processador.redisRetrieveVarios(
+        ["Dados das Escolas", "Quantidade de Alunos por Escola"]
+    )
+    assert valores == {
+        "Dados das Escolas": [{"ESCOLA": "EMEF ABC"}],
+        "Quantidade de Alunos por Escola": None,
+    }
+
+    processador.cacheLocal.limpar()
+    processador.importaPlanilhaPorAbas(
+        ["Dados das Escolas", "Quantidade de Alunos por Escola"]
+    )
+    assert google.chamadas == 1
+
+
+def test_importacaoEmLote(processador, google):
+    """Uma falta de cache busca todas as abas do portal de uma vez."""
+    processador.listaEscolas()
+    processador.retornaPlanilhaIdebMacro(5)
+    processador.retornaPlanilhaIdebMicro(9)
+
+    assert google.chamadas == 1
+    assert processador.redisRetrieve("META IDEB 5º ANO")[0] == {
+        "ESCOLA": "BRASIL",
+        "2019": 55,
+        "2021": 57,
+    }
+
+
+def test_limpezaAceitaColunaNumericaMista(processador):
+    """Colunas que misturam inteiros e reais passam pela limpeza intactas."""
+    assert processador.dadosEscola("EMEF ABC")[0]["AREA"] == 5.5
+    assert processador.dadosEscola("EMEF XYZ")[0]["AREA"] == 6
+
+    dfEscolas = pd.DataFrame(
+        {
+            "ESCOLA": ["EMEF\nABC", "EMEF XYZ"],
+            "ENDEREÇO": ["Rua A\n10", "Rua B"],
+            "ATENDIMENTO": ["1° ANO", "2° ANO"],
+            "AREA": pd.Series([5.5, 6], dtype=object),
+            "SALAS": ["1\n2", 7],
+        }
+    )
+    limpo = DriveProcessor.limpaDadosEscolas(dfEscolas)
+    assert limpo["ESCOLA"].tolist() == ["EMEFABC", "EMEF XYZ"]
+    assert limpo["AREA"].tolist() == [5.5, 6]
+    assert limpo["SALAS"].tolist() == ["12", 7]
+
+
+def test_importacaoUnicaConcorrente(processador, google, monkeypatch):
+    """Chamadas concorrentes com o cache vazio geram uma só busca."""
+    buscaOriginal = google.values_batch_get
+
+    def buscaLenta(ranges):
+        time.sleep(0.1)
+        return buscaOriginal(ranges)
+
+    monkeypatch.setattr(google, "values_batch_get", buscaLenta)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        resultados = list(executor.map(lambda _: processador.listaEscolas(), range(8)))
+
+    assert google.chamadas == 1
+    assert all(resultado == ["EMEF ABC", "EMEF XYZ"] for resultado in resultados)
+
+
+def test_importacaoUsaValorAnteriorSemTrava(processador, google):
+    """Se outra réplica segura a trava, o último valor é servido."""
+    processador.listaEscolas()
+    cache = processador.cacheLocal
+    cache.armazenar("Dados das Escolas", cache.obter("Dados das Escolas"), 1, ttl=0)
+    processador._redis.flushall()
+    processador._redis.set("trava:planilha-teste", "outra-replica")
+    processador.esperaTrava = 0.05
+
+    assert processador.listaEscolas() == ["EMEF ABC", "EMEF XYZ"]
+    assert google.chamadas == 1
+
+
+def test_importacaoEsperaTravaLentaSemValorAnterior(processador, google, monkeypatch):
+    """Sem valor anterior, quem espera não repete a busca da outra réplica."""
+    buscaOriginal = google.values_batch_get
+
+    def buscaLenta(ranges):
+        time.sleep(0.3)
+        return buscaOriginal(ranges)
+
+    monkeypatch.setattr(google, "values_batch_get", buscaLenta)
+    replicas = [processador] + [
+        DriveProcessor("credenciais.json", "redis://teste", esperaTrava=0.05)
+    ]
+    processador.esperaTrava = 0.05
+
+    with ThreadPoolExecutor(max_workers=len(replicas)) as executor:
+        resultados = list(executor.map(DriveProcessor.listaEscolas, replicas))
+
+    assert google.chamadas == 1
+    assert all(resultado == ["EMEF ABC", "EMEF XYZ"] for resultado in resultados)
+
+
+def test_revalidacaoEmSegundoPlano(processador, google):
+    """Abas vencidas são servidas enquanto a atualização roda em paralelo."""
+    processador.ttlMaximo = 120
+    processador.listaEscolas()
+
+    # Simula uma aba gravada há 90 segundos, acima do TTL de 60
+    processador._redis.expire(processador._chave("Dados das Escolas"), 30)
+    processador.cacheLocal.limpar()
+    google.planilha["Dados das Escolas"][0]["ESCOLA"] = "EMEF NOVA"
+    google.modificadoEm = "2024-04-01T12:00:00.000Z"
+
+    assert processador.listaEscolas() == ["EMEF ABC", "EMEF XYZ"]
+
+    for _ in range(100):
+        if google.chamadas == 2 and not processador._revalidando:
+            break
+        time.sleep(0.01)
+
+    assert processador.listaEscolas() == ["EMEF NOVA", "EMEF XYZ"]
+
+
+def test_tabelasIdeb(processador):
+    """As visões geral e das escolas saem de uma tabela calculada uma vez."""
+    dfMacro = processador.retornaPlanilhaIdebMacro(5)
+    dfMicro = processador.retornaPlanilhaIdebMicro(5)
+
+    assert dfMacro["ESCOLA"].unique().tolist() == [
+        "BRASIL",
+        "SANTA CATARINA",
+        "CRICIÚMA",
+    ]
+    assert dfMacro.loc[0, "ATINGIMENTO"] == pytest.approx(5.7 / 5.5)
+
+    # A linha sem nota e sem meta da EMEF XYZ é descartada
+    assert dfMicro[["ESCOLA", "ANO"]].values.tolist() == [
+        ["EMEF ABC", "2019"],
+        ["EMEF ABC", "2021"],
+    ]
+    assert dfMicro["NOTA"].tolist() == pytest.approx([5.8, 0.0])
+    assert dfMicro["META"].tolist() == pytest.approx([6.0, 6.2])
+    assert dfMicro["ATINGIU META"].tolist() == [False, False]
+    assert processador.tabelasIdeb(5) is processador.tabelasIdeb(5)
+
+
+def test_rankingIdeb(processador):
+    """O ranking de cada ano já vem contado, ordenado e colorido."""
+    ranking = processador.rankingIdeb(5, "2019")
+
+    assert (ranking["ACIMA"], ranking["ABAIXO"]) == (0, 1)
+    assert ranking["ASCENDENTE"]["DADOS"]["ESCOLA"].tolist() == ["EMEF ABC"]
+    assert ranking["ASCENDENTE"]["CORES"] == ["red"]
+    assert processador.rankingIdeb(5, "2019") is ranking
+
+    dfMicro = processador.retornaPlanilhaIdebMicro(9)
+    dfMicro = dfMicro[dfMicro["ANO"] == "2021"]
+    ranking = processador.rankingIdeb(9, "2021")
+    assert ranking["ACIMA"] + ranking["ABAIXO"] == len(dfMicro)
+    for ordem, ascendente in (("ASCENDENTE", True), ("DESCENDENTE", False)):
+        esperado = dfMicro.sort_values("ATINGIMENTO", ascending=ascendente)
+        assert ranking[ordem]["DADOS"]["ATINGIMENTO"].tolist() == (
+            esperado["ATINGIMENTO"].tolist()
+        )
+
+
+def test_historicoIdeb(processador):
+    """O histórico de cada escola sai do índice, sem filtrar a tabela."""
+    historico = processador.historicoIdeb(9)
+    dfMicro = processador.retornaPlanilhaIdebMicro(9)
+
+    assert list(historico) == dfMicro["ESCOLA"].unique().tolist()
+    for escola, dfEscola in historico.items():
+        esperado = dfMicro[dfMicro["ESCOLA"] == escola].reset_index(drop=True)
+        pd.testing.assert_frame_equal(dfEscola, esperado)
+    assert processador.historicoIdeb(9) is historico
+
+
+def test_tabelasIdebCompactas(processador):
+    """Escola e ano viram categorias, notas float32 e a meta booleana."""
+    dfMicro = processador.retornaPlanilhaIdebMicro(5)
+
+    assert dfMicro.dtypes.astype(str).to_dict() == {
+        "ESCOLA": "category",
+        "ANO": "category",
+        "NOTA": "float32",
+        "META": "float32",
+        "ATINGIMENTO": "float32",
+        "ATINGIU META": "bool",
+    }
+    assert dfMicro["ANO"].cat.categories.tolist() == ["2019", "2021"]
+
+    quantidade = processador.dadosEscola("EMEF ABC")[1]["QUANTIDADE POR ANO"]
+    assert quantidade["QUANTIDADE ESTUDANTES"].dtype == np.int16
+    assert processador.tabelasIdeb(5) is processador.tabelasIdeb(5)
+
+
+def test_formatoBinarioPreservaTipos():
+    """Inteiros, reais, textos e nulos voltam como estavam na aba."""
+    registros = [
+        {"ESCOLA": "EMEF ABC", "2019": 57, "2021": "-", "MEDIA": 5.5},
+        {"ESCOLA": "EMEF XYZ", "2019": 55, "2021": 60, "MEDIA": None},
+    ]
+
+    bruto = serializaAba(registros)
+    df = desserializaAba(bruto)
+
+    assert bruto.startswith(CABECALHO)
+    assert df.to_dict(orient="records") == registros
+    assert [type(valor) for valor in df["2021"]] == [str, int]
+
+
+def test_formatoBinarioLeJsonAntigo():
+    """Entradas gravadas em JSON antes do formato binário continuam legíveis."""
+    registros = [{"ESCOLA": "EMEF ABC", "2019": 57}]
+
+    df = desserializaAba(json.dumps(registros).encode())
+
+    assert df.to_dict(orient="records") == registros
+
+
+def test_resultadoDerivadoCompartilhado(processador, monkeypatch):
+    """Outro processo reaproveita pelo Redis o resultado já calculado."""
+    dfMicro = processador.retornaPlanilhaIdebMicro(5)
+
+    outroProcessador = DriveProcessor("credenciais.json", "redis://teste")
+
+    def semCalculo(*args):
+        raise AssertionError("O resultado deveria vir do cache")
+
+    monkeypatch.setattr(outroProcessador, "_calculaTabelasIdeb", semCalculo)
+
+    pd.testing.assert_frame_equal(outroProcessador.retornaPlanilhaIdebMicro(5), dfMicro)
+
+
+def test_resultadoDerivadoInvalidado(processador):
+    """Quando a aba de origem muda o resultado é recalculado."""
+    assert processador.dadosEscola("EMEF ABC")[0]["DIRETOR"] == "Maria"
+
+    dadosEscolas = processador.redisRetrieve("Dados das Escolas")
+    dadosEscolas[0]["DIRETOR"] = "Ana"
+    processador.redisDump("Dados das Escolas", dadosEscolas)
+
+    assert processador.dadosEscola("EMEF ABC")[0]["DIRETOR"] == "Ana"
+
+
+def test_autenticacaoGoogleSobDemanda(processador, google, monkeypatch):
+    """O Google só é autenticado na primeira falta de cache."""
+    autenticacoes = []
+
+    def autentica(filename):
+        autenticacoes.append(filename)
+        return google
+
+    monkeypatch.setattr(gspread, "service_account", autentica)
+    processador.redisDump("Dados das Escolas", [{"ESCOLA": "EMEF ABC"}])
+    processador.importacaoEmLote = False
+
+    assert processador.listaEscolas() == ["EMEF ABC"]
+    assert autenticacoes == []
+
+    processador.retornaPlanilhaIdebMicro(5)
+    processador.retornaPlanilhaIdebMicro(9)
+    assert autenticacoes == ["credenciais.json"]
+
+
+def test_cacheFigurasReaproveitaFigura():
+    """A figura só é montada de novo quando a chave muda."""
+    figuras = CacheFiguras()
+    dfEscola = pd.DataFrame(
+        {"ANO": ["2019", "2021"], "NOTA": [5.8, 6.0], "META": [6.0, 6.2]}
+    )
+    construcoes = []
+
+    def constroi():
+        construcoes.append(1)
+        return figuraEvolucaoIdeb(dfEscola, "5° ano", "EMEF ABC")
+
+    primeira = figuras.figura("evolucaoIdeb", ("5° ano", "EMEF ABC", "v1"), constroi)
+    segunda = figuras.figura("evolucaoIdeb", ("5° ano", "EMEF ABC", "v1"), constroi)
+    assert len(construcoes) == 1
+    # Acertos devolvem a própria figura, sem desserializar de novo
+    assert primeira is segunda
+
+    figuras.figura("evolucaoIdeb", ("5° ano", "EMEF ABC", "v2"), constroi)
+    assert len(construcoes) == 2
+
+
+def test_versaoAcompanhaOsDadosDerivados(processador, google):
+    """A versão vem junto com os dados que a originaram."""
+    indice = processador.indiceEscolas()
+    tabelas = processador.tabelasIdeb(5)
+    assert indice.versao and tabelas["VERSAO"]
+    assert tabelas["HISTORICO"].versao == tabelas["VERSAO"]
+
+    google.planilha["Dados das Escolas"][1]["DIRETOR"] = "Ana"
+    google.modificadoEm = "2024-04-01T12:00:00.000Z"
+    processador.importaPlanilhaCompleta()
+
+    novoIndice = processador.indiceEscolas()
+    assert novoIndice.versao != indice.versao
+    assert novoIndice["EMEF XYZ"][0]["DIRETOR"] == "Ana"
+    assert indice["EMEF XYZ"][0]["DIRETOR"] == "João"
+    assert processador.tabelasIdeb(5)["VERSAO"] == tabelas["VERSAO"]
+
+
+def test_snapshotServeSemGoogleERedis(processador, tmp_path, monkeypatch):
+    """O snapshot exportado serve as abas sem Google e sem Redis."""
+    manifesto = processador.exportaSnapshot(tmp_path)
+    assert set(manifesto["abas"]) == set(ABAS_PORTAL)
+
+    def semRede(*args, **kwargs):
+        raise AssertionError("O modo snapshot não deveria usar a rede")
+
+    monkeypatch.setattr(gspread, "service_account", semRede)
+    monkeypatch.setattr(redis, "from_url", semRede)
+    offline = DriveProcessor("credenciais.json", None, diretorioSnapshot=tmp_path)
+
+    for nome in ABAS_PORTAL:
+        assert offline.importaPlanilhaPorAba(nome) == processador.importaPlanilhaPorAba(
+            nome
+        )
+    assert offline.dadosEscola("EMEF ABC")[0] == processador.dadosEscola("EMEF ABC")[0]
+    pd.testing.assert_frame_equal(
+        offline.retornaPlanilhaIdebMicro(9), processador.retornaPlanilhaIdebMicro(9)
+    )
+
+    # Um novo export troca os arquivos e o leitor percebe a mudança
+    dadosEscolas = processador.redisRetrieve("Dados das Escolas")
+    dadosEscolas[0]["DIRETOR"] = "Ana"
+    processador.redisDump("Dados das Escolas", dadosEscolas)
+    novoManifesto = processador.exportaSnapshot(tmp_path)
+
+    assert offline.dadosEscola("EMEF ABC")[0]["DIRETOR"] == "Ana"
+
+    # Quem ainda lê o manifesto anterior encontra os seus arquivos
+    def arquivos(manifestoSnapshot):
+        return {info["arquivo"] for info in manifestoSnapshot["abas"].values()}
+
+    presentes = {arquivo.name for arquivo in tmp_path.glob("*.arrow")}
+    assert presentes == arquivos(manifesto) | arquivos(novoManifesto)
+
+    # Só as gerações anteriores à última são apagadas
+    dadosEscolas[0]["DIRETOR"] = "Bia"
+    processador.redisDump("Dados das Escolas", dadosEscolas)
+    ultimoManifesto = processador.exportaSnapshot(tmp_path)
+    presentes = {arquivo.name for arquivo in tmp_path.glob("*.arrow")}
+    assert presentes == arquivos(novoManifesto) | arquivos(ultimoManifesto)
+
+    # Colunas numéricas apontam para o arquivo mapeado, sem cópia
+    dfEscolas, _ = offline.snapshot.leAba("Dados das Escolas")
+    inep = dfEscolas["INEP"].to_numpy()
+    assert inep.dtype == np.int64 and not inep.flags.writeable
+
+
+def test_metricasPorEtapa(processador):
+    """As etapas e os acessos ao cache viram métricas exportáveis."""
+    chamadas = METRICAS.observacoes("etapa_segundos", etapa="google")
+    faltasLocais = METRICAS.contador("cache_total", camada="local", resultado="falha")
+
+    processador.retornaPlanilhaIdebMicro(5)
+    processador.retornaPlanilhaIdebMicro(5)
+
+    assert METRICAS.observacoes("etapa_segundos", etapa="google") == chamadas + 1
+    assert (
+        METRICAS.contador("cache_total", camada="local", resultado="falha")
+        > faltasLocais
+    )
+    assert METRICAS.contador("cache_total", camada="derivado", resultado="acerto") >= 1
+
+    metricas = Metricas()
+    with metricas.etapa("calculo", funcao="tabelasIdeb"):
+        pass
+    metricas.cache("redis", acertos=2, falhas=1)
+    texto = metricas.exportaPrometheus()
+
+    assert "# TYPE portal_etapa_segundos histogram" in texto
+    assert (
+        'portal_etapa_segundos_bucket{etapa="calculo",funcao="tabelasIdeb",le="+Inf"} 1'
+        in texto
+    )
+    assert 'portal_cache_total{camada="redis",resultado="acerto"} 2' in texto
+    assert "# TYPE portal_cache_total counter" in texto
+
+
+def test_preCarregaEmUmaIdaAoGoogle(processador, google):
+    """A pré-carga busca as abas juntas e roda as tarefas no pool."""
+    threads = []
+
+    def tarefa(anoIdeb):
+        threads.append(threading.current_thread().name)
+        return processador.tabelasIdeb(anoIdeb)
+
+    abas = processador.preCarrega(ABAS_PORTAL, [lambda: tarefa(5), lambda: tarefa(9)])
+
+    assert google.chamadas == 1
+    assert set(abas) == set(ABAS_PORTAL)
+    assert all(nome.startswith("preCarga") for nome in threads)
+
+    with pytest.raises(ZeroDivisionError):
+        processador.preCarrega(ABAS_PORTAL, [lambda: 1 / 0])
+    assert google.chamadas == 1
+
+
+def test_preCarregaApenasQuandoOsDadosMudam(processador, google):
+    """A pré-carga da página só usa o pool quando as abas mudam."""
+    execucoes = []
+
+    def preCarga():
+        processador.preCarrega(
+            ABAS_PORTAL, [lambda: execucoes.append(1)], apenasNovaVersao=True
+        )
+
+    preCarga()
+    preCarga()
+    assert len(execucoes) == 1
+
+    google.planilha["Dados das Escolas"][0]["DIRETOR"] = "Ana"
+    google.modificadoEm = "2024-04-01T12:00:00.000Z"
+    processador.importaPlanilhaCompleta()
+    preCarga()
+    assert len(execucoes) == 2
+
+    # Sem a opção as tarefas rodam sempre, como no aquecimento
+    processador.preCarrega(ABAS_PORTAL, [lambda: execucoes.append(1)])
+    assert len(execucoes) == 3
+
+    # Uma pré-carga que falha é repetida na próxima chamada
+    processador._versoesPreCarga.clear()
+    with pytest.raises(ZeroDivisionError):
+        processador.preCarrega(ABAS_PORTAL, [lambda: 1 / 0], apenasNovaVersao=True)
+    preCarga()
+    assert len(execucoes) == 4
+
+
+def test_atualizacaoSemMudancaSoRenovaCache(processador, google):
+    """Sem alteração no Drive as abas só têm o prazo renovado."""
+    processador.atualizaAbas()
+    indice = processador.indiceEscolas()
+    assert google.chamadas == 1
+
+    processador._redis.expire(processador._chave("Dados das Escolas"), 5)
+    abas = processador.importaPlanilhaCompleta()
+
+    assert google.chamadas == 1
+    assert processador._redis.ttl(processador._chave("Dados das Escolas")) > 5
+    assert processador.indiceEscolas() is indice
+    assert set(abas) == set(ABAS_PORTAL)
+
+    # Com a planilha alterada os valores são buscados de novo
+    google.modificadoEm = "2024-04-01T12:00:00.000Z"
+    processador.importaPlanilhaCompleta()
+    assert google.chamadas == 2
+    assert processador.indiceEscolas() is indice
+
+
+def test_exportaSnapshotIgnoraSnapshotAtual(processador, tmp_path, monkeypatch):
+    """O export pela linha de comando não relê o snapshot que substitui."""
+    processador.exportaSnapshot(tmp_path)
+    dadosEscolas = processador.redisRetrieve("Dados das Escolas")
+    dadosEscolas[0]["DIRETOR"] = "Ana"
+    processador.redisDump("Dados das Escolas", dadosEscolas)
+
+    monkeypatch.setenv("DIRETORIO_SNAPSHOT", str(tmp_path))
+    monkeypatch.setenv("REDIS_URL", "redis://teste")
+    monkeypatch.setattr(sys, "argv", ["snapshot", str(tmp_path)])
+    snapshot.main()
+
+    dfEscolas, _ = SnapshotLocal(tmp_path).leAba("Dados das Escolas")
+    assert dfEscolas["DIRETOR"].tolist() == ["Ana", "João"]
+
+
+def test_aquecimentoDeixaReplicasSoLendo(processador, google, monkeypatch):
+    """Depois do aquecimento outra réplica só lê do cache."""
+    resumo = aquece(processador)
+    assert resumo["escolas"] == 2
+    assert google.chamadas == 1
+
+    replica = DriveProcessor("credenciais.json", "redis://teste")
+
+    def semCalculo(*args):
+        raise AssertionError("O resultado deveria vir do cache")
+
+    monkeypatch.setattr(replica, "_constroiIndiceEscolas", semCalculo)
+    monkeypatch.setattr(replica, "_calculaTabelasIdeb", semCalculo)
+
+    assert list(replica.indiceEscolas()) == ["EMEF ABC", "EMEF XYZ"]
+    assert replica.dadosEscola("EMEF XYZ")[0]["DIRETOR"] == "João"
+    for anoIdeb in (5, 9):
+        tabelas = replica.tabelasIdeb(anoIdeb)
+        pd.testing.assert_frame_equal(
+            tabelas["MICRO"], processador.tabelasIdeb(anoIdeb)["MICRO"]
+        )
+        assert not replica.retornaPlanilhaIdebMacro(anoIdeb).empty
+    assert replica.rankingIdeb(5, "2019")["ASCENDENTE"]["CORES"] == ["red"]
+    assert list(replica.historicoIdeb(9)) == ["EMEF ABC"]
+    assert google.chamadas == 1
+
+    # Um novo aquecimento sem mudança na planilha não busca os valores
+    aquece(processador)
+    assert google.chamadas == 1
+
+
+def test_aquecimentoSimultaneoBuscaUmaVez(processador, google, monkeypatch):
+    """Réplicas que sobem juntas fazem uma só busca no Google."""
+    buscaOriginal = google.values_batch_get
+
+    def buscaLenta(ranges):
+        time.sleep(0.1)
+        return buscaOriginal(ranges)
+
+    monkeypatch.setattr(google, "values_batch_get", buscaLenta)
+    replicas = [processador] + [
+        DriveProcessor("credenciais.json", "redis://teste") for _ in range(3)
+    ]
+
+    with ThreadPoolExecutor(max_workers=len(replicas)) as executor:
+        resumos = list(executor.map(aquece, replicas))
+
+    assert google.chamadas == 1
+    assert google.consultasRevisao == 1
+    assert all(resumo["escolas"] == 2 for resumo in resumos)
+
+
+def test_aquecimentoIgnoraSnapshot(processador, tmp_path, caplog):
+    """Sem Redis, o aquecimento de uma planilha em snapshot é pulado."""
+    processador.exportaSnapshot(tmp_path)
+    offline = DriveProcessor("credenciais.json", None, diretorioSnapshot=tmp_path)
+
+    with caplog.at_level(logging.WARNING):
+        assert aquece(offline) is None
+    assert "sem Redis para aquecer" in caplog.text
+
+
+def test_derivadosSemCamadaDuplicada(processador):
+    """Tabelas e escolas vêm de um só resultado guardado no Redis."""
+    macro = processador.retornaPlanilhaIdebMacro(5)
+    micro = processador.retornaPlanilhaIdebMicro(5)
+    processador.dadosEscola("EMEF ABC")
+    processador.dadosEscola("EMEF XYZ")
+
+    # Um resultado para as tabelas de IDEB e outro para o índice
+    assert len(processador._redis.keys("planilha:planilha-teste:derivado:*")) == 2
+    assert processador.cacheDerivados.estatisticas()["itens"] == 2
+
+    # As cópias podem ser alteradas sem afetar o resultado guardado
+    macro.loc[:, "NOTA"] = 0
+    micro.drop(micro.index, inplace=True)
+    assert processador.retornaPlanilhaIdebMacro(5)["NOTA"].any()
+    assert not processador.retornaPlanilhaIdebMicro(5).empty
+
+
+def test_planilhasSeparadasNoMesmoRedis(processadores):
+    """Cada planilha tem as suas chaves e o seu orçamento de memória."""
+    teste = processadores.processador("planilha-teste")
+    outra = processadores.processador("planilha-outra")
+
+    assert teste.listaEscolas() == ["EMEF ABC", "EMEF XYZ"]
+    assert outra.listaEscolas() == ["EMEI ABC", "EMEI XYZ"]
+    assert teste.listaEscolas() == ["EMEF ABC", "EMEF XYZ"]
+
+    # Um só cliente Redis, com as chaves prefixadas pelo id da planilha
+    assert teste._redis is outra._redis
+    assert teste._executorPreCarga is outra._executorPreCarga
+    chaves = {chave.decode() for chave in teste._redis.keys("planilha:*")}
+    assert {
+        "planilha:planilha-teste:Dados das Escolas",
+        "planilha:planilha-outra:Dados das Escolas",
+    } <= chaves
+
+    estatisticas = processadores.estatisticas()
+    assert estatisticas["planilha-outra"]["abas"]["bytes"] <= 2 * 1024
+    assert processadores.processador() is teste
+    with pytest.raises(KeyError):
+        processadores.processador("planilha-desconhecida")
+
+
+def test_planilhasNaoMisturamChaves(processadores):
+    """Atualizar uma planilha nunca grava nas chaves da outra."""
+    teste = processadores.processador("planilha-teste")
+    outra = processadores.processador("planilha-outra")
+    teste.atualizaAbas()
+
+    # A busca usa sempre o id do próprio processador
+    with pytest.raises(ValueError):
+        teste.importaPlanilhaPorAba("planilha-outra", "Dados das Escolas")
+    assert teste.importaPlanilhaPorAba(
+        "planilha-teste", "Dados das Escolas"
+    ) == teste.importaPlanilhaPorAba("Dados das Escolas")
+    outra.atualizaAbas()
+    teste.cacheLocal.limpar()
+
+    assert teste.listaEscolas() == ["EMEF ABC", "EMEF XYZ"]
+    assert outra.listaEscolas() == ["EMEI ABC", "EMEI XYZ"]
+    assert teste._redis.hlen("revisoes:planilha-teste") == len(ABAS_PORTAL)
+    assert teste._redis.hlen("revisoes:planilha-outra") == len(ABAS_PORTAL)
+
+
+def test_cotaGoogleCompartilhadaEntreReplicas(processador):
+    """Réplicas descontam do mesmo balde de requisições no Redis."""
+    replicas = [
+        CotaGoogle(processador._redis, requisicoesPorMinuto=60, rajada=2)
+        for _ in range(2)
+    ]
+
+    assert replicas[0].reserva() == 0
+    assert replicas[1].reserva() == 0
+    assert replicas[0].reserva() > 0
+
+    replicas[1].esperaCota = 0
+    with pytest.raises(TimeoutError):
+        replicas[1].aguardaVez()
+
+
+def test_cargaFriaNaoConsultaRevisao(processador, google):
+    """Sem abas no Redis não há o que renovar nem revisão a consultar."""
+    assert processador.listaEscolas() == ["EMEF ABC", "EMEF XYZ"]
+    assert google.consultasRevisao == 0
+
+    # Com as abas expiradas a busca também vai direto aos valores
+    processador.cacheLocal.limpar()
+    processador._redis.delete(processador._chave("Dados das Escolas"))
+    processador.listaEscolas()
+    assert google.chamadas == 2
+    assert google.consultasRevisao == 0
+
+    fichas = float(processador._redis.hget("cota:google", "fichas"))
+    assert fichas == pytest.approx(processador.cotaGoogle.capacidade - 4, abs=0.5)
+
+
+def test_revisaoDoDriveDescontaDaCota(processador, google):
+    """A consulta de revisão e a busca dos valores usam o mesmo balde."""
+    processador.atualizaAbas()
+
+    # Uma consulta de revisão e duas requisições para os valores
+    fichas = float(processador._redis.hget("cota:google", "fichas"))
+    assert google.consultasRevisao == 1
+    assert fichas == pytest.approx(processador.cotaGoogle.capacidade - 3, abs=0.5)
+
+
+def test_googleRetentaFalhasPassageiras(processador, google):
+    """Respostas 429 e 5xx são tentadas de novo, as demais não."""
+    processador.cotaGoogle.esperaBase = 0.001
+    google.falhas = [429, 503]
+    google.falhasRevisao = [429]
+    retentativas = METRICAS.contador("google_retentativas_total", codigo=429)
+
+    processador.atualizaAbas()
+    assert processador.listaEscolas() == ["EMEF ABC", "EMEF XYZ"]
+    assert google.chamadas == 3
+    assert google.consultasRevisao == 2
+    assert METRICAS.contador("google_retentativas_total", codigo=429) == (
+        retentativas + 2
+    )
+
+    google.falhas = [404]
+    google.modificadoEm = "2024-04-01T12:00:00.000Z"
+    with pytest.raises(APIError):
+        processador.importaPlanilhaCompleta(["IDEB 5° ANO"])
+    assert google.chamadas == 4
+
+
+def test_googleFalhandoServeUltimoValor(processador, google):
+    """Com o Google indisponível, o último valor conhecido é servido."""
+    processador.listaEscolas()
+    cache = processador.cacheLocal
+    cache.armazenar("Dados das Escolas", cache.obter("Dados das Escolas"), 1, ttl=0)
+    processador._redis.flushall()
+    processador.cotaGoogle.tentativas = 2
+    processador.cotaGoogle.esperaBase = 0.001
+    google.modificadoEm = "2024-04-01T12:00:00.000Z"
+    google.falhas = [429, 429]
+
+    assert processador.listaEscolas() == ["EMEF ABC", "EMEF XYZ"]
+    assert google.chamadas == 3
+
+    # Sem valor anterior a falha chega a quem chamou
+    processador.cacheLocal.limpar()
+    processador._redis.flushall()
+    google.falhas = [500, 500]
+    with pytest.raises(APIError):
+        processador.listaEscolas()
+
+
+def test_benchmarkEtlMedeTodosOsCaminhos():
+    """O benchmark do ETL mede cada função nos três caminhos."""
+    resultados = etlPortal.executa(20, 3, 1)
+
+    medidos = {(linha["funcao"], linha["caminho"]) for linha in resultados}
+    assert medidos == {
+        (funcao, caminho)
+        for funcao in etlPortal.casos("")
+        for caminho in ("fria", "quente", "cálculo")
+    }
+    assert all(linha["tempo"] > 0 for linha in resultados)
+    assert all(linha["pico"] >= 0 for linha in resultados)
+
+
+def test_cargaPortalComUmaSessao():
+    """O teste de carga abre a página e interage sem erros."""
+    resultado = cargaPortal.executa(1, 4, 20, 3)
+
+    acoes = [acao for acao, _ in resultado["tempos"]]
+    assert acoes[0] == "abertura" and len(acoes) == 5
+    assert all(duracao > 0 for _, duracao in resultado["tempos"])
+    assert resultado["erros"] == []
+    assert resultado["rssFinal"] > 0
+
+
+def test_paginaExibeTodasAsSecoes(pagina):
+    """Cada fragmento da página é executado e exibido sem erros."""
+    secoes = (
+        "secaoDadosEscola",
+        "secaoIdebGeral",
+        "secaoRankingIdeb",
+        "secaoEvolucaoIdeb",
+    )
+
+    def execucoes():
+        return {
+            secao: METRICAS.observacoes("etapa_segundos", etapa="secao", secao=secao)
+            for secao in secoes
+        }
+
+    antes = execucoes()
+    pagina.run()
+
+    assert not pagina.exception
+    assert all(execucoes()[secao] == antes[secao] + 1 for secao in secoes)
+    rotulos = {seletor.label for seletor in pagina.selectbox}
+    assert {"Selecione a escola", "Selecione a escola para análise:"} <= rotulos
+    assert pagina.multiselect[0].value == ["BRASIL", "SANTA CATARINA", "CRICIÚMA"]
+    assert [metrica.label for metrica in pagina.metric] == [
+        "ESCOLAS ACIMA DA META",
+        "ESCOLAS ABAIXO DA META",
+    ]
+
+    # Interações dentro das seções continuam sem erros
+    ordem = next(t for t in pagina.toggle if t.label == "Ordem Ascendente")
+    ordem.set_value(True).run()
+    escola = next(s for s in pagina.selectbox if s.label == "Selecione a escola")
+    escola.select("EMEF XYZ").run()
+    assert not pagina.exception
+    assert any("João" in texto.value for texto in pagina.markdown)